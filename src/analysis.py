@@ -0,0 +1,144 @@
+"""Batch analysis of archived score exports: statistics per grid point for each grid size.
+
+Usage: python analysis.py ARCHIVE_DIR [--output OUTPUT_DIR] [--jobs N]
+"""
+import argparse
+import csv
+import logging
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from archive import find_score_files, read_scores
+from blinker import MAX_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+PERCENTILES = (5, 25, 50, 75, 95)
+_BINS = MAX_SIZE + 1  # bin 0 counts the unscored sessions
+
+
+class CellHistograms:
+    """For one grid size, how often each score occurred at each grid point"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.sessions = 0
+        self.counts = array("L", [0]) * (width * height * _BINS)
+
+    def add(self, scores: array) -> None:
+        counts = self.counts
+        for cell, score in enumerate(scores):
+            counts[cell * _BINS + min(score, MAX_SIZE)] += 1
+        self.sessions += 1
+
+    def merge(self, other: "CellHistograms") -> None:
+        self.counts = array("L", map(sum, zip(self.counts, other.counts)))
+        self.sessions += other.sessions
+
+    def cell_stats(self, cell: int) -> dict[str, float | None]:
+        """Mean, percentiles and fraction unscored of one grid point"""
+        histogram = self.counts[cell * _BINS : (cell + 1) * _BINS]
+        scored = self.sessions - histogram[0]
+        stats: dict[str, float | None] = {
+            "sessions": self.sessions,
+            "unscored_fraction": histogram[0] / self.sessions
+            if self.sessions
+            else None,
+            "mean": None,
+        }
+        stats.update((f"p{p}", None) for p in PERCENTILES)
+        if not scored:
+            return stats
+
+        stats["mean"] = sum(size * n for size, n in enumerate(histogram)) / scored
+        cumulative = 0
+        percentiles = iter(PERCENTILES)
+        percentile = next(percentiles)
+        for size in range(1, _BINS):
+            cumulative += histogram[size]
+            # nearest rank: the smallest size with at least p% of the scores at or below it
+            while percentile is not None and cumulative * 100 >= percentile * scored:
+                stats[f"p{percentile}"] = size
+                percentile = next(percentiles, None)
+        return stats
+
+    def rows(self) -> list[list]:
+        """Statistics for all grid points, with a header row"""
+        header = ["x", "y", "sessions", "unscored_fraction", "mean"]
+        header += [f"p{p}" for p in PERCENTILES]
+        rows = [header]
+        for cell in range(self.width * self.height):
+            stats = self.cell_stats(cell)
+            y, x = divmod(cell, self.width)
+            rows.append([x + 1, y + 1, *(stats[name] for name in header[2:])])
+        return rows
+
+
+def analyse_files(paths: list[str]) -> dict[tuple[int, int], CellHistograms]:
+    """Histograms per grid size for the given score files"""
+    histograms: dict[tuple[int, int], CellHistograms] = {}
+    for path in paths:
+        try:
+            width, height, scores = read_scores(path)
+        except (OSError, ValueError) as e:
+            _LOGGER.warning("Skipping %s: %s", path, e)
+            continue
+        if not scores:
+            continue
+        if (width, height) not in histograms:
+            histograms[width, height] = CellHistograms(width, height)
+        histograms[width, height].add(scores)
+    return histograms
+
+
+def analyse(
+    paths: list[str], jobs: int | None = None, chunk_size: int = 500
+) -> dict[tuple[int, int], CellHistograms]:
+    """Histograms per grid size, analysing chunks of files in parallel processes"""
+    chunks = [paths[i : i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    histograms: dict[tuple[int, int], CellHistograms] = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for partial in pool.map(analyse_files, chunks):
+            for geometry, histogram in partial.items():
+                if geometry in histograms:
+                    histograms[geometry].merge(histogram)
+                else:
+                    histograms[geometry] = histogram
+    return histograms
+
+
+def write_stats(
+    histograms: dict[tuple[int, int], CellHistograms], output_dir: str
+) -> list[str]:
+    """Write a csv with the statistics per grid point for each grid size"""
+    paths = []
+    for (width, height), histogram in sorted(histograms.items()):
+        path = os.path.join(output_dir, f"stats_{width}x{height}.csv")
+        with open(path, "w", encoding="UTF8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerows(histogram.rows())
+        paths.append(path)
+    return paths
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("archive", help="directory with score_*.csv files")
+    parser.add_argument("--output", default=".", help="directory for the statistics")
+    parser.add_argument(
+        "--jobs", type=int, help="number of processes (default: all cores)"
+    )
+    args = parser.parse_args(argv)
+
+    paths = find_score_files(args.archive)
+    _LOGGER.info("Analysing %s score files", len(paths))
+    histograms = analyse(paths, args.jobs)
+    for path in write_stats(histograms, args.output):
+        _LOGGER.info("Written %s", path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,40 @@
+"""Reading exported score files without the user interface."""
+import glob
+import os
+from array import array
+
+from blinker import MAX_SIZE
+
+# 0 means not scored, like in EyeTestGrid
+NOT_SCORED = 0
+
+
+def find_score_files(directory: str) -> list[str]:
+    """All score exports in a directory and its subdirectories"""
+    return sorted(
+        glob.glob(os.path.join(directory, "**", "score_*.csv"), recursive=True)
+    )
+
+
+def parse_scores(data: bytes) -> tuple[int, int, array]:
+    """Parse an exported score csv, returning width, height and the scores row by row"""
+    rows = [line for line in data.replace(b"\r", b"").split(b"\n") if line]
+    width = rows[0].count(b";") + 1 if rows else 0
+    scores = array("H", [NOT_SCORED]) * (width * len(rows))
+    for y, line in enumerate(rows):
+        row = line.split(b";")
+        if len(row) != width:
+            raise ValueError(f"Row {y + 1} has {len(row)} scores instead of {width}")
+        for x, value in enumerate(row):
+            if value:
+                score = int(value)
+                if not 0 <= score <= MAX_SIZE:
+                    raise ValueError(f"Score {score} in row {y + 1} is not a size")
+                scores[y * width + x] = score
+    return width, len(rows), scores
+
+
+def read_scores(path: str) -> tuple[int, int, array]:
+    """Read an exported score csv, returning width, height and the scores row by row"""
+    with open(path, "rb") as f:
+        return parse_scores(f.read())
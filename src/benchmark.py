@@ -0,0 +1,193 @@
+"""Micro-benchmarks of the hot paths of the eye test, on a headless canvas.
+
+Usage: python benchmark.py [--baseline FILE] [--save] [--tolerance FRACTION]
+
+Prints the results as JSON. With a baseline, each result is compared to it and
+the exit code is 1 when a benchmark is slower than the tolerance allows.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable
+
+from blinker import Blinker
+from canvas import HeadlessCanvas
+from grid import EyeTestGrid, coordinates
+from session import EyeTestSession
+from settings import UserSettings
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+LARGE = 100  # width and height of the large grid
+
+
+def _large_session(export_dir: str = ".") -> EyeTestSession:
+    session = EyeTestSession(HeadlessCanvas(), export_dir=export_dir)
+    session.start(UserSettings(size_horizontal=LARGE, size_vertical=LARGE))
+    return session
+
+
+def bench_grid_move() -> tuple[Callable[[], None], int]:
+    grid = EyeTestGrid(HeadlessCanvas(), LARGE, LARGE)
+
+    def run():
+        while grid.move("F"):
+            pass
+        while grid.move("B"):
+            pass
+
+    return run, 2 * (LARGE * LARGE - 1)
+
+
+def bench_grid_to_go() -> tuple[Callable[[], None], int]:
+    grid = EyeTestGrid(HeadlessCanvas(), LARGE, LARGE)
+    grid.keep_score(10, None)
+
+    def run():
+        for _ in range(1000):
+            grid.to_go()
+
+    return run, 1000
+
+
+def bench_blinker_switch() -> tuple[Callable[[], None], int]:
+    blinker = Blinker(HeadlessCanvas(), 3, coordinates(100, 100))
+
+    def run():
+        for _ in range(1000):
+            blinker.switch()
+
+    return run, 1000
+
+
+def bench_blinker_update() -> tuple[Callable[[], None], int]:
+    blinker = Blinker(HeadlessCanvas(), 3, coordinates(100, 100))
+
+    def run():
+        for _ in range(1000):
+            blinker.increase_size()
+            blinker.update()
+
+    return run, 1000
+
+
+def bench_score_labels() -> tuple[Callable[[], None], int]:
+    session = _large_session()
+    # scoring the last position again, so the labels are redrawn without moving
+    session.grid.position = coordinates(LARGE, LARGE)
+
+    def run():
+        for _ in range(100):
+            session.press_space()
+            session.render()
+
+    return run, 100
+
+
+def bench_export_score() -> tuple[Callable[[], None], int]:
+    # removed when `run` is no longer referenced
+    export_dir = tempfile.TemporaryDirectory()
+    session = _large_session(export_dir.name)
+    while True:
+        session.new_score()
+        if not session.grid.move("F"):
+            break
+
+    def run():
+        for _ in range(5):
+            session.export_score()
+        export_dir.name  # keep the directory while benchmarking
+
+    return run, 5
+
+
+BENCHMARKS = {
+    "grid_move": bench_grid_move,
+    "grid_to_go": bench_grid_to_go,
+    "blinker_switch": bench_blinker_switch,
+    "blinker_update": bench_blinker_update,
+    "score_labels": bench_score_labels,
+    "export_score": bench_export_score,
+}
+
+
+def _measure(run: Callable[[], None], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        run()
+    return time.perf_counter() - start
+
+
+def run_benchmarks(repeat: int = 7, min_time: float = 0.1) -> dict[str, float]:
+    """The best time per operation in µs of each benchmark"""
+    results = {}
+    for name, benchmark in BENCHMARKS.items():
+        run, operations = benchmark()
+        # like timeit: run often enough that each measurement takes min_time
+        number = 1
+        while _measure(run, number) < min_time:
+            number *= 2
+        best = min(_measure(run, number) for _ in range(repeat))
+        results[name] = round(best / number / operations * 1_000_000, 3)
+    return results
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], tolerance: float
+) -> dict[str, dict]:
+    """Ratio to the baseline for each benchmark, and whether it is a regression"""
+    comparison = {}
+    for name, us in results.items():
+        if name in baseline:
+            ratio = us / baseline[name]
+            comparison[name] = {
+                "baseline_us": baseline[name],
+                "ratio": round(ratio, 3),
+                "regression": ratio > 1 + tolerance,
+            }
+    return comparison
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file")
+    parser.add_argument(
+        "--save", action="store_true", help="store the results as new baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.5,
+        help="fraction a benchmark may be slower than the baseline (default 0.5)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks()
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "us_per_op": results,
+    }
+    if args.save:
+        with open(args.baseline, "w", encoding="UTF8") as f:
+            json.dump(report, f, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="UTF8") as f:
+            baseline = json.load(f)["us_per_op"]
+        report["comparison"] = compare(results, baseline, args.tolerance)
+
+    json.dump(report, sys.stdout, indent=2)
+    print()
+    regressions = [
+        name
+        for name, result in report.get("comparison", {}).items()
+        if result["regression"]
+    ]
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,37 +1,49 @@
 """The Blinker class contains the logic for the blinking cross in the eye test."""
 
-import datetime
 import logging
-import tkinter as tk
 
+from canvas import EyeTestCanvas
 from grid import coordinates
 
 _LOGGER = logging.getLogger(__name__)
 
+# The sizes of the blinker, also the range of the scores
+MIN_SIZE = 1
+MAX_SIZE = 100
+
 
 class Blinker:
-    """A `blinking` cross that moves over the canvas."""
+    """A `blinking` cross that moves over the canvas.
+
+    Both strokes are created once and only shown or hidden when switching, so a
+    switch does not create or delete canvas items.
+    """
 
-    _min_size = 1
-    _max_size = 100
+    _min_size = MIN_SIZE
+    _max_size = MAX_SIZE
     _default_size: int = 10
 
     def __init__(
-        self, canvas: tk.Canvas, thickness: int, position: coordinates
+        self, canvas: EyeTestCanvas, thickness: int, position: coordinates
     ) -> None:
         self.canvas = canvas
-        # self._max_x = max_x
-        # self._max_y = max_y
-        # self._step_size_x = step_size_x
-        # self._step_size_y = step_size_y
         self._thickness = thickness
         self._x: int
         self._y: int
 
+        # Line width for each size, index 0 is unused
+        self._widths = tuple(
+            ((self._thickness * size) // 10) + 1 for size in range(self._max_size + 1)
+        )
+
         self._size: int = self._default_size
         self._orientation: int = 0  # horizontal / vertical
-        self._vertical_line = None
-        self._horizontal_line = None
+        self._horizontal_line = self.canvas.create_line(
+            (0, 0, 0, 0), fill="white", state="hidden"
+        )
+        self._vertical_line = self.canvas.create_line(
+            (0, 0, 0, 0), fill="white", state="hidden"
+        )
         self.move(position)
         self.update()
 
@@ -40,33 +52,51 @@ class Blinker:
         """Getter for size"""
         return self._size
 
+    @size.setter
+    def size(self, size: int) -> None:
+        self._size = min(max(size, self._min_size), self._max_size)
+
+    def _lines(self) -> tuple:
+        """The visible and the hidden line for the current orientation"""
+        if self._orientation == 0:
+            return self._horizontal_line, self._vertical_line
+        return self._vertical_line, self._horizontal_line
+
     def clear(self):
-        """Clears the entire canvas"""
-        self.canvas.delete(self._horizontal_line)
-        self.canvas.delete(self._vertical_line)
+        """Hides the blinker"""
+        self.canvas.itemconfigure(self._horizontal_line, state="hidden")
+        self.canvas.itemconfigure(self._vertical_line, state="hidden")
 
     def update(self):
-        """Update the blinker on the canvas."""
-        self.clear()
-        scaled_thickness = ((self._thickness * self._size) // 10) + 1
-        if self._orientation == 0:
-            self._horizontal_line = self.canvas.create_line(
-                (self._x - self._size, self._y, self._x + self._size, self._y),
-                fill="white",
-                width=scaled_thickness,
-            )
-        else:
-            self._vertical_line = self.canvas.create_line(
-                (self._x, self._y - self._size, self._x, self._y + self._size),
-                fill="white",
-                width=scaled_thickness,
-            )
+        """Update the blinker on the canvas after moving or resizing."""
+        width = self._widths[self._size]
+        self.canvas.coords(
+            self._horizontal_line,
+            self._x - self._size,
+            self._y,
+            self._x + self._size,
+            self._y,
+        )
+        self.canvas.itemconfigure(self._horizontal_line, width=width)
+        self.canvas.coords(
+            self._vertical_line,
+            self._x,
+            self._y - self._size,
+            self._x,
+            self._y + self._size,
+        )
+        self.canvas.itemconfigure(self._vertical_line, width=width)
+        self._show()
+
+    def _show(self):
+        shown, hidden = self._lines()
+        self.canvas.itemconfigure(hidden, state="hidden")
+        self.canvas.itemconfigure(shown, state="normal")
 
     def switch(self) -> None:
         """Switch orientation between vertical and horizontal"""
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self._orientation = 1 - self._orientation
-        self.update()
+        self._show()
 
     def move(self, position):
         """Moves the blinker to the given position"""
@@ -0,0 +1,203 @@
+"""The canvas operations the eye test needs, with a headless in-memory canvas for tests and simulations."""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Protocol
+
+
+class EyeTestCanvas(Protocol):
+    """The part of tk.Canvas used by the grid, blinker and test session"""
+
+    def create_line(self, *args, **kw) -> int:
+        ...
+
+    def create_oval(self, *args, **kw) -> int:
+        ...
+
+    def create_text(self, *args, **kw) -> int:
+        ...
+
+    def create_image(self, *args, **kw) -> int:
+        ...
+
+    def delete(self, *args) -> None:
+        ...
+
+    def coords(self, tag_or_id, *args) -> list:
+        ...
+
+    def itemconfigure(self, tag_or_id, **kw) -> Any:
+        ...
+
+    def move(self, tag_or_id, dx: float, dy: float) -> None:
+        ...
+
+    def scale(
+        self, tag_or_id, x: float, y: float, xscale: float, yscale: float
+    ) -> None:
+        ...
+
+    def winfo_width(self) -> int:
+        ...
+
+    def winfo_height(self) -> int:
+        ...
+
+    def focus_set(self) -> None:
+        ...
+
+    def update_idletasks(self) -> None:
+        ...
+
+    def after(self, ms: int, func: Callable, *args) -> str:
+        ...
+
+    def after_cancel(self, id: str) -> None:
+        ...
+
+
+@dataclass
+class CanvasItem:
+    """An item drawn on the headless canvas"""
+
+    kind: str
+    coords: list[float]
+    options: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def tags(self) -> tuple:
+        tags = self.options.get("tags", ())
+        return (tags,) if isinstance(tags, str) else tuple(tags)
+
+
+def _flatten(args) -> list[float]:
+    """Coordinates may be given as separate values or as (nested) sequences, like in tkinter"""
+    flat = []
+    for arg in args:
+        if isinstance(arg, (tuple, list)):
+            flat.extend(_flatten(arg))
+        else:
+            flat.append(arg)
+    return flat
+
+
+class HeadlessCanvas:
+    """In-memory canvas recording items and coordinates, with a virtual clock for `after` timers"""
+
+    def __init__(self, width: int = 1000, height: int = 800):
+        self.width = width
+        self.height = height
+        self.items: dict[int, CanvasItem] = {}
+        self.time = 0  # virtual time in ms
+        self._next_id = 1
+        self._timers: dict[str, tuple[int, int, Callable, tuple]] = {}
+        self._next_timer = 1
+
+    def _create(self, kind: str, args, kw) -> int:
+        item_id = self._next_id
+        self._next_id += 1
+        self.items[item_id] = CanvasItem(kind, _flatten(args), dict(kw))
+        return item_id
+
+    def create_line(self, *args, **kw) -> int:
+        return self._create("line", args, kw)
+
+    def create_oval(self, *args, **kw) -> int:
+        return self._create("oval", args, kw)
+
+    def create_text(self, *args, **kw) -> int:
+        return self._create("text", args, kw)
+
+    def create_image(self, *args, **kw) -> int:
+        return self._create("image", args, kw)
+
+    def find_withtag(self, tag_or_id) -> tuple:
+        """Item ids matching an id, a tag or 'all'"""
+        if tag_or_id == "all":
+            return tuple(self.items)
+        if isinstance(tag_or_id, int) or (
+            isinstance(tag_or_id, str) and tag_or_id.isdigit()
+        ):
+            return (int(tag_or_id),) if int(tag_or_id) in self.items else ()
+        return tuple(
+            item_id for item_id, item in self.items.items() if tag_or_id in item.tags
+        )
+
+    def delete(self, *args) -> None:
+        for tag_or_id in args:
+            if tag_or_id is None:
+                continue
+            for item_id in self.find_withtag(tag_or_id):
+                del self.items[item_id]
+
+    def coords(self, tag_or_id, *args) -> list:
+        found = self.find_withtag(tag_or_id)
+        if not found:
+            return []
+        if args:
+            for item_id in found:
+                self.items[item_id].coords = _flatten(args)
+        return list(self.items[found[0]].coords)
+
+    def move(self, tag_or_id, dx: float, dy: float) -> None:
+        for item_id in self.find_withtag(tag_or_id):
+            item = self.items[item_id]
+            item.coords = [c + (dy if i % 2 else dx) for i, c in enumerate(item.coords)]
+
+    def scale(
+        self, tag_or_id, x: float, y: float, xscale: float, yscale: float
+    ) -> None:
+        for item_id in self.find_withtag(tag_or_id):
+            item = self.items[item_id]
+            item.coords = [
+                y + (c - y) * yscale if i % 2 else x + (c - x) * xscale
+                for i, c in enumerate(item.coords)
+            ]
+
+    def itemconfigure(self, tag_or_id, **kw) -> Any:
+        for item_id in self.find_withtag(tag_or_id):
+            self.items[item_id].options.update(kw)
+
+    itemconfig = itemconfigure
+
+    def itemcget(self, tag_or_id, option: str) -> Any:
+        found = self.find_withtag(tag_or_id)
+        return self.items[found[0]].options.get(option, "") if found else ""
+
+    def winfo_width(self) -> int:
+        return self.width
+
+    def winfo_height(self) -> int:
+        return self.height
+
+    def focus_set(self) -> None:
+        pass
+
+    def update_idletasks(self) -> None:
+        pass
+
+    def after(self, ms: int, func: Callable, *args) -> str:
+        timer_id = f"after#{self._next_timer}"
+        # the sequence number keeps timers with the same deadline in scheduling order
+        self._timers[timer_id] = (self.time + ms, self._next_timer, func, args)
+        self._next_timer += 1
+        return timer_id
+
+    def after_cancel(self, id: str) -> None:
+        self._timers.pop(id, None)
+
+    def monotonic(self) -> float:
+        """The virtual time in seconds, to use as clock instead of time.monotonic"""
+        return self.time / 1000
+
+    def advance(self, ms: int) -> None:
+        """Move the virtual clock forward, running every timer that becomes due"""
+        end = self.time + ms
+        while self._timers:
+            timer_id = min(self._timers, key=lambda t: self._timers[t][:2])
+            due, _, func, args = self._timers[timer_id]
+            if due > end:
+                break
+            del self._timers[timer_id]
+            self.time = max(self.time, due)
+            func(*args)
+        self.time = end
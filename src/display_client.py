@@ -0,0 +1,135 @@
+"""Thin display client for the eye test service: shows the session canvas and sends the keys.
+
+Usage: python display_client.py [--port PORT] [--automatic] [--stimuli N]
+"""
+import argparse
+import base64
+import json
+import queue
+import socket
+import threading
+import tkinter as tk
+
+from recording import settings_args
+from service import DEFAULT_PORT
+from settings import MAX_STIMULI, UserSettings
+
+KEYS = {
+    "<space>": ("press_space",),
+    "<Right>": ("press_move", "F"),
+    "<Left>": ("press_move", "B"),
+    "<Up>": ("press_move", "U"),
+    "<Down>": ("press_move", "D"),
+    "<Prior>": ("press_bigger",),
+    "<Next>": ("press_smaller",),
+    "<p>": ("pause",),
+    "<Escape>": ("end",),
+    # the number of a stimulus that is seen, in the multi-stimulus mode
+    **{str(number): ("press_stimulus", number) for number in range(1, MAX_STIMULI + 1)},
+}
+
+
+class DisplayClient(tk.Tk):
+    """Window drawing what the service draws on the session canvas"""
+
+    def __init__(self, port: int, settings: UserSettings):
+        super().__init__()
+        self.title("Knipper Oogtest")
+        self._settings = settings
+        self._socket = socket.create_connection(("127.0.0.1", port))
+        self._messages: queue.Queue = queue.Queue()
+        self._items: dict[int, int] = {}  # item ids of the service to local ones
+        self._image: tk.PhotoImage | None = None  # the results, kept while shown
+
+        self.text = tk.StringVar()
+        tk.Label(master=self, textvariable=self.text, font=("Arial 14 bold")).pack()
+        self.canvas = tk.Canvas(
+            self, width=1000, height=800, bg="darkgrey", highlightthickness=0
+        )
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", self.resize)
+        for key, event in KEYS.items():
+            self.bind(key, lambda _, event=event: self.send(*event))
+        self.bind("<Return>", lambda _: self.start())
+
+        threading.Thread(target=self._receive, daemon=True).start()
+        self.after(10, self._draw)
+
+    def send(self, event: str, *args) -> None:
+        message = {"event": event, "args": args}
+        self._socket.sendall(json.dumps(message).encode() + b"\n")
+
+    def start(self) -> None:
+        self.canvas.delete(tk.ALL)
+        self._items = {}
+        self.send("start", *settings_args(self._settings))
+
+    def resize(self, event) -> None:
+        self.send("resize", event.width, event.height)
+
+    def _receive(self) -> None:
+        """Read the messages of the service on a background thread"""
+        with self._socket.makefile("rb") as lines:
+            for line in lines:
+                self._messages.put(json.loads(line))
+
+    def _item(self, item):
+        """The local item id or tag for an item id or tag of the service"""
+        return self._items.get(item, item) if isinstance(item, int) else item
+
+    def _draw(self) -> None:
+        """Apply all waiting drawing operations"""
+        while True:
+            try:
+                message = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            op = message["op"]
+            if op == "create":
+                if message["kind"] == "image":
+                    self._image = tk.PhotoImage(
+                        master=self.canvas,
+                        data=base64.b64decode(message["options"]["image"]),
+                        format="ppm",
+                    )
+                    message["options"]["image"] = self._image
+                create = getattr(self.canvas, f"create_{message['kind']}")
+                self._items[message["item"]] = create(
+                    *message["coords"], **message["options"]
+                )
+            elif op == "delete":
+                for item in message["items"]:
+                    if item == "all":
+                        self._items = {}
+                    self.canvas.delete(self._item(item))
+            elif op == "coords":
+                self.canvas.coords(self._item(message["item"]), *message["coords"])
+            elif op == "move":
+                self.canvas.move(
+                    self._item(message["item"]), message["dx"], message["dy"]
+                )
+            elif op == "scale":
+                self.canvas.scale(
+                    self._item(message["item"]), *message["origin"], *message["scale"]
+                )
+            elif op == "itemconfigure":
+                self.canvas.itemconfigure(
+                    self._item(message["item"]), **message["options"]
+                )
+            elif op in ("size", "status"):
+                self.text.set(message["text"])
+        self.after(10, self._draw)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--automatic", action="store_true", help="find the thresholds automatically"
+    )
+    parser.add_argument(
+        "--stimuli", type=int, default=1, help="number of blinkers at once"
+    )
+    args = parser.parse_args()
+    settings = UserSettings(automatic=args.automatic, stimuli=args.stimuli)
+    DisplayClient(args.port, settings).mainloop()
@@ -1,12 +1,10 @@
 """The EyeTestApp is a tkinter window defining the frames and canvas needed for the eye test."""
 import logging
 import tkinter as tk
-import csv
-import datetime
-from dataclasses import dataclass
 
 from blinker import Blinker
 from grid import EyeTestGrid
+from latency import LatencyRecorder
 from settings import UserSettings
 
 _LOGGER = logging.getLogger(__name__)
@@ -18,7 +16,6 @@ class EyeTestApp(tk.Tk):
     # switch_timer = None
     max_x: int = 1000
     max_y: int = 800
-    blinker_switcher = None
 
     class UserInput:
         """Defines the fields for user input"""
@@ -34,6 +31,9 @@ class EyeTestApp(tk.Tk):
                 int(self.ent_speed.get()),
                 int(self.ent_size_horizontal.get()),
                 int(self.ent_size_vertical.get()),
+                self.automatic.get(),
+                self.coarse_to_fine.get(),
+                int(self.ent_stimuli.get()),
             )
 
         def place(self):
@@ -48,15 +48,36 @@ class EyeTestApp(tk.Tk):
                 self._frame, "Dikte", self._settings.thickness
             )
             self.ent_speed = add_entry(self._frame, "Snelheid", self._settings.speed)
+            self.ent_stimuli = add_entry(
+                self._frame, "Prikkels", self._settings.stimuli
+            )
+            self.automatic = tk.BooleanVar(value=self._settings.automatic)
+            tk.Checkbutton(
+                master=self._frame,
+                text="Automatisch",
+                variable=self.automatic,
+                font=("Arial 14 bold"),
+            ).pack(side=tk.TOP)
+            self.coarse_to_fine = tk.BooleanVar(value=self._settings.coarse_to_fine)
+            tk.Checkbutton(
+                master=self._frame,
+                text="Grof naar fijn",
+                variable=self.coarse_to_fine,
+                font=("Arial 14 bold"),
+            ).pack(side=tk.TOP)
 
             self._frame.place(relx=0.3, y=50, anchor=tk.NW)
 
-    def __init__(self):
+    def __init__(
+        self,
+        measure_latency: bool = False,
+        resume: str | None = None,
+        record: bool = False,
+        profile: bool = False,
+    ):
         # window = tk.Tk()
         super().__init__()
-        self._score = []
         self.settings = UserSettings()
-        self.blinker = None
 
         self.title("Knipper Oogtest")
 
@@ -79,11 +100,12 @@ class EyeTestApp(tk.Tk):
         self.btn_start = add_button(frm_buttons, "Start", self.start_eye_test)
         self.btn_pause = add_button(frm_buttons, "Pauze", self.pause_test)
         self.btn_stop = add_button(frm_buttons, "Stop", self.end_eye_test)
+        self.btn_results = add_button(frm_buttons, "Resultaat", self.toggle_results)
         frm_buttons.pack()
 
         lbl_orientation_point = tk.Label(
             master=frm_orientation_text,
-            text="Start en kijk naar het bolletje\nPage up/down: groter/kleiner\nSpatie als je beweging nog ziet\nPijltjes om rond te wandelen",
+            text="Start en kijk naar het bolletje\nPage up/down: groter/kleiner\nSpatie als je beweging nog ziet\nPijltjes om rond te wandelen\nR: resultaat tonen\n1-9: prikkel gezien (bij meer prikkels)",
             font=("Arial 14 bold"),
         )
 
@@ -105,9 +127,19 @@ class EyeTestApp(tk.Tk):
             font=("Arial 14 bold"),
         )
 
+        # Create updatable text with the statistics of the scores so far
+        self.statistics_text = tk.StringVar()
+        self.statistics_text.set("")
+        lbl_statistics = tk.Label(
+            master=frm_orientation_text,
+            textvariable=self.statistics_text,
+            font=("Arial 12"),
+        )
+
         lbl_orientation_point.pack()
         lbl_size.pack()
         lbl_status.pack()
+        lbl_statistics.pack()
 
         frm_orientation_text.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
 
@@ -123,223 +155,163 @@ class EyeTestApp(tk.Tk):
             highlightthickness=0,
         )
         self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", self.resize_canvas)
+        self.latency = LatencyRecorder(self.canvas) if measure_latency else None
+        self._session = None
+        self._resume = resume
+        self._record = record
+        self._profile = profile
 
         # Show the right frame
         frm_right.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
 
         # Key bindings
-        self.bind("<Up>", self.press_up)
-        self.bind("<Down>", self.press_down)
-        self.bind("<space>", self.press_space)
-        self.bind("<Right>", self.press_right)
-        self.bind("<Escape>", self.press_esc)
-        self.bind("<Left>", self.press_left)
-        self.bind("<Prior>", self.press_bigger)
-        self.bind("<Next>", self.press_smaller)
+        self.bind_key("<Up>", self.press_up)
+        self.bind_key("<Down>", self.press_down)
+        self.bind_key("<space>", self.press_space)
+        self.bind_key("<Right>", self.press_right)
+        self.bind_key("<Escape>", self.press_esc)
+        self.bind_key("<Left>", self.press_left)
+        self.bind_key("<Prior>", self.press_bigger)
+        self.bind_key("<Next>", self.press_smaller)
+        self.bind_key("<r>", self.toggle_results)
+        for number in range(1, 10):
+            self.bind_key(str(number), self.press_number)
+        # Hidden: profile the handlers, written next to the export at the end
+        self.bind("<Control-Alt-p>", self.toggle_profiling)
+
+    def bind_key(self, key: str, handler) -> None:
+        """Bind a key to a handler, measuring its latency if asked for"""
+        if self.latency:
+            handler = self.latency.wrap(handler.__name__, handler)
+        self.bind(key, handler)
+
+    @property
+    def session(self):
+        """The test session, only created (and imported) when first needed"""
+        if self._session is None:
+            from heatmap import ResultsView
+            from logqueue import CONTEXT
+            from profiling import HandlerProfiler
+            from recording import SessionRecorder
+            from session import EyeTestSession
+
+            self._session = EyeTestSession(
+                self.canvas,
+                show_size=self.size_text.set,
+                show_status=self.status_text.set,
+                show_statistics=self.statistics_text.set,
+                latency=self.latency,
+                journal=True,
+                recorder=SessionRecorder() if self._record else None,
+                profiler=HandlerProfiler(enabled=self._profile),
+                log_context=CONTEXT,
+                results=ResultsView(
+                    self.canvas,
+                    image_factory=lambda ppm: tk.PhotoImage(
+                        master=self.canvas, data=ppm, format="ppm"
+                    ),
+                ),
+            )
+        return self._session
 
-    def start_eye_test(self, _) -> None:
-        """Create and start the blinker"""
+    @property
+    def grid(self) -> EyeTestGrid | None:
+        return self._session.grid if self._session else None
 
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-        _LOGGER.info(f"Width = %s", width)
-        _LOGGER.info(f"Height = %s", height)
+    @property
+    def blinker(self) -> Blinker | None:
+        return self._session.blinker if self._session else None
 
-        if self.blinker_switcher:
-            self.after_cancel(self.blinker_switcher)
-        self.canvas.focus_set()
-        self.canvas.delete(tk.ALL)
+    def on_first_frame(self, callback) -> None:
+        """Call back once, when the window is on screen for the first time"""
 
-        self.settings = self.user_input.read()
+        def mapped(event):
+            if event.widget is self:
+                self.unbind("<Map>", binding)
+                self.after_idle(drawn)
 
-        h = self.canvas.winfo_height() / 2
-        self.canvas.create_oval(30,h-10,50,h+10, fill="black")
+        def drawn():
+            self.update_idletasks()
+            callback()
 
-        self.grid = EyeTestGrid(
-            self.canvas, self.settings.size_horizontal, self.settings.size_vertical
-        )
+        binding = self.bind("<Map>", mapped, add=True)
 
-        self.blinker = Blinker(
-            self.canvas, self.settings.thickness, self.grid.screen_position()
-        )
-        self.blinker_switcher = self.after(self.settings.speed, self.switch_blinker)
-        self.size_text.set(f"Grootte = {str(self.blinker.size)}")
-        self.report_status()
+    def destroy(self) -> None:
+        """Close the journal of an unfinished test before the window goes"""
+        if self._session:
+            self._session.close_journal()
+        super().destroy()
+
+    def start_eye_test(self, _) -> None:
+        """Create and start the blinker, or continue the interrupted test to resume"""
+        if self._resume:
+            self.settings = self.session.resume(self._resume)
+            self._resume = None
+        else:
+            self.session.start(self.user_input.read())
+            self.settings = self.session.settings
 
     def end_eye_test(self, _) -> None:
         """Everything done"""
-        if self.blinker:
-            self.after_cancel(self.blinker_switcher)
-            self.blinker.clear()
-            self.blinker = None
-            self.export_score()
-            self.size_text.set("Klaar! Export is gemaakt.")
+        if self._session:
+            self.session.end()
 
     def pause_test(self, _) -> None:
         """Pause the test or continue if paused"""
-        if self.blinker:
-            if self.blinker_switcher:
-                self.after_cancel(self.blinker_switcher)
-                self.blinker_switcher = None
-                self.blinker.clear()
-                self.btn_pause.configure(text="Verder")
-            else:
-                self.blinker_switcher = self.after(
-                    self.settings.speed, self.switch_blinker
-                )
-                self.btn_pause.configure(text="Pauze")
-
-    def switch_blinker(self):
-        """Switch the orientation of the blinker after each second"""
-        self.blinker.switch()
-        self.blinker_switcher = self.after(self.settings.speed, self.switch_blinker)
+        if self._session and self.session.testing:
+            self.session.pause()
+            self.btn_pause.configure(text="Verder" if self.session.paused else "Pauze")
+
+    def toggle_profiling(self, _) -> None:
+        """Switch profiling of the test handlers on or off"""
+        profiler = self.session.profiler
+        profiler.toggle()
+        self.status_text.set("Profileren aan" if profiler.enabled else "Profileren uit")
+
+    def toggle_results(self, _) -> None:
+        """Switch between the test and the heatmap of its scores"""
+        if self._session:
+            self.session.toggle_results()
+
+    def resize_canvas(self, event) -> None:
+        """Keep the test in place when the window is resized"""
+        if self._session:
+            self.session.resize(event.width, event.height)
 
     def press_esc(self, _) -> None:
         """End test is Escape is pressed"""
-        if self.blinker:
+        if self._session and self.session.testing:
             self.end_eye_test(_)
 
     def press_bigger(self, _) -> None:
         """Make size bigger"""
-        if self.blinker:
-            self.blinker.increase_size()
-            self.size_text.set(f"Grootte = {str(self.blinker.size)}")
-            self.blinker.update()
+        self.session.press_bigger()
 
     def press_smaller(self, _) -> None:
         """Make size smaller"""
-        if self.blinker:
-            self.blinker.decrease_size()
-            self.size_text.set(f"Grootte = {str(self.blinker.size)}")
-            self.blinker.update()
+        self.session.press_smaller()
 
     def press_space(self, _) -> None:
         """Report size"""
-        if self.blinker:
-            # score_id = self.grid.score_lbl_id()
-            # if score_id:
-            #     self.canvas.delete(score_id)
-
-            self.new_score()
-            # self.grid.keep_score(self.blinker.size, score_lbl_id)
-            if self.grid.move("F"):
-                self.blinker.move(self.grid.screen_position())
+        self.session.press_space()
 
-            # disable score text if already scored, so test can be seen clearly
-            self.disable_score()
-            self.report_status()
+    def press_number(self, event) -> None:
+        """The stimulus with this number is seen"""
+        self.session.press_stimulus(int(event.char))
 
     def press_right(self, event) -> None:
         """Move to the next grid point"""
-
-        # first enable previous score, if available and disabled
-        self.restore_score()
-
-        # Move in the grid
-        if self.grid.move("F"):
-            # And move to blinker the next position
-            self.blinker.move(self.grid.screen_position())
-
-        # disable score text if already scored, so test can be seen clearly
-        self.disable_score()
-        self.report_status()
+        self.session.press_move("F")
 
     def press_left(self, event) -> None:
-        # first enable previous score, if available and disabled
-        self.restore_score()
-
-        if self.grid.move("B"):
-            # now move to the next position
-            self.blinker.move(self.grid.screen_position())
-
-        # disable score text if already scored previously
-        self.disable_score()
-        self.report_status()
+        self.session.press_move("B")
 
     def press_up(self, event) -> None:
-        # first enable previous score, if available and disabled
-        self.restore_score()
-
-        if self.grid.move("U"):
-            # now move to the next position
-            self.blinker.move(self.grid.screen_position())
-
-        # disable score text if already scored previously
-        self.disable_score()
-        self.report_status()
+        self.session.press_move("U")
 
     def press_down(self, event) -> None:
-        # first enable previous score, if available and disabled
-        self.restore_score()
-
-        if self.grid.move("D"):
-            # now move to the next position
-            self.blinker.move(self.grid.screen_position())
-
-        # disable score text if already scored previously
-        self.disable_score()
-        self.report_status()
-
-    def export_score(self) -> None:
-        """Export the score to a csv file."""
-        now = datetime.datetime.now().strftime("%Y-%m-%d %H%M%S")
-        with open(f"score_{now}.csv", "w", encoding="UTF8", newline="") as f:
-            writer = csv.writer(f, delimiter=";")
-            writer.writerows(self.grid.all_scores())
-
-    def new_score(self):
-        """Add a score label to the canvas at the current position"""
-
-        # score_id = self.grid.score_lbl_id()
-        # if score_id:
-        #     self.canvas.delete(score_id)
-
-        score_lbl_id = self.canvas.create_text(
-            self.grid.screen_position().x,
-            self.grid.screen_position().y,
-            text=str(self.blinker.size),
-            fill="lightgrey",
-            font="Arial 14 bold",
-        )
-        self.grid.keep_score(self.blinker.size, score_lbl_id)
-        _LOGGER.info(f"New score id for %s: %s", self.grid.position, score_lbl_id)
-
-    def disable_score(self):
-        """Disables a score label so the test can be seen clearly. Returns True if it is already scored."""
-        score_lbl_id = self.grid.score_lbl_id()
-        if score_lbl_id:
-            _LOGGER.info(
-                f"disabling score id %s for %s", score_lbl_id, self.grid.position
-            )
-            self.canvas.delete(score_lbl_id)
-
-    def restore_score(self):
-        """Add the previous score to a new label on the canvas at the current position"""
-
-        score = self.grid.score()
-        if score:
-            score_lbl_id = self.canvas.create_text(
-                self.grid.screen_position().x,
-                self.grid.screen_position().y,
-                text=str(score),
-                fill="lightgrey",
-                font="Arial 14 bold",
-            )
-            # store new label id:
-            self.grid.keep_score(score, score_lbl_id)
-            _LOGGER.info(
-                f"restored score id %s for %s", score_lbl_id, self.grid.position
-            )
-
-    def report_status(self):
-        if self.grid:
-            score = self.grid.score()
-            if score:
-                self.status_text.set(f"Deze is al gedaan")
-                if self.grid.to_go() == 0:
-                    self.status_text.set(f"Allemaal gedaan!")
-            else:
-                self.status_text.set(f"Deze moet nog")
+        self.session.press_move("D")
 
 
 def add_entry(frame, label: str, value: int | str) -> tk.Entry:
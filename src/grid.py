@@ -1,11 +1,14 @@
 """Class for managing the grid where the test takes place."""
+from array import array
 from dataclasses import dataclass
+from typing import Callable
 
 import logging
-import tkinter as tk
 
+from canvas import EyeTestCanvas
 
-@dataclass
+
+@dataclass(frozen=True)
 class coordinates:
     x: int
     y: int
@@ -13,45 +16,92 @@ class coordinates:
 
 _LOGGER = logging.getLogger(__name__)
 
+# Blinker sizes start at 1 and canvas item ids start at 1, so 0 means "nothing yet"
+_NOT_SCORED = 0
+_NO_LABEL = 0
+
 
 class EyeTestGrid:
     """Grid where the blinker moves through"""
 
-    def __init__(self, canvas: tk.Canvas, grid_size_x: int, grid_size_y: int):
+    def __init__(self, canvas: EyeTestCanvas, grid_size_x: int, grid_size_y: int):
         self._canvas = canvas
 
         # Grid size are coordinates, eg 10,5 is a grid of 10 wide and 5 high
         self._size = coordinates(grid_size_x, grid_size_y)
 
+        # All grid positions are created once, row by row, so moving never allocates.
         # Grid position are coordinates, eg 1,1 is starting position top left
-        self.position = coordinates(1, 1)
-
-        # Create empty arrays to keep score for each grid coordinate, as well as the text item on the canvas
-        self._score = [[None for x in range(self._size.x)] for y in range(self._size.y)]
-        self._score_lbl_id = [
-            [None for x in range(self._size.x)] for y in range(self._size.y)
-        ]
+        self._positions = tuple(
+            coordinates(x, y)
+            for y in range(1, self._size.y + 1)
+            for x in range(1, self._size.x + 1)
+        )
+        self._index = 0
+
+        # Flat arrays to keep score for each grid coordinate, as well as the text item on the canvas
+        cells = len(self._positions)
+        self._score = array("H", [_NOT_SCORED]) * cells
+        self._score_lbl_id = array("L", [_NO_LABEL]) * cells
+        self._to_go = cells
+
+        # Screen position of every grid position, built for the canvas size when first needed
+        self._screen_positions: tuple[coordinates, ...] = ()
+        self.screen_size = (0, 0)
+
+        # Called with the position and size for every new or changed score
+        self.score_listeners: list[Callable[[coordinates, int], None]] = []
+
+    @property
+    def size(self) -> coordinates:
+        """The grid size, eg 10,5 is a grid of 10 wide and 5 high"""
+        return self._size
+
+    @property
+    def position(self) -> coordinates:
+        """The current grid position"""
+        return self._positions[self._index]
+
+    @position.setter
+    def position(self, position: coordinates) -> None:
+        self._index = self._cell(position)
+
+    def _cell(self, position=None) -> int:
+        """Index in the flat score arrays for a grid position"""
+        if not position:
+            return self._index
+        return (position.y - 1) * self._size.x + position.x - 1
 
     def score_lbl_id(self, position=None) -> str | int | None:
-        pos = position if position else self.position
-        return (self._score_lbl_id[pos.y - 1])[
-            pos.x - 1
-        ]  # watch out, first get y-list, than x-element
+        return self._score_lbl_id[self._cell(position)] or None
 
     def score(self, position=None) -> int | None:
-        pos = position if position else self.position
-        return (self._score[pos.y - 1])[
-            pos.x - 1
-        ]  # watch out, first get y-list, than x-element
+        return self._score[self._cell(position)] or None
 
     def all_scores(self) -> list:
-        return self._score
+        """All scores as a list of rows, None where not scored yet"""
+        width = self._size.x
+        return [
+            [score or None for score in self._score[row : row + width]]
+            for row in range(0, len(self._score), width)
+        ]
 
-    def screen_position(self) -> coordinates:
-        """Calculates the screen position from the grid position"""
-        x = 40 + ((self.position.x - 1) * self._canvas.winfo_width() // (self._size.x))
-        y = self.position.y * self._canvas.winfo_height() // (self._size.y + 1)
-        return coordinates(x, y)
+    def screen_position(self, position=None) -> coordinates:
+        """The screen position of the given or current grid position"""
+        if not self._screen_positions:
+            self.resize(self._canvas.winfo_width(), self._canvas.winfo_height())
+        return self._screen_positions[self._cell(position)]
+
+    def resize(self, width: int, height: int) -> None:
+        """Calculates the screen positions from the grid positions for a canvas size"""
+        self.screen_size = (width, height)
+        self._screen_positions = tuple(
+            coordinates(
+                40 + ((pos.x - 1) * width // (self._size.x)),
+                pos.y * height // (self._size.y + 1),
+            )
+            for pos in self._positions
+        )
 
     def move(self, direction: str) -> bool:
         dir = direction.upper()
@@ -67,56 +117,57 @@ class EyeTestGrid:
 
     def _move_forward(self) -> bool:
         """Move the position forward in the grid. Returns False if at the end"""
-        if self.position == self._size:
+        if self._index == len(self._positions) - 1:
             _LOGGER.info("Not moving, end of grid")
             return False
 
-        if self.position.x >= self._size.x:
-            self.position = coordinates(1, self.position.y + 1)
-        else:
-            self.position = coordinates(self.position.x + 1, self.position.y)
+        self._index += 1
         _LOGGER.info(f"Move to %s", self.position)
         return True
 
     def _move_backward(self) -> bool:
         """Move the position backward in the grid. Returns False if at the beginning"""
-        if self.position == coordinates(1, 1):
+        if self._index == 0:
             _LOGGER.info("Not moving, beginning of grid")
             return False
 
-        if self.position.x <= 1:
-            self.position = coordinates(self._size.x, self.position.y - 1)
-        else:
-            self.position = coordinates(self.position.x - 1, self.position.y)
+        self._index -= 1
         _LOGGER.info(f"Move to %s", self.position)
         return True
 
     def _move_up(self) -> bool:
         """Move the position upward in the grid. Returns False if at the top"""
-        if self.position.y == 1:
+        if self._index < self._size.x:
             _LOGGER.info("Not moving, top of grid")
             return False
 
-        self.position = coordinates(self.position.x, self.position.y - 1)
+        self._index -= self._size.x
         _LOGGER.info(f"Move to %s", self.position)
         return True
 
     def _move_down(self) -> bool:
         """Move the position upward in the grid. Returns False if at the top"""
-        if self.position.y == self._size.y:
+        if self._index + self._size.x >= len(self._positions):
             _LOGGER.info("Not moving, bottom of grid")
             return False
 
-        self.position = coordinates(self.position.x, self.position.y + 1)
+        self._index += self._size.x
         _LOGGER.info(f"Move to %s", self.position)
         return True
 
     def keep_score(self, size: int, score_lbl_id):
-        (self._score[self.position.y - 1])[
-            self.position.x - 1
-        ] = size  # watch out, first get y-list, than x-element
-        (self._score_lbl_id[self.position.y - 1])[self.position.x - 1] = score_lbl_id
+        cell = self._index
+        if self._score[cell] == _NOT_SCORED:
+            self._to_go -= 1
+        self._score[cell] = size
+        self._score_lbl_id[cell] = score_lbl_id or _NO_LABEL
+        for listener in self.score_listeners:
+            listener(self.position, size)
+
+    def keep_score_lbl_id(self, score_lbl_id, position=None):
+        """Store the text item showing the score, without changing the score"""
+        self._score_lbl_id[self._cell(position)] = score_lbl_id or _NO_LABEL
 
     def to_go(self) -> int:
         """How many more to go"""
-        return sum(x.count(None) for x in self._score)
+        return self._to_go
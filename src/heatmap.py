@@ -0,0 +1,127 @@
+"""The results view: the scores as a field heatmap, rendered off-screen and cached."""
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from blinker import MAX_SIZE
+from canvas import EyeTestCanvas
+
+_LOGGER = logging.getLogger(__name__)
+
+# Rendered images kept, for a few sessions and window sizes
+CACHE_SIZE = 8
+
+# Not scored positions get the canvas background
+NOT_SCORED_COLOUR = (169, 169, 169)
+
+
+def _colour(size: int) -> tuple[int, int, int]:
+    """Green for the smallest size, through yellow, to red for the largest"""
+    fraction = (min(size, MAX_SIZE) - 1) / (MAX_SIZE - 1)
+    if fraction < 0.5:
+        return round(510 * fraction), 200, 0
+    return 255, round(200 * (2 - 2 * fraction)), 0
+
+
+# One pixel, as ppm bytes, for every score
+_PIXELS = (bytes(NOT_SCORED_COLOUR),) + tuple(
+    bytes(_colour(size)) for size in range(1, MAX_SIZE + 1)
+)
+
+
+def _edges(cells: int, pixels: int) -> list[int]:
+    """The first pixel of each cell, and the end"""
+    return [cell * pixels // cells for cell in range(cells + 1)]
+
+
+def render_ppm(scores: list[list[int | None]], width: int, height: int) -> bytes:
+    """The scores as a width x height binary ppm image, one coloured block per position
+
+    Each row of positions is coloured once, as runs of repeated pixels, and
+    then repeated for its height, so the work per pixel is copying bytes.
+    """
+    columns = _edges(len(scores[0]), width)
+    rows = _edges(len(scores), height)
+    blocks = []
+    for y, row in enumerate(scores):
+        line = b"".join(
+            _PIXELS[min(score or 0, MAX_SIZE)] * (columns[x + 1] - columns[x])
+            for x, score in enumerate(row)
+        )
+        blocks.append(line * (rows[y + 1] - rows[y]))
+    return b"P6 %d %d 255\n" % (width, height) + b"".join(blocks)
+
+
+class ResultsView:
+    """Shows the scores as heatmap over the canvas, with markers where even the largest size was not seen
+
+    The image factory turns the rendered ppm data into what the canvas shows,
+    a tk.PhotoImage for a Tk canvas. By default the ppm data itself is used.
+    """
+
+    def __init__(
+        self,
+        canvas: EyeTestCanvas,
+        image_factory: Callable[[bytes], Any] = bytes,
+        cache_size: int = CACHE_SIZE,
+    ):
+        self._canvas = canvas
+        self._image_factory = image_factory
+        self._cache_size = cache_size
+        self._images: OrderedDict[tuple, Any] = OrderedDict()
+        self.visible = False
+
+    def image(
+        self, key: Hashable, scores: list[list[int | None]], width: int, height: int
+    ) -> Any:
+        """The image for these scores and size, rendered only if not in the cache"""
+        cache_key = (key, width, height)
+        image = self._images.get(cache_key)
+        if image is not None:
+            self._images.move_to_end(cache_key)
+            return image
+        image = self._image_factory(render_ppm(scores, width, height))
+        self._keep(cache_key, image)
+        _LOGGER.info("Rendered results %s at %sx%s", key, width, height)
+        return image
+
+    def add(self, key: Hashable, width: int, height: int, ppm: bytes) -> None:
+        """Keep an image rendered elsewhere, e.g. in a worker thread"""
+        self._keep((key, width, height), self._image_factory(ppm))
+
+    def _keep(self, cache_key: tuple, image: Any) -> None:
+        self._images[cache_key] = image
+        if len(self._images) > self._cache_size:
+            self._images.popitem(last=False)
+
+    def show(self, key: Hashable, scores: list[list[int | None]]) -> None:
+        """Show the results over the whole canvas; `key` changes when the scores change"""
+        width = self._canvas.winfo_width()
+        height = self._canvas.winfo_height()
+        image = self.image(key, scores, width, height)
+        self._canvas.delete("results")
+        self._canvas.create_image(0, 0, image=image, anchor="nw", tags="results")
+
+        columns = _edges(len(scores[0]), width)
+        rows = _edges(len(scores), height)
+        for y, row in enumerate(scores):
+            for x, score in enumerate(row):
+                if score is not None and score >= MAX_SIZE:
+                    x0, x1 = columns[x], columns[x + 1]
+                    y0, y1 = rows[y], rows[y + 1]
+                    radius = max(2, min(x1 - x0, y1 - y0) // 4)
+                    cx, cy = (x0 + x1) // 2, (y0 + y1) // 2
+                    self._canvas.create_oval(
+                        cx - radius,
+                        cy - radius,
+                        cx + radius,
+                        cy + radius,
+                        fill="black",
+                        tags="results",
+                    )
+        self.visible = True
+
+    def hide(self) -> None:
+        """Back to the test"""
+        self._canvas.delete("results")
+        self.visible = False
@@ -0,0 +1,116 @@
+"""Append-only journal of the scores during a test, so an interrupted test can be resumed."""
+import csv
+import logging
+import os
+import queue
+import threading
+
+from canvas import EyeTestCanvas
+from grid import EyeTestGrid, coordinates
+from settings import UserSettings
+
+_LOGGER = logging.getLogger(__name__)
+
+_CLOSE = None
+
+
+class ScoreJournal:
+    """Writes scores to the journal file on a background thread, syncing them to disk in batches"""
+
+    def __init__(self, path: str, settings: UserSettings | None = None):
+        self.path = path
+        self._queue: queue.Queue = queue.Queue()
+        self._file = open(path, "a", encoding="UTF8", newline="")
+        if settings:
+            self._queue.put(
+                [
+                    "settings",
+                    settings.thickness,
+                    settings.speed,
+                    settings.size_horizontal,
+                    settings.size_vertical,
+                    int(settings.automatic),
+                    int(settings.coarse_to_fine),
+                    settings.stimuli,
+                ]
+            )
+        self._thread = threading.Thread(
+            target=self._write, name="score-journal", daemon=True
+        )
+        self._thread.start()
+
+    def record(self, position: coordinates, size: int) -> None:
+        """Add a score to the journal, without waiting for the disk"""
+        self._queue.put(["score", position.x, position.y, size])
+
+    def close(self) -> None:
+        """Write everything still waiting and close the file"""
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def _write(self) -> None:
+        writer = csv.writer(self._file, delimiter=";")
+        while True:
+            # Wait for a row, then take everything else that is waiting as one batch
+            rows = [self._queue.get()]
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            closing = _CLOSE in rows
+            writer.writerows(row for row in rows if row is not _CLOSE)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            if closing:
+                self._file.close()
+                return
+
+
+def read_journal(path: str) -> tuple[UserSettings, list[tuple[coordinates, int]]]:
+    """Read the settings and scores from a journal, skipping an incomplete last line"""
+    settings = None
+    scores = []
+    with open(path, encoding="UTF8", newline="") as f:
+        lines = f.readlines()
+    if lines and not lines[-1].endswith("\n"):
+        lines.pop()  # written partially when the test was interrupted
+    for row in csv.reader(lines, delimiter=";"):
+        try:
+            if row[0] == "settings":
+                settings = UserSettings(*(int(value) for value in row[1:5]))
+                settings.automatic = row[5:6] == ["1"]
+                settings.coarse_to_fine = row[6:7] == ["1"]
+                settings.stimuli = int(row[7]) if row[7:8] else 1
+            elif row[0] == "score":
+                x, y, size = (int(value) for value in row[1:4])
+                scores.append((coordinates(x, y), size))
+        except (IndexError, ValueError):
+            _LOGGER.warning("Skipping damaged journal line %s", row)
+    if settings is None:
+        raise ValueError(f"No settings found in journal {path}")
+    return settings, scores
+
+
+def resume_grid(path: str, canvas: EyeTestCanvas) -> tuple[UserSettings, EyeTestGrid]:
+    """A fresh grid holding the scores from the journal, positioned at the first cell still to do"""
+    settings, scores = read_journal(path)
+    return settings, restored_grid(settings, scores, canvas)
+
+
+def restored_grid(
+    settings: UserSettings,
+    scores: list[tuple[coordinates, int]],
+    canvas: EyeTestCanvas,
+) -> EyeTestGrid:
+    """A fresh grid holding the scores, positioned at the first cell still to do"""
+    grid = EyeTestGrid(canvas, settings.size_horizontal, settings.size_vertical)
+    for position, size in scores:
+        grid.position = position
+        grid.keep_score(size, None)
+
+    grid.position = coordinates(1, 1)
+    while grid.score() and grid.move("F"):
+        pass
+    return grid
@@ -0,0 +1,101 @@
+"""The score labels shown on the canvas during the test."""
+import logging
+
+from canvas import EyeTestCanvas
+from grid import EyeTestGrid, coordinates
+
+_LOGGER = logging.getLogger(__name__)
+
+# Grids with more positions only show the labels around the current position
+MAX_ALL_LABELS = 2500
+NEARBY_RADIUS = 10
+
+
+class ScoreLabels:
+    """Score labels, created at most once per grid position and hidden while not needed"""
+
+    def __init__(
+        self, canvas: EyeTestCanvas, grid: EyeTestGrid, radius: int | None = None
+    ):
+        self._canvas = canvas
+        self._grid = grid
+        if radius is None and grid.size.x * grid.size.y > MAX_ALL_LABELS:
+            radius = NEARBY_RADIUS
+        self._radius = radius
+        self._nearby: set[coordinates] = set()
+
+    def show(self, position=None) -> None:
+        """Show the score at the given or current position, if it is scored"""
+        pos = position if position else self._grid.position
+        score = self._grid.score(pos)
+        if not score or not self._is_nearby(pos):
+            return
+        score_lbl_id = self._grid.score_lbl_id(pos)
+        if score_lbl_id:
+            self._canvas.itemconfigure(score_lbl_id, text=str(score), state="normal")
+        else:
+            screen_position = self._grid.screen_position(pos)
+            score_lbl_id = self._canvas.create_text(
+                screen_position.x,
+                screen_position.y,
+                text=str(score),
+                fill="lightgrey",
+                font="Arial 14 bold",
+                tags="score",
+            )
+            self._grid.keep_score_lbl_id(score_lbl_id, pos)
+            _LOGGER.info(f"New score id for %s: %s", pos, score_lbl_id)
+
+    def hide(self, position=None) -> None:
+        """Hide the score label at the given or current position"""
+        score_lbl_id = self._grid.score_lbl_id(position)
+        if score_lbl_id:
+            self._canvas.itemconfigure(score_lbl_id, state="hidden")
+
+    def show_all(self) -> None:
+        """Show all scores that may be shown, except at the current position"""
+        if self._radius is not None:
+            self._nearby = set()
+            self.follow()
+            return
+        for y, row in enumerate(self._grid.all_scores(), start=1):
+            for x, score in enumerate(row, start=1):
+                position = coordinates(x, y)
+                if score and position != self._grid.position:
+                    self.show(position)
+
+    def follow(self) -> None:
+        """With a large grid, show only the labels around the current position"""
+        if self._radius is None:
+            return
+        nearby = self._positions_nearby()
+        for position in self._nearby - nearby:
+            self.hide(position)
+        self._nearby, entering = nearby, nearby - self._nearby
+        for position in entering:
+            if position != self._grid.position:
+                self.show(position)
+
+    def _is_nearby(self, position: coordinates) -> bool:
+        if self._radius is None:
+            return True
+        current = self._grid.position
+        return (
+            abs(position.x - current.x) <= self._radius
+            and abs(position.y - current.y) <= self._radius
+        )
+
+    def _positions_nearby(self) -> set[coordinates]:
+        current = self._grid.position
+        size = self._grid.size
+        return {
+            coordinates(x, y)
+            for y in range(
+                max(1, current.y - self._radius),
+                min(size.y, current.y + self._radius) + 1,
+            )
+            for x in range(
+                max(1, current.x - self._radius),
+                min(size.x, current.x + self._radius) + 1,
+            )
+        }
@@ -0,0 +1,100 @@
+"""Optional measurement of the time from a key press until the canvas is updated."""
+import bisect
+import functools
+import time
+from array import array
+from typing import Callable
+
+from canvas import EyeTestCanvas
+
+# Upper bounds in ms of the histogram buckets, the last bucket holds everything slower
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class LatencyHistogram:
+    """Latencies of one handler"""
+
+    def __init__(self):
+        self.counts = array("L", [0]) * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, latency_ms: float) -> None:
+        self.counts[bisect.bisect_right(BUCKETS_MS, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+class LatencyRecorder:
+    """Keeps a latency histogram per key handler
+
+    A handler that leaves the redraw to a deferred render pass is measured
+    until that pass is done: `render_pending` tells whether a pass is
+    coming, the pass calls `rendered` when it is done.
+    """
+
+    def __init__(
+        self, canvas: EyeTestCanvas, clock: Callable[[], float] = time.perf_counter
+    ):
+        self._canvas = canvas
+        self._clock = clock
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.render_pending: Callable[[], bool] = lambda: False
+        # Handlers waiting for the render pass, with their start times
+        self._waiting: list[tuple[str, float]] = []
+
+    def reset(self) -> None:
+        self.histograms = {}
+        self._waiting = []
+
+    def _add(self, name: str, start: float) -> None:
+        latency_ms = (self._clock() - start) * 1000
+        self.histograms.setdefault(name, LatencyHistogram()).add(latency_ms)
+
+    def wrap(self, name: str, handler: Callable) -> Callable:
+        """Returns the handler, measuring each call until the canvas work is done"""
+
+        @functools.wraps(handler)
+        def measured(*args):
+            start = self._clock()
+            result = handler(*args)
+            if self.render_pending():
+                self._waiting.append((name, start))
+            else:
+                self._canvas.update_idletasks()
+                self._add(name, start)
+            return result
+
+        return measured
+
+    def rendered(self) -> None:
+        """Called at the end of a render pass: the handlers waiting for it are done"""
+        if self._waiting:
+            self._canvas.update_idletasks()
+            for name, start in self._waiting:
+                self._add(name, start)
+            self._waiting = []
+
+    def rows(self) -> list[list]:
+        """The histograms as table, with a header row"""
+        header = ["handler", "count", "mean_ms", "max_ms"]
+        header += [f"<{bucket}ms" for bucket in BUCKETS_MS]
+        header.append(f">={BUCKETS_MS[-1]}ms")
+        rows = [header]
+        for name, histogram in sorted(self.histograms.items()):
+            rows.append(
+                [
+                    name,
+                    histogram.count,
+                    round(histogram.mean_ms, 3),
+                    round(histogram.max_ms, 3),
+                    *histogram.counts,
+                ]
+            )
+        return rows
@@ -0,0 +1,102 @@
+"""Statistics of the scores kept up to date while testing, without scanning the grid."""
+from array import array
+
+from archive import NOT_SCORED
+from blinker import MAX_SIZE
+from grid import coordinates
+
+# Sizes above this count as a poorly seen position
+HIGH_SCORE = 50
+
+
+class LiveStatistics:
+    """Mean, minimum, maximum, row and column means and the number of high scores
+
+    Fed by EyeTestGrid.score_listeners. It keeps its own copy of the scores, so
+    a position scored again replaces its previous score in every aggregate.
+    Each score costs constant work: the minimum and maximum come from a
+    histogram of the sizes, which has MAX_SIZE bins whatever the grid size.
+    """
+
+    def __init__(self, width: int, height: int, threshold: int = HIGH_SCORE):
+        self.width = width
+        self.height = height
+        self.threshold = threshold
+        self._scores = array("H", [NOT_SCORED]) * (width * height)
+        self._histogram = array("L", [0]) * (MAX_SIZE + 1)
+        self.count = 0
+        self.total = 0
+        self.above = 0
+        self.row_totals = array("Q", [0]) * height
+        self.row_counts = array("L", [0]) * height
+        self.column_totals = array("Q", [0]) * width
+        self.column_counts = array("L", [0]) * width
+        self.minimum: int | None = None
+        self.maximum: int | None = None
+
+    def add(self, position: coordinates, size: int) -> None:
+        """Score listener: keep the score of a position, replacing an earlier one"""
+        cell = (position.y - 1) * self.width + position.x - 1
+        size = min(size, MAX_SIZE)
+        previous = self._scores[cell]
+        if previous == size:
+            return
+        self._scores[cell] = size
+        # the new size first, so a new minimum or maximum is found near the old one
+        if size != NOT_SCORED:
+            self._count(position, size, 1)
+        if previous != NOT_SCORED:
+            self._count(position, previous, -1)
+
+    def _count(self, position: coordinates, size: int, sign: int) -> None:
+        self.count += sign
+        self.total += sign * size
+        if size > self.threshold:
+            self.above += sign
+        self.row_totals[position.y - 1] += sign * size
+        self.row_counts[position.y - 1] += sign
+        self.column_totals[position.x - 1] += sign * size
+        self.column_counts[position.x - 1] += sign
+        self._histogram[size] += sign
+
+        if sign > 0:
+            if self.minimum is None or size < self.minimum:
+                self.minimum = size
+            if self.maximum is None or size > self.maximum:
+                self.maximum = size
+        elif self._histogram[size] == 0:
+            if size == self.minimum:
+                self.minimum = self._next(size, 1)
+            if size == self.maximum:
+                self.maximum = self._next(size, -1)
+
+    def _next(self, size: int, step: int) -> int | None:
+        """The nearest size still scored, from `size` in the direction of `step`"""
+        end = MAX_SIZE + 1 if step > 0 else 0
+        for other in range(size, end, step):
+            if self._histogram[other]:
+                return other
+        return None
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def row_mean(self, y: int) -> float | None:
+        """Mean score of a grid row, 1 is the top row"""
+        count = self.row_counts[y - 1]
+        return self.row_totals[y - 1] / count if count else None
+
+    def column_mean(self, x: int) -> float | None:
+        """Mean score of a grid column, 1 is the left column"""
+        count = self.column_counts[x - 1]
+        return self.column_totals[x - 1] / count if count else None
+
+    def summary(self) -> str:
+        """One line for the operator"""
+        if not self.count:
+            return "Nog geen scores"
+        return (
+            f"Gemiddeld {self.mean:.1f} (min {self.minimum}, max {self.maximum}), "
+            f"{self.above} boven {self.threshold}"
+        )
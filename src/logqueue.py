@@ -0,0 +1,172 @@
+"""Non-blocking logging: records are queued on the UI thread and written as JSON lines by a listener thread."""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from typing import Callable, TextIO
+
+# At most this many records per message per interval, the rest is counted and summarised
+RATE_LIMIT = 5
+RATE_INTERVAL = 1.0
+
+
+class LogContext:
+    """The session and grid position added to every log record"""
+
+    def __init__(self):
+        self.session: str | None = None
+        self._position: Callable[[], object] | None = None
+
+    def bind(self, session: str, position: Callable[[], object] | None = None) -> None:
+        """Add the session id and the current position (asked when logging) to the records"""
+        self.session = session
+        self._position = position
+
+    def clear(self) -> None:
+        self.session = None
+        self._position = None
+
+    def position(self) -> str | None:
+        if self._position is None:
+            return None
+        try:
+            position = self._position()
+        except Exception:
+            return None
+        if position is None:
+            return None
+        return f"{position.x},{position.y}"
+
+
+CONTEXT = LogContext()
+
+
+class ContextFilter(logging.Filter):
+    """Add the session id and position of the context to a record"""
+
+    def __init__(self, context: LogContext = CONTEXT):
+        super().__init__()
+        self.context = context
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.session = self.context.session
+        record.position = self.context.position()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Drop repeated messages above `limit` per `interval` seconds; warnings and errors always pass"""
+
+    def __init__(
+        self,
+        limit: int = RATE_LIMIT,
+        interval: float = RATE_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self._clock = clock
+        # per message template: start of the interval, passed and dropped records
+        self._windows: dict[tuple[str, object], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        now = self._clock()
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.interval:
+            if window is not None and window[2]:
+                record.suppressed = window[2]
+            self._windows[key] = [now, 1, 0]
+            return True
+        if window[1] < self.limit:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("session", "position", "suppressed"):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry)
+
+
+class JsonQueueHandler(logging.handlers.QueueHandler):
+    """Queue records for the JsonFormatter: the message formatted, the exception as text
+
+    The standard QueueHandler puts the traceback in the message and drops it
+    from the record, which would leave no exception field in the JSON line.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        # the traceback keeps the frames alive and does not need to cross the queue
+        record.exc_info = None
+        return record
+
+
+def _stop(listener: logging.handlers.QueueListener) -> None:
+    if listener._thread is not None:
+        listener.stop()
+
+
+def setup_logging(
+    level: int = logging.INFO,
+    path: str | None = None,
+    stream: TextIO | None = None,
+    limit: int = RATE_LIMIT,
+    interval: float = RATE_INTERVAL,
+) -> logging.handlers.QueueListener:
+    """Log JSON lines to `path` or `stream` (default stderr) from a background thread
+
+    Only the filters and putting the record on the queue run on the calling thread.
+    The listener is stopped, and the queue flushed, at exit.
+    """
+    if path:
+        output = logging.FileHandler(path, encoding="utf-8")
+    else:
+        output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter())
+
+    records = queue.SimpleQueue()
+    handler = JsonQueueHandler(records)
+    handler.addFilter(RateLimitFilter(limit, interval))
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+    root.addHandler(handler)
+
+    listener = logging.handlers.QueueListener(records, output)
+    listener.start()
+    atexit.register(_stop, listener)
+    return listener
@@ -1,13 +1,69 @@
 """Main module for the Eye test."""
+import time
 
+_STARTED = time.perf_counter()
+
+import argparse
 import logging
-from eyetest_app import EyeTestApp
 
-logging.basicConfig(level=logging.INFO)
+from logqueue import setup_logging
+from startup import StartupTimer
+
 _LOGGER = logging.getLogger(__name__)
 
 if __name__ == "__main__":
+    startup = StartupTimer(_STARTED)
+    parser = argparse.ArgumentParser(description="Knipper Oogtest")
+    parser.add_argument(
+        "--latency",
+        action="store_true",
+        help="measure key press to screen latency and export it with the scores",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="JOURNAL",
+        help="continue the interrupted test from this journal file when pressing Start",
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="record the key presses and settings and export them with the scores",
+    )
+    parser.add_argument(
+        "--startup-report",
+        metavar="FILE",
+        help="write the startup times, until the first frame is shown, to this csv file",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile the test handlers and write the profile next to the scores "
+        "(Ctrl+Alt+P switches it on or off)",
+    )
+    parser.add_argument(
+        "--log",
+        metavar="FILE",
+        help="write the log, as json lines, to this file instead of the console",
+    )
+    args = parser.parse_args()
+    setup_logging(path=args.log)
     _LOGGER.info("started")
 
-    eye_test_app = EyeTestApp()
+    # The user interface is only imported when it is actually started
+    from eyetest_app import EyeTestApp
+
+    startup.mark("user interface imported")
+    eye_test_app = EyeTestApp(
+        measure_latency=args.latency,
+        resume=args.resume,
+        record=args.record,
+        profile=args.profile,
+    )
+    startup.mark("window built")
+
+    def first_frame():
+        startup.mark("first frame")
+        startup.report(args.startup_report)
+
+    eye_test_app.on_first_frame(first_frame)
     eye_test_app.mainloop()
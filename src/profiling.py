@@ -0,0 +1,162 @@
+"""Profiling of the session handlers: call counts, time and allocations, dumped to a text file."""
+import cProfile
+import functools
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+from typing import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+# The allocations of one in this many calls of a handler are measured
+SAMPLE_EVERY = 10
+# Stack frames kept per allocation
+TRACE_FRAMES = 5
+TOP = 25
+
+
+class HandlerStats:
+    """Calls, time and sampled peak allocation of one handler"""
+
+    def __init__(self):
+        self.calls = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.samples = 0
+        self.peak_bytes = 0
+
+    def row(self, name: str) -> str:
+        mean_ms = self.total_s * 1000 / self.calls if self.calls else 0
+        return (
+            f"{name:<20}{self.calls:>8}{self.total_s * 1000:>12.1f}"
+            f"{mean_ms:>10.3f}{self.max_s * 1000:>10.3f}{self.peak_bytes / 1024:>12.1f}"
+        )
+
+
+class HandlerProfiler:
+    """Wraps handlers with cProfile and tracemalloc sampling while enabled
+
+    A disabled profiler only adds a function call to each handler, so it can
+    be switched on during a session, e.g. with a hidden key. Allocations are
+    traced only during the sampled calls, so the other calls run without the
+    tracemalloc overhead; the hot spots are the allocations of the sampled
+    calls still alive when they return.
+    """
+
+    def __init__(self, enabled: bool = False, sample_every: int = SAMPLE_EVERY):
+        self.sample_every = sample_every
+        self.handlers: dict[str, HandlerStats] = {}
+        self._profile = cProfile.Profile()
+        self._depth = 0
+        # Size and count of the sampled allocations, per source line
+        self._allocations: dict[str, list[int]] = {}
+        self.enabled = False
+        if enabled:
+            self.enable()
+
+    def enable(self) -> None:
+        if not self.enabled:
+            self.enabled = True
+            _LOGGER.info("Profiling on")
+
+    def disable(self) -> None:
+        if self.enabled:
+            self.enabled = False
+            _LOGGER.info("Profiling off")
+
+    def toggle(self) -> None:
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def reset(self) -> None:
+        self.handlers = {}
+        self._profile = cProfile.Profile()
+        self._allocations = {}
+
+    def _keep_allocations(self, snapshot: tracemalloc.Snapshot) -> None:
+        snapshot = snapshot.filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ]
+        )
+        for statistic in snapshot.statistics("lineno"):
+            allocations = self._allocations.setdefault(str(statistic.traceback), [0, 0])
+            allocations[0] += statistic.size
+            allocations[1] += statistic.count
+
+    def wrap(self, name: str, handler: Callable) -> Callable:
+        """Returns the handler, profiled while the profiler is enabled"""
+
+        @functools.wraps(handler)
+        def profiled(*args, **kwargs):
+            if not self.enabled:
+                return handler(*args, **kwargs)
+            stats = self.handlers.setdefault(name, HandlerStats())
+            stats.calls += 1
+            sample = stats.calls % self.sample_every == 1 % self.sample_every
+            # not while tracing already: a handler called by a traced handler counts
+            # for its caller, and tracing started by somebody else is left alone
+            trace = sample and not tracemalloc.is_tracing()
+            # handlers calling other handlers: the outermost one runs the profiler
+            self._depth += 1
+            if self._depth == 1:
+                self._profile.enable()
+            start = time.perf_counter()
+            if trace:
+                tracemalloc.start(TRACE_FRAMES)
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                if trace:
+                    _, peak = tracemalloc.get_traced_memory()
+                self._depth -= 1
+                if self._depth == 0:
+                    self._profile.disable()
+                if trace:
+                    snapshot = tracemalloc.take_snapshot()
+                    tracemalloc.stop()
+                    stats.samples += 1
+                    stats.peak_bytes = max(stats.peak_bytes, peak)
+                    self._keep_allocations(snapshot)
+                stats.total_s += elapsed
+                stats.max_s = max(stats.max_s, elapsed)
+
+        return profiled
+
+    def report(self) -> str:
+        """Handler table, the functions with most cumulative time and the allocation hot spots"""
+        out = io.StringIO()
+        out.write("Handlers (time includes the handlers they call)\n")
+        out.write(
+            f"{'handler':<20}{'calls':>8}{'total_ms':>12}{'mean_ms':>10}"
+            f"{'max_ms':>10}{'peak_kib':>12}\n"
+        )
+        for name, stats in sorted(self.handlers.items()):
+            out.write(stats.row(name) + "\n")
+
+        out.write("\nFunctions by cumulative time\n")
+        try:
+            pstats.Stats(self._profile, stream=out).sort_stats(
+                "cumulative"
+            ).print_stats(TOP)
+        except TypeError:
+            out.write("(no calls profiled)\n")
+
+        out.write("Allocation hot spots (sampled calls)\n")
+        allocations = sorted(self._allocations.items(), key=lambda item: -item[1][0])
+        for line, (size, count) in allocations[:TOP]:
+            out.write(f"{line}: size={size / 1024:.1f} KiB, count={count}\n")
+        if not allocations:
+            out.write("(no allocations sampled)\n")
+        return out.getvalue()
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="UTF8") as f:
+            f.write(self.report())
+        _LOGGER.info("Profile written to %s", path)
@@ -0,0 +1,57 @@
+"""Recording the events handled by a test session, with their time."""
+import csv
+import dataclasses
+
+from settings import UserSettings
+
+# Recorded event: time in ms since the first event, the name and the arguments
+Event = tuple[float, str, tuple]
+
+
+class SessionRecorder:
+    """Keeps the events handled by a session, with the time they happened"""
+
+    def __init__(self):
+        self.events: list[Event] = []
+        self._first: float | None = None
+
+    def record(self, moment: float, event: str, *args) -> None:
+        """Record an event at `moment` in seconds on the session clock"""
+        if self._first is None:
+            self._first = moment
+        self.events.append((round((moment - self._first) * 1000, 3), event, args))
+
+    def reset(self) -> None:
+        self.events = []
+        self._first = None
+
+    def save(self, path: str) -> None:
+        save_events(path, self.events)
+
+
+def save_events(path: str, events: list[Event]) -> None:
+    with open(path, "w", encoding="UTF8", newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        for moment, event, args in events:
+            writer.writerow([moment, event, *args])
+
+
+def settings_args(settings: UserSettings) -> tuple:
+    """The settings as event arguments"""
+    return tuple(int(value) for value in dataclasses.astuple(settings))
+
+
+def _argument(value: str) -> int | str:
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def load_recording(path: str) -> list[Event]:
+    with open(path, encoding="UTF8", newline="") as f:
+        return [
+            (float(row[0]), row[1], tuple(_argument(value) for value in row[2:]))
+            for row in csv.reader(f, delimiter=";")
+            if row
+        ]
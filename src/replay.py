@@ -0,0 +1,106 @@
+"""Replaying recorded test sessions on a headless canvas.
+
+Usage: python replay.py EVENTS [--realtime] [--sessions N]
+
+Replays a recorded events_<timestamp>.csv, as fast as possible or in real time,
+and reports how many sessions per second were replayed.
+"""
+import argparse
+import dataclasses
+import logging
+import sys
+import tempfile
+import time
+from typing import Callable
+
+from canvas import HeadlessCanvas
+from grid import coordinates
+from recording import Event, load_recording
+from session import EyeTestSession
+from settings import UserSettings
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# Arguments of the settings in a resume event, the scores follow
+_SETTINGS = len(dataclasses.fields(UserSettings))
+
+
+def _settings(*args: int) -> UserSettings:
+    return UserSettings(*args[:4], *(bool(value) for value in args[4:6]), *args[6:])
+
+
+def _resume(session: EyeTestSession, *args: int) -> None:
+    """Restore the recorded settings and scores, as x, y and size of each position"""
+    values = args[_SETTINGS:]
+    scores = [
+        (coordinates(values[i], values[i + 1]), values[i + 2])
+        for i in range(0, len(values), 3)
+    ]
+    session.restore(_settings(*args[:_SETTINGS]), scores)
+
+
+def session_handlers(session: EyeTestSession) -> dict[str, Callable]:
+    """The session methods handling each recorded event"""
+    return {
+        "start": lambda *args: session.start(_settings(*args)),
+        "resume": lambda *args: _resume(session, *args),
+        "end": session.end,
+        "pause": session.pause,
+        "resize": session.resize,
+        "press_bigger": session.press_bigger,
+        "press_smaller": session.press_smaller,
+        "press_space": session.press_space,
+        "press_move": session.press_move,
+        "press_stimulus": session.press_stimulus,
+    }
+
+
+def replay(
+    events: list[Event], session: EyeTestSession, realtime: bool = False
+) -> None:
+    """Feed recorded events to a session on a headless canvas.
+
+    The virtual clock of the canvas is moved to the time of each event first, so
+    timers like the blinker switches run exactly as during the recording. The
+    session should use the canvas clock (HeadlessCanvas.monotonic).
+    """
+    canvas: HeadlessCanvas = session.canvas
+    handlers = session_handlers(session)
+    started = canvas.time
+    for moment, event, args in events:
+        delay = started + moment - canvas.time
+        if realtime and delay > 0:
+            time.sleep(delay / 1000)
+        canvas.advance(max(0, delay))
+        handlers[event](*args)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("events", help="recorded events_*.csv file")
+    parser.add_argument(
+        "--realtime", action="store_true", help="replay with the recorded timing"
+    )
+    parser.add_argument("--sessions", type=int, default=1, help="number of replays")
+    args = parser.parse_args(argv)
+
+    events = load_recording(args.events)
+    with tempfile.TemporaryDirectory() as export_dir:
+        start = time.perf_counter()
+        for _ in range(args.sessions):
+            canvas = HeadlessCanvas()
+            session = EyeTestSession(
+                canvas, export_dir=export_dir, clock=canvas.monotonic
+            )
+            replay(events, session, args.realtime)
+        duration = time.perf_counter() - start
+    print(
+        f"Replayed {args.sessions} sessions of {len(events)} events in {duration:.3f} s,"
+        f" {args.sessions / duration:.1f} sessions/s"
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(main())
@@ -0,0 +1,324 @@
+"""Printable reports of exported sessions: heatmap, thresholds, settings and the change since the previous visit.
+
+Usage: python report.py EXPORT_DIR [--output OUTPUT_DIR] [--jobs N] [--format {pdf,png} ...]
+
+Reports are made from the session_*.bin files written by export_score, in
+parallel processes and without Tk. The reports of a patient go to the same
+subdirectory of the output directory as the sessions in the export directory.
+Sessions whose inputs did not change since the last run and whose reports are
+still there are skipped, see reports.json in the output directory.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from heatmap import render_ppm
+from sessionfile import SessionRecord, read_session
+from settings import UserSettings
+
+_LOGGER = logging.getLogger(__name__)
+
+MANIFEST = "reports.json"
+FORMATS = ("pdf", "png")
+
+# Heatmap size in pixels, the proportions of the test canvas
+IMAGE_WIDTH = 500
+IMAGE_HEIGHT = 400
+
+# A4 in points, and the largest grid printed as a table
+_PAGE_WIDTH = 595
+_PAGE_HEIGHT = 842
+_TABLE_COLUMNS = 25
+_TABLE_ROWS = 35
+
+
+def _rows(record: SessionRecord) -> list[list[int | None]]:
+    return [
+        [score or None for score in record.row(y)] for y in range(1, record.height + 1)
+    ]
+
+
+def png_bytes(ppm: bytes) -> bytes:
+    """A binary ppm image (as from heatmap.render_ppm) as png"""
+    header, pixels = ppm.split(b"\n", 1)
+    _, width, height, _ = header.split()
+    width, height = int(width), int(height)
+    stride = width * 3
+    # filter type 0 (none) before each row
+    raw = b"".join(b"\0" + pixels[y * stride : (y + 1) * stride] for y in range(height))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _pdf_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _text_lines(lines: list[str], x: int, y: int, size: int, font: str) -> str:
+    commands = [f"BT /{font} {size} Tf {size + 2} TL {x} {y} Td"]
+    commands += [f"({_pdf_text(line)}) '" for line in lines]
+    commands.append("ET")
+    return "\n".join(commands)
+
+
+def pdf_bytes(title: str, pages: list[list[str]], ppm: bytes) -> bytes:
+    """A pdf with the heatmap and info lines on the first page and tables on the others
+
+    pages[0] are the info lines, above the heatmap; the other pages are
+    printed in a fixed width font.
+    """
+    header, pixels = ppm.split(b"\n", 1)
+    _, width, height, _ = header.split()
+    image = zlib.compress(pixels)
+
+    contents = [
+        "\n".join(
+            [
+                _text_lines([title], 48, 790, 16, "F1"),
+                _text_lines(pages[0], 48, 760, 10, "F1"),
+                f"q {IMAGE_WIDTH} 0 0 {IMAGE_HEIGHT} 48 200 cm /Heatmap Do Q",
+            ]
+        )
+    ]
+    contents += [_text_lines(lines, 48, 790, 8, "F2") for lines in pages[1:]]
+
+    # objects 1 catalog, 2 pages, 3-4 fonts, 5 image, then a page and its content per page
+    page_ids = [6 + 2 * i for i in range(len(contents))]
+    resources = "<< /Font << /F1 3 0 R /F2 4 0 R >> /XObject << /Heatmap 5 0 R >> >>"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>"
+        % (" ".join(f"{i} 0 R" for i in page_ids).encode(), len(page_ids)),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /XObject /Subtype /Image /Width %s /Height %s /ColorSpace /DeviceRGB "
+        b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n"
+        % (width, height, len(image))
+        + image
+        + b"\nendstream",
+    ]
+    for page_id, content in zip(page_ids, contents):
+        stream = content.encode("cp1252", errors="replace")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_PAGE_WIDTH} {_PAGE_HEIGHT}] "
+            f"/Resources {resources} /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(pdf)
+
+
+def _table(rows: list[list[int | None]], sign: bool = False) -> list[str]:
+    """Rows of scores as fixed width lines, '-' where not scored"""
+    if len(rows[0]) > _TABLE_COLUMNS or len(rows) > _TABLE_ROWS:
+        return ["(te groot voor een tabel, zie de score csv)"]
+    format = "{:+4d}" if sign else "{:4d}"
+    return [
+        "".join("   -" if score is None else format.format(score) for score in row)
+        for row in rows
+    ]
+
+
+def _method(settings: UserSettings) -> str:
+    if settings.stimuli > 1:
+        method = f"{settings.stimuli} prikkels tegelijk"
+    else:
+        method = "automatisch" if settings.automatic else "handmatig"
+    if settings.coarse_to_fine:
+        method += ", grof naar fijn"
+    return method
+
+
+def _lines(record: SessionRecord, previous: SessionRecord | None) -> list[list[str]]:
+    settings = record.settings
+    scores = [score for score in record.scores if score]
+    info = [
+        f"Begonnen: {record.started:%Y-%m-%d %H:%M}",
+        f"Klaar: {record.ended:%Y-%m-%d %H:%M}",
+        f"Raster: {record.width} x {record.height}",
+        f"Dikte: {settings.thickness}",
+        f"Snelheid: {settings.speed} ms",
+        f"Methode: {_method(settings)}",
+        f"Gemeten: {len(scores)} van {record.width * record.height}",
+    ]
+    if scores:
+        info.append(f"Gemiddelde grootte: {sum(scores) / len(scores):.1f}")
+    if previous:
+        info.append(f"Vorige meting: {previous.started:%Y-%m-%d %H:%M}")
+
+    tables = ["Drempels (grootte per positie)", ""] + _table(_rows(record))
+    if previous:
+        changes = [
+            [
+                now - before if now and before else None
+                for now, before in zip(record.row(y), previous.row(y))
+            ]
+            for y in range(1, record.height + 1)
+        ]
+        tables += ["", "Verschil met de vorige meting", ""]
+        tables += _table(changes, sign=True)
+    return [info, tables]
+
+
+def report_path(path: str, output_dir: str, format: str) -> str:
+    """Where the report of a session file is written, in one format"""
+    name = os.path.splitext(os.path.basename(path))[0].replace("session_", "report_")
+    return os.path.join(output_dir, f"{name}.{format}")
+
+
+def render_report(
+    path: str, previous_path: str | None, output_dir: str, formats: tuple[str, ...]
+) -> list[str]:
+    """Write the reports of one session file, returning their paths"""
+    record = read_session(path)
+    previous = read_session(previous_path) if previous_path else None
+    ppm = render_ppm(_rows(record), IMAGE_WIDTH, IMAGE_HEIGHT)
+    written = []
+    if "png" in formats:
+        written.append(report_path(path, output_dir, "png"))
+        with open(written[-1], "wb") as f:
+            f.write(png_bytes(ppm))
+    if "pdf" in formats:
+        title = f"Knipper Oogtest {record.started:%Y-%m-%d %H:%M}"
+        written.append(report_path(path, output_dir, "pdf"))
+        with open(written[-1], "wb") as f:
+            f.write(pdf_bytes(title, _lines(record, previous), ppm))
+    return written
+
+
+def _fingerprint(*paths: str | None) -> list:
+    """What a report depends on: its files with their size and modification time"""
+    fingerprint = []
+    for path in paths:
+        if path:
+            stat = os.stat(path)
+            fingerprint.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+    return fingerprint
+
+
+def plan_reports(directory: str) -> list[tuple[str, str | None]]:
+    """Each session file with the previous session file of the same grid and patient
+
+    Like trend.py, the sessions of one patient are the ones in one directory.
+    """
+    paths = glob.glob(os.path.join(directory, "**", "session_*.bin"), recursive=True)
+    sessions = []
+    for path in paths:
+        try:
+            record = read_session(path)
+        except (OSError, ValueError) as e:
+            _LOGGER.warning("Skipping %s: %s", path, e)
+            continue
+        patient = os.path.dirname(path)
+        sessions.append((record.started, (patient, record.width, record.height), path))
+    sessions.sort()
+
+    previous: dict[tuple[str, int, int], str] = {}
+    plan = []
+    for _, series, path in sessions:
+        plan.append((path, previous.get(series)))
+        previous[series] = path
+    return plan
+
+
+def make_reports(
+    directory: str,
+    output_dir: str,
+    formats: tuple[str, ...] = FORMATS,
+    jobs: int | None = None,
+) -> list[str]:
+    """Make the reports that are missing or out of date, returning the written paths"""
+    manifest_path = os.path.join(output_dir, MANIFEST)
+    try:
+        with open(manifest_path, encoding="UTF8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    todo = []
+    for path, previous in plan_reports(directory):
+        key = os.path.relpath(path, directory)
+        # the patient directory, so the reports of patients do not overwrite each other
+        target = os.path.join(output_dir, os.path.dirname(key))
+        fingerprint = [_fingerprint(path, previous), sorted(formats)]
+        if manifest.get(key) != fingerprint or not all(
+            os.path.exists(report_path(path, target, format)) for format in formats
+        ):
+            todo.append((key, fingerprint, path, previous, target))
+    _LOGGER.info("%s reports to make", len(todo))
+
+    written = []
+    if todo:
+        for target in {target for *_, target in todo}:
+            os.makedirs(target, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = pool.map(
+                render_report,
+                [path for _, _, path, _, _ in todo],
+                [previous for _, _, _, previous, _ in todo],
+                [target for *_, target in todo],
+                [formats] * len(todo),
+            )
+            for (key, fingerprint, *_), paths in zip(todo, results):
+                manifest[key] = fingerprint
+                written += paths
+        with open(manifest_path, "w", encoding="UTF8") as f:
+            json.dump(manifest, f, indent=1)
+    return written
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("exports", help="directory with session_*.bin files")
+    parser.add_argument("--output", default=".", help="directory for the reports")
+    parser.add_argument(
+        "--jobs", type=int, help="number of processes (default: all cores)"
+    )
+    parser.add_argument(
+        "--format",
+        nargs="+",
+        choices=FORMATS,
+        default=list(FORMATS),
+        help="report formats (default: both)",
+    )
+    args = parser.parse_args(argv)
+
+    for path in make_reports(args.exports, args.output, tuple(args.format), args.jobs):
+        _LOGGER.info("Written %s", path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
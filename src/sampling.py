@@ -0,0 +1,81 @@
+"""Coarse-to-fine sampling: measure a sparse part of the grid first, then only where scores differ."""
+from grid import EyeTestGrid, coordinates
+
+
+class CoarseToFine:
+    """Chooses the next grid position to measure.
+
+    First every `step`th position in both directions (always including the last
+    row and column) is measured. After that, a position is only measured when the
+    measured scores around it differ more than `max_difference`.
+    """
+
+    def __init__(
+        self, width: int, height: int, step: int = 2, max_difference: int = 10
+    ):
+        self._width = width
+        self._height = height
+        self._radius = max(1, step - 1)
+        self._max_difference = max_difference
+        xs = sorted({*range(1, width + 1, step), width})
+        ys = sorted({*range(1, height + 1, step), height})
+        self.coarse = [coordinates(x, y) for y in ys for x in xs]
+        self.finished = False
+
+    def next_position(self, grid: EyeTestGrid) -> coordinates | None:
+        """The next position to measure, None when the field is known well enough"""
+        for position in self.coarse:
+            if not grid.score(position):
+                return position
+        scores = grid.all_scores()
+        for y in range(1, self._height + 1):
+            for x in range(1, self._width + 1):
+                if scores[y - 1][x - 1] is None and self._differs(scores, x, y):
+                    return coordinates(x, y)
+        self.finished = True
+        return None
+
+    def _differs(self, scores: list, x: int, y: int) -> bool:
+        """True if the measured scores around a position differ too much to interpolate"""
+        around = [
+            score
+            for row in scores[max(0, y - 1 - self._radius) : y + self._radius]
+            for score in row[max(0, x - 1 - self._radius) : x + self._radius]
+            if score is not None
+        ]
+        return not around or max(around) - min(around) > self._max_difference
+
+
+def interpolate(scores: list) -> tuple[list, list]:
+    """Fill the unmeasured positions of a score matrix from the nearest measured positions.
+
+    Uses inverse distance weighting of the measured positions in the smallest
+    square around a position that has any. Returns the filled scores, rounded to
+    whole sizes, and for each position whether it was interpolated.
+    """
+    height = len(scores)
+    width = len(scores[0]) if scores else 0
+    filled = [list(row) for row in scores]
+    interpolated = [[score is None for score in row] for row in scores]
+    if not any(score is not None for row in scores for score in row):
+        return filled, interpolated
+
+    for y, row in enumerate(scores):
+        for x, score in enumerate(row):
+            if score is not None:
+                continue
+            radius = 1
+            while True:
+                # weights 1 / distance^2 of the measured positions around
+                weights = [
+                    (1 / ((mx - x) ** 2 + (my - y) ** 2), other)
+                    for my in range(max(0, y - radius), min(height, y + radius + 1))
+                    for mx in range(max(0, x - radius), min(width, x + radius + 1))
+                    if (other := scores[my][mx]) is not None
+                ]
+                if weights:
+                    break
+                radius += 1
+            total = sum(weight for weight, _ in weights)
+            filled[y][x] = round(sum(weight * s for weight, s in weights) / total)
+    return filled, interpolated
@@ -0,0 +1,265 @@
+"""Scotoma detection: connected regions of abnormally high scores in a score grid.
+
+Usage: python scotoma.py ARCHIVE_DIR [--output FILE] [--threshold SIZE | --norms STATS_CSV]
+                         [--blind-spot X0,Y0,X1,Y1] [--jobs N]
+
+A position is abnormal when its score is above the norm: one size for all
+positions, or per position, e.g. the p95 column of the stats_WxH.csv that
+analysis.py writes for the same grid size. Abnormal positions that touch,
+also diagonally, form one region. A region inside the expected area of the
+physiological blind spot is reported as the blind spot, not as a scotoma.
+"""
+import argparse
+import csv
+import logging
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from archive import NOT_SCORED, find_score_files, read_scores
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 50
+
+# Where the blind spot is expected, as fractions of the grid width and height
+# (left, top, right, bottom). It depends on the screen distance, so configurable.
+BLIND_SPOT = (0.25, 0.35, 0.6, 0.75)
+# A blind spot region larger than this fraction of the grid also counts as scotoma
+BLIND_SPOT_MAX_FRACTION = 0.1
+
+
+@dataclass
+class Region:
+    """A connected region of abnormal scores; positions are 1-based like in EyeTestGrid"""
+
+    cells: int
+    left: int
+    top: int
+    right: int
+    bottom: int
+    mean_score: float
+    blind_spot: bool = False
+
+    @property
+    def centre(self) -> tuple[float, float]:
+        return (self.left + self.right) / 2, (self.top + self.bottom) / 2
+
+
+def abnormal_cells(scores: array, norms: int | array) -> array:
+    """1 for each scored position above its norm, else 0"""
+    if isinstance(norms, int):
+        return array("B", (s != NOT_SCORED and s > norms for s in scores))
+    return array(
+        "B",
+        (s != NOT_SCORED and s > norm for s, norm in zip(scores, norms, strict=True)),
+    )
+
+
+def label_regions(width: int, height: int, abnormal: array) -> tuple[array, int]:
+    """Label the 8-connected regions: per position its region number, 0 if normal
+
+    Two passes over the grid; the first gives each position the smallest label
+    of its neighbours above and to the left and merges labels that touch, the
+    second replaces each label by the one it was merged into.
+    """
+    labels = array("L", [0]) * (width * height)
+    parent = array("L", [0])  # parent[label], a label is a root if it is its own parent
+
+    def root(label: int) -> int:
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    for cell in range(width * height):
+        if not abnormal[cell]:
+            continue
+        y, x = divmod(cell, width)
+        neighbours = []
+        if x and labels[cell - 1]:
+            neighbours.append(labels[cell - 1])
+        if y:
+            above = cell - width
+            for dx in (-1, 0, 1):
+                if 0 <= x + dx < width and labels[above + dx]:
+                    neighbours.append(labels[above + dx])
+        if not neighbours:
+            parent.append(len(parent))
+            labels[cell] = len(parent) - 1
+            continue
+        roots = {root(label) for label in neighbours}
+        smallest = min(roots)
+        for other in roots:
+            parent[other] = smallest
+        labels[cell] = smallest
+
+    # number the regions 1, 2, ... in the order they are first found
+    numbers = array("L", [0]) * len(parent)
+    count = 0
+    for label in range(1, len(parent)):
+        if parent[label] == label:
+            count += 1
+            numbers[label] = count
+    for cell, label in enumerate(labels):
+        if label:
+            labels[cell] = numbers[root(label)]
+    return labels, count
+
+
+def find_regions(
+    width: int,
+    height: int,
+    scores: array,
+    norms: int | array = DEFAULT_THRESHOLD,
+    blind_spot: tuple[float, float, float, float] = BLIND_SPOT,
+) -> list[Region]:
+    """The regions of abnormal scores, largest first"""
+    labels, count = label_regions(width, height, abnormal_cells(scores, norms))
+    regions = [Region(0, width, height, 0, 0, 0.0) for _ in range(count)]
+    totals = [0] * count
+    for cell, label in enumerate(labels):
+        if not label:
+            continue
+        y, x = divmod(cell, width)
+        region = regions[label - 1]
+        region.cells += 1
+        region.left = min(region.left, x + 1)
+        region.right = max(region.right, x + 1)
+        region.top = min(region.top, y + 1)
+        region.bottom = max(region.bottom, y + 1)
+        totals[label - 1] += scores[cell]
+
+    left, top, right, bottom = blind_spot
+    for region, total in zip(regions, totals):
+        region.mean_score = total / region.cells
+        x, y = region.centre
+        region.blind_spot = (
+            left <= (x - 0.5) / width <= right
+            and top <= (y - 0.5) / height <= bottom
+            and region.cells <= BLIND_SPOT_MAX_FRACTION * width * height
+        )
+    return sorted(regions, key=lambda region: -region.cells)
+
+
+def grid_scores(all_scores: list[list[int | None]]) -> tuple[int, int, array]:
+    """Width, height and flat scores of EyeTestGrid.all_scores()"""
+    flat = array("H", (score or NOT_SCORED for row in all_scores for score in row))
+    return len(all_scores[0]), len(all_scores), flat
+
+
+def read_norms(path: str, column: str = "p95") -> array:
+    """Norms per position from a stats_WxH.csv written by analysis.py"""
+    with open(path, encoding="UTF8", newline="") as f:
+        rows = list(csv.DictReader(f, delimiter=";"))
+    # positions without statistics get the default threshold
+    return array(
+        "H",
+        (int(float(row[column])) if row[column] else DEFAULT_THRESHOLD for row in rows),
+    )
+
+
+HEADER = ["file", "scotomas", "scotoma_cells", "largest", "blind_spot"]
+
+
+def screen_files(
+    paths: list[str],
+    threshold: int = DEFAULT_THRESHOLD,
+    norms: dict[tuple[int, int], array] | None = None,
+    blind_spot: tuple[float, float, float, float] = BLIND_SPOT,
+) -> list[list]:
+    """One summary row per score file, see HEADER"""
+    rows = []
+    for path in paths:
+        try:
+            width, height, scores = read_scores(path)
+        except (OSError, ValueError) as e:
+            _LOGGER.warning("Skipping %s: %s", path, e)
+            continue
+        if not scores:
+            continue
+        norm = (norms or {}).get((width, height), threshold)
+        regions = find_regions(width, height, scores, norm, blind_spot)
+        scotomas = [region for region in regions if not region.blind_spot]
+        rows.append(
+            [
+                path,
+                len(scotomas),
+                sum(region.cells for region in scotomas),
+                scotomas[0].cells if scotomas else 0,
+                int(any(region.blind_spot for region in regions)),
+            ]
+        )
+    return rows
+
+
+def screen(
+    paths: list[str],
+    threshold: int = DEFAULT_THRESHOLD,
+    norms: dict[tuple[int, int], array] | None = None,
+    blind_spot: tuple[float, float, float, float] = BLIND_SPOT,
+    jobs: int | None = None,
+    chunk_size: int = 500,
+) -> list[list]:
+    """screen_files for chunks of files in parallel processes"""
+    chunks = [paths[i : i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    rows = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for partial in pool.map(
+            screen_files,
+            chunks,
+            [threshold] * len(chunks),
+            [norms] * len(chunks),
+            [blind_spot] * len(chunks),
+        ):
+            rows += partial
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("archive", help="directory with score_*.csv files")
+    parser.add_argument("--output", default="scotoma.csv", help="csv to write")
+    parser.add_argument(
+        "--threshold",
+        type=int,
+        default=DEFAULT_THRESHOLD,
+        help="sizes above this are abnormal (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--norms",
+        nargs="+",
+        default=[],
+        metavar="STATS_CSV",
+        help="stats_WxH.csv files of analysis.py, the p95 is the norm per position",
+    )
+    parser.add_argument(
+        "--blind-spot",
+        default=",".join(map(str, BLIND_SPOT)),
+        help="expected blind spot area as fractions left,top,right,bottom",
+    )
+    parser.add_argument(
+        "--jobs", type=int, help="number of processes (default: all cores)"
+    )
+    args = parser.parse_args(argv)
+
+    norms = {}
+    for path in args.norms:
+        size = path.rsplit("stats_", 1)[-1].removesuffix(".csv")
+        width, height = map(int, size.split("x"))
+        norms[width, height] = read_norms(path)
+    blind_spot = tuple(float(value) for value in args.blind_spot.split(","))
+
+    paths = find_score_files(args.archive)
+    _LOGGER.info("Screening %s score files", len(paths))
+    rows = screen(paths, args.threshold, norms, blind_spot, args.jobs)
+    with open(args.output, "w", encoding="UTF8", newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    _LOGGER.info("Written %s", args.output)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,301 @@
+"""Service hosting many eye test sessions at once, for thin display clients on the same machine.
+
+Usage: python service.py serve [--port PORT] [--export-dir DIR]
+       python service.py load [--sessions N] [--seconds S] [--speed MS]
+
+Each connection is one session. Clients send JSON lines with an event and its
+arguments, like a recording: {"event": "press_move", "args": ["F"]}. The service
+sends back every drawing operation on the session canvas as a JSON line, e.g.
+{"op": "itemconfigure", "item": 3, "options": {"state": "normal"}}, plus the
+size and status texts as {"op": "size", "text": ...} and {"op": "status", ...}.
+The blinker timers of all sessions run on the asyncio event loop.
+"""
+import argparse
+import asyncio
+import base64
+import concurrent.futures
+import itertools
+import json
+import logging
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+from canvas import HeadlessCanvas
+from recording import settings_args
+from replay import session_handlers
+from session import EyeTestSession
+from settings import UserSettings
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+
+# The results image at the end of a session is sent as one line
+MAX_LINE = 2**24
+
+
+class RemoteCanvas(HeadlessCanvas):
+    """Headless canvas sending each drawing operation to a display client, with timers on the event loop"""
+
+    def __init__(
+        self,
+        send: Callable[[dict], None],
+        loop: asyncio.AbstractEventLoop,
+        width: int = 1000,
+        height: int = 800,
+    ):
+        super().__init__(width, height)
+        self._send = send
+        self._loop = loop
+        self._handles: dict[str, asyncio.TimerHandle] = {}
+
+    def _create(self, kind: str, args, kw) -> int:
+        item_id = super()._create(kind, args, kw)
+        item = self.items[item_id]
+        self._send(
+            {
+                "op": "create",
+                "item": item_id,
+                "kind": kind,
+                "coords": item.coords,
+                "options": item.options,
+            }
+        )
+        return item_id
+
+    def create_image(self, *args, **kw) -> int:
+        # the display client makes a photo image of the ppm data
+        kw["image"] = base64.b64encode(kw["image"]).decode()
+        return self._create("image", args, kw)
+
+    def delete(self, *args) -> None:
+        super().delete(*args)
+        self._send({"op": "delete", "items": [a for a in args if a is not None]})
+
+    def coords(self, tag_or_id, *args) -> list:
+        result = super().coords(tag_or_id, *args)
+        if args:
+            self._send({"op": "coords", "item": tag_or_id, "coords": result})
+        return result
+
+    def move(self, tag_or_id, dx: float, dy: float) -> None:
+        super().move(tag_or_id, dx, dy)
+        self._send({"op": "move", "item": tag_or_id, "dx": dx, "dy": dy})
+
+    def scale(
+        self, tag_or_id, x: float, y: float, xscale: float, yscale: float
+    ) -> None:
+        super().scale(tag_or_id, x, y, xscale, yscale)
+        self._send(
+            {
+                "op": "scale",
+                "item": tag_or_id,
+                "origin": [x, y],
+                "scale": [xscale, yscale],
+            }
+        )
+
+    def itemconfigure(self, tag_or_id, **kw) -> Any:
+        super().itemconfigure(tag_or_id, **kw)
+        self._send({"op": "itemconfigure", "item": tag_or_id, "options": kw})
+
+    def after(self, ms: int, func: Callable, *args) -> str:
+        timer_id = f"after#{self._next_timer}"
+        self._next_timer += 1
+
+        def run():
+            del self._handles[timer_id]
+            func(*args)
+
+        self._handles[timer_id] = self._loop.call_later(ms / 1000, run)
+        return timer_id
+
+    def after_cancel(self, id: str) -> None:
+        handle = self._handles.pop(id, None)
+        if handle:
+            handle.cancel()
+
+    def cancel_all(self) -> None:
+        for handle in self._handles.values():
+            handle.cancel()
+        self._handles = {}
+
+
+class EyeTestService:
+    """Runs one EyeTestSession for each connected display client"""
+
+    def __init__(self, export_dir: str = "."):
+        self._export_dir = export_dir
+        self._numbers = itertools.count(1)
+        self.sessions: set[EyeTestSession] = set()
+
+    async def start(self, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        """Start listening on the loopback interface; port 0 picks a free port"""
+        return await asyncio.start_server(
+            self._serve_session, "127.0.0.1", port, backlog=1024
+        )
+
+    async def _serve_session(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        def send(message: dict) -> None:
+            if not writer.is_closing():
+                writer.write(json.dumps(message).encode() + b"\n")
+
+        loop = asyncio.get_running_loop()
+        # exports and the results image, made off the event loop
+        pending: set[asyncio.Future] = set()
+
+        def background(work: Callable[[], Any], done: Callable[[Any], None]) -> None:
+            def finished(future: asyncio.Future) -> None:
+                pending.discard(future)
+                try:
+                    result = future.result()
+                except Exception:
+                    _LOGGER.exception("Background work of a session failed")
+                else:
+                    done(result)
+
+            future = loop.run_in_executor(None, work)
+            pending.add(future)
+            future.add_done_callback(finished)
+
+        canvas = RemoteCanvas(send, loop)
+        session = EyeTestSession(
+            canvas,
+            show_size=lambda text: send({"op": "size", "text": text}),
+            show_status=lambda text: send({"op": "status", "text": text}),
+            export_dir=self._export_dir,
+            export_suffix=f"_{next(self._numbers)}",
+            background=background,
+        )
+        handlers = session_handlers(session)
+        self.sessions.add(session)
+        try:
+            while line := await reader.readline():
+                try:
+                    message = json.loads(line)
+                    event, args = message["event"], message.get("args", [])
+                    if event == "resize":
+                        canvas.width, canvas.height = args
+                    handlers[event](*args)
+                    if pending:
+                        await asyncio.wait(pending)
+                    if event == "end" and session.flips:
+                        send(
+                            {"op": "timing", "summary": session.flips.timings.summary()}
+                        )
+                except (ValueError, KeyError, TypeError) as e:
+                    _LOGGER.warning("Ignoring message %s: %s", line, e)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            canvas.cancel_all()
+            self.sessions.discard(session)
+            writer.close()
+
+
+async def _load_client(port: int, seconds: float, speed: int) -> dict[str, float]:
+    """A display client pressing space every second; returns the switch timing of its session"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=MAX_LINE)
+
+    def send(event: str, *args) -> None:
+        writer.write(json.dumps({"event": event, "args": args}).encode() + b"\n")
+
+    async def receive() -> dict[str, float]:
+        while line := await reader.readline():
+            message = json.loads(line)
+            if message["op"] == "timing":
+                return message["summary"]
+        return {}
+
+    receiving = asyncio.create_task(receive())
+    send("resize", 1000, 800)
+    settings = UserSettings(speed=speed, size_horizontal=10, size_vertical=10)
+    send("start", *settings_args(settings))
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        await asyncio.sleep(1)
+        send("press_space")
+    send("end")
+    timing = await receiving
+    writer.close()
+    return timing
+
+
+def _load_clients(
+    port: int, sessions: int, seconds: float, speed: int
+) -> list[dict[str, float]]:
+    """Run the clients of a load test, in a process of their own"""
+
+    async def clients():
+        return await asyncio.gather(
+            *(_load_client(port, seconds, speed) for _ in range(sessions))
+        )
+
+    return asyncio.run(clients())
+
+
+async def load_test(sessions: int, seconds: float, speed: int) -> dict[str, float]:
+    """Run a service with many simultaneous clients, reporting how well the switch timing held up
+
+    The clients run in another process, so the CPU time is that of the service:
+    its event loop and the threads writing the exports.
+    """
+    loop = asyncio.get_running_loop()
+    clients = concurrent.futures.ProcessPoolExecutor(1)
+    with tempfile.TemporaryDirectory() as export_dir, clients:
+        server = await EyeTestService(export_dir).start(0)
+        port = server.sockets[0].getsockname()[1]
+        cpu = time.process_time()
+        timings = await loop.run_in_executor(
+            clients, _load_clients, port, sessions, seconds, speed
+        )
+        cpu = time.process_time() - cpu
+        server.close()
+        await server.wait_closed()
+    return {
+        "sessions": sessions,
+        "seconds": seconds,
+        "expected_switches": seconds * 1000 // speed,
+        "min_switches": min(timing["flips"] for timing in timings),
+        "jitter_p95_ms": max(timing["jitter_p95_ms"] for timing in timings),
+        "jitter_max_ms": max(timing["jitter_max_ms"] for timing in timings),
+        "cpu_fraction": round(cpu / seconds, 3),
+        "cpu_ms_per_session": round(cpu * 1000 / sessions, 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the service")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--export-dir", default=".", help="directory for the exports")
+    load = commands.add_parser("load", help="run a local load test")
+    load.add_argument("--sessions", type=int, default=200)
+    load.add_argument("--seconds", type=float, default=10)
+    load.add_argument("--speed", type=int, default=500, help="switch interval in ms")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+
+        async def serve_forever():
+            server = await EyeTestService(args.export_dir).start(args.port)
+            _LOGGER.info("Listening on port %s", args.port)
+            await server.serve_forever()
+
+        asyncio.run(serve_forever())
+    else:
+        logging.getLogger().setLevel(logging.WARNING)
+        print(
+            json.dumps(asyncio.run(load_test(args.sessions, args.seconds, args.speed)))
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
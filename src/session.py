@@ -0,0 +1,626 @@
+"""The EyeTestSession runs the eye test on a canvas, independent of the window around it."""
+import csv
+import datetime
+import functools
+import itertools
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from blinker import Blinker
+from canvas import EyeTestCanvas
+from grid import EyeTestGrid, coordinates
+from heatmap import ResultsView, render_ppm
+from journal import ScoreJournal, read_journal, restored_grid
+from labels import ScoreLabels
+from latency import LatencyRecorder
+from livestats import LiveStatistics
+from logqueue import LogContext
+from profiling import HandlerProfiler
+from recording import Event, SessionRecorder, save_events, settings_args
+from sampling import CoarseToFine, interpolate
+from sessionfile import write_session
+from settings import UserSettings
+from staircase import Staircase
+from stimuli import StimulusSet
+from timing import FlipScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+# Handlers timed by the profiler
+PROFILED = (
+    "switch_blinker",
+    "press_bigger",
+    "press_smaller",
+    "press_space",
+    "press_move",
+    "press_stimulus",
+    "switch_stimuli",
+    "new_score",
+    "render",
+    "export_score",
+)
+
+# Numbers the journals, so tests started within the same second have their own
+_JOURNALS = itertools.count(1)
+
+# In the automatic mode, a size not reported within this many switches counts as not seen
+PRESENTATION_SWITCHES = 4
+
+
+def _ignore(text: str) -> None:
+    pass
+
+
+def _run_now(work: Callable[[], Any], done: Callable[[Any], None]) -> None:
+    done(work())
+
+
+@dataclass
+class SessionExport:
+    """The files of a finished test, copied from the session so they can be written anywhere"""
+
+    directory: str
+    name: str
+    settings: UserSettings
+    scores: list[list[int | None]]
+    started: datetime.datetime
+    ended: datetime.datetime
+    timing: dict[str, float]
+    field: bool = False
+    events: list[Event] | None = None
+    latency: list[list] | None = None
+
+    def _path(self, kind: str, extension: str = "csv") -> str:
+        return os.path.join(self.directory, f"{kind}_{self.name}.{extension}")
+
+    def write(self) -> None:
+        with open(self._path("score"), "w", encoding="UTF8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerows(self.scores)
+
+        if self.field:
+            # the whole field, interpolated positions are marked with ~
+            field, interpolated = interpolate(self.scores)
+            with open(self._path("field"), "w", encoding="UTF8", newline="") as f:
+                writer = csv.writer(f, delimiter=";")
+                for row, flags in zip(field, interpolated):
+                    writer.writerow(
+                        f"~{score}" if flag else score
+                        for score, flag in zip(row, flags)
+                    )
+
+        write_session(
+            self._path("session", "bin"),
+            self.settings,
+            self.scores,
+            self.started,
+            self.ended,
+        )
+
+        with open(self._path("timing"), "w", encoding="UTF8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerows(self.timing.items())
+
+        if self.events is not None:
+            save_events(self._path("events"), self.events)
+
+        if self.latency is not None:
+            with open(self._path("latency"), "w", encoding="UTF8", newline="") as f:
+                writer = csv.writer(f, delimiter=";")
+                writer.writerows(self.latency)
+
+
+class EyeTestSession:
+    """Grid, blinker and key handling of one eye test"""
+
+    def __init__(
+        self,
+        canvas: EyeTestCanvas,
+        show_size: Callable[[str], None] = _ignore,
+        show_status: Callable[[str], None] = _ignore,
+        show_statistics: Callable[[str], None] = _ignore,
+        export_dir: str = ".",
+        export_suffix: str = "",
+        background: Callable[
+            [Callable[[], Any], Callable[[Any], None]], None
+        ] = _run_now,
+        clock: Callable[[], float] = time.monotonic,
+        latency: LatencyRecorder | None = None,
+        journal: bool = False,
+        recorder: SessionRecorder | None = None,
+        log_context: LogContext | None = None,
+        results: ResultsView | None = None,
+        profiler: HandlerProfiler | None = None,
+    ):
+        self.canvas = canvas
+        self.settings = UserSettings()
+        self.started: datetime.datetime | None = None
+        self.grid: EyeTestGrid | None = None
+        self.labels: ScoreLabels | None = None
+        self.blinker: Blinker | None = None
+        self.flips: FlipScheduler | None = None
+        self.staircase: Staircase | None = None
+        self.stimuli: StimulusSet | None = None
+        self.sampler: CoarseToFine | None = None
+        self.statistics: LiveStatistics | None = None
+        self._switches_shown = 0
+        # Parts to redraw in the next render pass, see _invalidate
+        self._dirty: set[str] = set()
+        self._render_job: str | None = None
+        # Positions scored or left since the last render pass, they show their label again
+        self._labels_to_show: list[coordinates] = []
+        self._clock = clock
+        self.latency = latency
+        if latency:
+            # a key press is on screen when the render pass after it is done
+            latency.render_pending = lambda: self._render_job is not None
+        self._show_size = show_size
+        self._show_status = show_status
+        self._show_statistics = show_statistics
+        self._export_dir = export_dir
+        # Makes the export names unique when several sessions share export_dir
+        self._export_suffix = export_suffix
+        # Runs work, e.g. in a worker thread, and then calls done with its result
+        self._background = background
+        self._keep_journal = journal
+        self.journal: ScoreJournal | None = None
+        self.recorder = recorder
+        self._log_context = log_context
+        self.results = results or ResultsView(canvas)
+        self.profiler = profiler
+        if profiler:
+            for name in PROFILED:
+                setattr(self, name, profiler.wrap(name, getattr(self, name)))
+        self._scores_version = 0
+
+    @property
+    def testing(self) -> bool:
+        """True from the start until the end of the test"""
+        return self.blinker is not None or self.stimuli is not None
+
+    @property
+    def paused(self) -> bool:
+        """True if the test is started but the blinker is not switching"""
+        return self.testing and not self.flips.running
+
+    def _record(self, event: str, *args) -> None:
+        if self.recorder:
+            self.recorder.record(self._clock(), event, *args)
+
+    def start(self, settings: UserSettings) -> None:
+        """Create and start the blinker"""
+        settings = settings.limited()
+        if self.recorder:
+            self.recorder.reset()
+        self._record("start", *settings_args(settings))
+        grid = EyeTestGrid(
+            self.canvas, settings.size_horizontal, settings.size_vertical
+        )
+        journal = None
+        if self._keep_journal:
+            now = datetime.datetime.now().strftime("%Y-%m-%d %H%M%S")
+            name = f"journal_{now}_{os.getpid()}_{next(_JOURNALS)}.csv"
+            path = os.path.join(self._export_dir, name)
+            journal = ScoreJournal(path, settings)
+        self._begin(settings, grid, journal)
+
+    def resume(self, journal_path: str) -> UserSettings:
+        """Continue an interrupted test with the scores from its journal"""
+        settings, scores = read_journal(journal_path)
+        journal = ScoreJournal(journal_path) if self._keep_journal else None
+        self.restore(settings, scores, journal)
+        _LOGGER.info("Resumed %s, %s to go", journal_path, self.grid.to_go())
+        return self.settings
+
+    def restore(
+        self,
+        settings: UserSettings,
+        scores: list[tuple[coordinates, int]],
+        journal: ScoreJournal | None = None,
+    ) -> None:
+        """Continue a test with the scores it had; a recording starts with them"""
+        settings = settings.limited()
+        if self.recorder:
+            self.recorder.reset()
+        self._record(
+            "resume",
+            *settings_args(settings),
+            *(
+                value
+                for position, size in scores
+                for value in (position.x, position.y, size)
+            ),
+        )
+        self._begin(settings, restored_grid(settings, scores, self.canvas), journal)
+
+    def _begin(
+        self, settings: UserSettings, grid: EyeTestGrid, journal: ScoreJournal | None
+    ) -> None:
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        _LOGGER.info(f"Width = %s", width)
+        _LOGGER.info(f"Height = %s", height)
+
+        if self.flips:
+            self.flips.stop()
+        self._cancel_render()
+        self.close_journal()
+        self.results.hide()
+        self.canvas.focus_set()
+        self.canvas.delete("all")
+
+        self.settings = settings
+        self.started = datetime.datetime.now()
+        if self._log_context:
+            self._log_context.bind(
+                self.started.strftime("%Y-%m-%d %H%M%S"), lambda: self.grid.position
+            )
+        if self.latency:
+            self.latency.reset()
+
+        h = height / 2
+        self.canvas.create_oval(30, h - 10, 50, h + 10, fill="black", tags="fixation")
+
+        self.grid = grid
+        self.sampler = None
+        if self.settings.coarse_to_fine:
+            self.sampler = CoarseToFine(grid.size.x, grid.size.y)
+            if not self.grid.score():
+                self._move_next()
+        self.labels = ScoreLabels(self.canvas, self.grid)
+        self.labels.show_all()
+        self.grid.score_listeners.append(self._scores_changed)
+        self.statistics = LiveStatistics(grid.size.x, grid.size.y)
+        for y, row in enumerate(grid.all_scores(), start=1):
+            for x, score in enumerate(row, start=1):
+                if score:
+                    self.statistics.add(coordinates(x, y), score)
+        self.grid.score_listeners.append(self.statistics.add)
+        self.journal = journal
+        if self.journal:
+            self.grid.score_listeners.append(self.journal.record)
+
+        self.blinker = None
+        self.flips = None
+        self.staircase = None
+        self.stimuli = None
+        self._labels_to_show = []
+        if self.settings.stimuli > 1:
+            self._start_stimuli()
+        else:
+            self.blinker = Blinker(
+                self.canvas, self.settings.thickness, self.grid.screen_position()
+            )
+            self.flips = FlipScheduler(
+                self.canvas, self.settings.speed, self.switch_blinker, self._clock
+            )
+            if self.settings.automatic:
+                self._start_staircase()
+            self._show_size(f"Grootte = {str(self.blinker.size)}")
+        self.flips.start()
+        self.report_status()
+        self._show_statistics(self.statistics.summary())
+
+    def resize(self, width: int, height: int) -> None:
+        """Move everything on the canvas to its place on the resized canvas"""
+        self._record("resize", width, height)
+        if not self.grid:
+            return
+        old_width, old_height = self.grid.screen_size
+        if (width, height) == (old_width, old_height):
+            return
+        self.grid.resize(width, height)
+        if old_width and old_height:
+            # Grid positions scale with the canvas, relative to the left margin
+            self.canvas.scale("score", 40, 0, width / old_width, height / old_height)
+            self.canvas.move("fixation", 0, (height - old_height) / 2)
+        if self.blinker:
+            self.blinker.move(self.grid.screen_position())
+        if self.stimuli:
+            self.stimuli.update()
+        if self.results.visible:
+            self.show_results()
+
+    def _scores_changed(self, position: coordinates, size: int) -> None:
+        self._scores_version += 1
+
+    def show_results(self) -> None:
+        """Show the scores so far as heatmap over the test"""
+        if self.grid:
+            key = (self.started, self._scores_version)
+            self.results.show(key, self.grid.all_scores())
+
+    def _show_final_results(self) -> None:
+        """The results at the end of the test, rendered by `background`"""
+        started = self.started
+        key = (started, self._scores_version)
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+
+        def show(ppm: bytes) -> None:
+            self.results.add(key, width, height, ppm)
+            # unless a new test started in the meantime
+            if self.started == started and not self.testing:
+                self.show_results()
+
+        work = functools.partial(render_ppm, self.grid.all_scores(), width, height)
+        self._background(work, show)
+
+    def toggle_results(self) -> None:
+        """Switch between the test and its results"""
+        if self.results.visible:
+            self.results.hide()
+        else:
+            self.show_results()
+
+    def _invalidate(self, *parts: str) -> None:
+        """Mark parts ("blinker", "labels", "status", "size") for the next render pass
+
+        The key handlers only change the state of the test and mark what changed,
+        so a burst of key presses, like a held key, costs one redraw.
+        """
+        self._dirty.update(parts)
+        if self._render_job is None:
+            # Tk handles the key presses already queued before this timer
+            self._render_job = self.canvas.after(0, self.render)
+
+    def _cancel_render(self) -> None:
+        if self._render_job is not None:
+            self.canvas.after_cancel(self._render_job)
+            self._render_job = None
+        self._dirty = set()
+
+    def render(self) -> None:
+        """Redraw the parts that changed since the last render pass"""
+        dirty = self._dirty
+        self._cancel_render()
+        if not self.grid:
+            return
+        if "labels" in dirty:
+            shown = [
+                position
+                for position in self._labels_to_show
+                if self.stimuli or position != self.grid.position
+            ]
+            self._labels_to_show = []
+            if shown and not self.stimuli:
+                self.labels.follow()
+            for position in shown:
+                self.labels.show(position)
+            if not self.stimuli:
+                # the current position is hidden, so the blinker can be seen clearly
+                self.labels.hide()
+        if "blinker" in dirty and self.blinker:
+            self.blinker.move(self.grid.screen_position())
+        if "blinker" in dirty and self.stimuli:
+            self.stimuli.update()
+        if "size" in dirty and self.blinker:
+            self._show_size(f"Grootte = {str(self.blinker.size)}")
+        if "size" in dirty and self.stimuli:
+            self._show_size(f"Grootte = {self.stimuli.sizes()}")
+        if "status" in dirty:
+            self.report_status()
+            self._show_statistics(self.statistics.summary())
+        if self.latency:
+            self.latency.rendered()
+
+    def close_journal(self) -> str | None:
+        """Write the journal to disk and close it, returning its path
+
+        The journal of an unfinished test is kept, so the test can be resumed.
+        """
+        if not self.journal:
+            return None
+        path = self.journal.path
+        self.journal.close()
+        self.journal = None
+        return path
+
+    def end(self) -> None:
+        """Everything done"""
+        if self.testing:
+            self._record("end")
+            self.render()
+            self.flips.stop()
+            if self.blinker:
+                self.blinker.clear()
+            if self.stimuli:
+                self.stimuli.remove_all()
+            self.blinker = None
+            self.stimuli = None
+            self.staircase = None
+            journal = self.close_journal()
+            self.export_score(journal)
+            if self.profiler and self.profiler.handlers:
+                now = datetime.datetime.now().strftime("%Y-%m-%d %H%M%S")
+                name = f"profile_{now}{self._export_suffix}.txt"
+                self.profiler.dump(os.path.join(self._export_dir, name))
+                self.profiler.reset()
+            self._show_final_results()
+            if self._log_context:
+                self._log_context.clear()
+
+    def pause(self) -> None:
+        """Pause the test or continue if paused"""
+        self._record("pause")
+        if self.testing:
+            if self.flips.running:
+                self.flips.stop()
+                if self.blinker:
+                    self.blinker.clear()
+                if self.stimuli:
+                    self.stimuli.clear()
+            else:
+                self.flips.start()
+
+    def switch_blinker(self):
+        """Switch the orientation of the blinker, called by the flip scheduler"""
+        self.blinker.switch()
+        if self.staircase:
+            self._switches_shown += 1
+            if self._switches_shown >= PRESENTATION_SWITCHES:
+                self._respond(seen=False)
+
+    def _start_stimuli(self) -> None:
+        """Several blinkers at once, each with its own staircase, switched in turn by one timer"""
+        self.stimuli = StimulusSet(
+            self.canvas,
+            self.grid,
+            self.settings.thickness,
+            self.settings.stimuli,
+            PRESENTATION_SWITCHES,
+            self._stimulus_scored,
+        )
+        self.flips = FlipScheduler(
+            self.canvas,
+            self.settings.speed / len(self.stimuli.stimuli),
+            self.switch_stimuli,
+            self._clock,
+        )
+        self._invalidate("blinker", "size")
+
+    def switch_stimuli(self) -> None:
+        """Switch the next stimulus, called by the flip scheduler"""
+        if self.stimuli.flip():
+            self._invalidate("blinker", "size", "status")
+
+    def _stimulus_scored(self, position: coordinates) -> None:
+        self._labels_to_show.append(position)
+        self._invalidate("labels")
+
+    def press_stimulus(self, number: int) -> None:
+        """Report that the stimulus with this number is seen"""
+        self._record("press_stimulus", number)
+        if self.stimuli and not self.paused and self.stimuli.respond(number):
+            self._invalidate("blinker", "size", "status")
+
+    def _start_staircase(self) -> None:
+        """Find the threshold at the current position automatically"""
+        self.staircase = Staircase(start=self.blinker.size)
+        self._present()
+
+    def _present(self) -> None:
+        """Show the next size of the staircase"""
+        self.blinker.size = self.staircase.size
+        self._switches_shown = 0
+        self._invalidate("blinker", "size")
+
+    def _respond(self, seen: bool) -> None:
+        """Process the response in the automatic mode, keeping the score when the threshold is found"""
+        self.staircase.respond(seen)
+        if not self.staircase.done:
+            self._present()
+            return
+
+        _LOGGER.info(
+            "Threshold %s for %s after %s presentations",
+            self.staircase.threshold,
+            self.grid.position,
+            self.staircase.presentations,
+        )
+        self.blinker.size = self.staircase.threshold
+        self.new_score()
+        self._leave()
+        if self._move_next():
+            self._start_staircase()
+        else:
+            self.staircase = None
+        self._invalidate("labels", "blinker", "status")
+
+    def press_bigger(self) -> None:
+        """Make size bigger"""
+        self._record("press_bigger")
+        if self.blinker and not self.settings.automatic:
+            self.blinker.increase_size()
+            self._invalidate("blinker", "size")
+
+    def press_smaller(self) -> None:
+        """Make size smaller"""
+        self._record("press_smaller")
+        if self.blinker and not self.settings.automatic:
+            self.blinker.decrease_size()
+            self._invalidate("blinker", "size")
+
+    def press_space(self) -> None:
+        """Report size, or in the automatic mode that the current size is seen"""
+        self._record("press_space")
+        if self.settings.automatic:
+            if self.staircase and not self.paused:
+                self._respond(seen=True)
+        elif self.blinker:
+            self.new_score()
+            self._leave()
+            self._move_next()
+            self._invalidate("labels", "blinker", "status")
+
+    def _leave(self) -> None:
+        """The current position shows its label again from the next render pass"""
+        self._labels_to_show.append(self.grid.position)
+
+    def _move_next(self) -> bool:
+        """Move to the next position to measure. Returns False if there is none"""
+        if not self.sampler:
+            return self.grid.move("F")
+        position = self.sampler.next_position(self.grid)
+        if position is None:
+            return False
+        self.grid.position = position
+        return True
+
+    def press_move(self, direction: str) -> None:
+        """Move through the grid in the given direction (see EyeTestGrid.move)"""
+        self._record("press_move", direction)
+        if self.blinker:
+            self._leave()
+            self.grid.move(direction)
+            if self.settings.automatic:
+                self._start_staircase()
+            self._invalidate("labels", "blinker", "status")
+
+    def export_score(self, journal: str | None = None) -> None:
+        """Export the score to a csv file, with a session file and the measured timing next to it.
+
+        The files are written by `background`, from a copy of the session state.
+        The journal of the test is removed once they are written.
+        """
+        ended = datetime.datetime.now()
+        export = SessionExport(
+            self._export_dir,
+            ended.strftime("%Y-%m-%d %H%M%S") + self._export_suffix,
+            self.settings,
+            self.grid.all_scores(),
+            self.started,
+            ended,
+            self.flips.timings.summary(),
+            field=self.sampler is not None,
+            events=list(self.recorder.events) if self.recorder else None,
+            latency=self.latency.rows() if self.latency else None,
+        )
+        self._background(export.write, functools.partial(self._exported, journal))
+
+    def _exported(self, journal: str | None, _) -> None:
+        if journal:
+            os.remove(journal)
+        if not self.testing:
+            self._show_size("Klaar! Export is gemaakt.")
+
+    def new_score(self):
+        """Keep the score, its label is shown once the test moves on"""
+        self.grid.keep_score(self.blinker.size, self.grid.score_lbl_id())
+
+    def report_status(self):
+        if self.grid and self.stimuli:
+            if self.grid.to_go() == 0:
+                self._show_status(f"Allemaal gedaan!")
+            else:
+                self._show_status(f"Nog {self.grid.to_go()} te gaan")
+        elif self.grid:
+            score = self.grid.score()
+            if score:
+                self._show_status(f"Deze is al gedaan")
+                if self.grid.to_go() == 0 or (self.sampler and self.sampler.finished):
+                    self._show_status(f"Allemaal gedaan!")
+            else:
+                self._show_status(f"Deze moet nog")
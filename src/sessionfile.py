@@ -0,0 +1,212 @@
+"""Binary session files: settings, grid size, times and scores as fixed-width values.
+
+A session file is a fixed header followed by the scores as unsigned 16 bit
+values, row by row, 0 where not scored. All values are little-endian, so the
+scores of a memory-mapped file can be used directly as an array.
+"""
+import datetime
+import glob
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator
+
+from settings import UserSettings
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"KOOT"
+VERSION = 2
+# magic, version, thickness, speed, size horizontal, size vertical, width, height, started, ended
+_HEADER_V1 = struct.Struct("<4sHHIHHHHqq")
+# version 2 adds the test mode: flags and the number of stimuli
+_HEADER = struct.Struct("<4sHHIHHHHqqBB")
+HEADER_SIZE = _HEADER.size
+_AUTOMATIC = 1
+_COARSE_TO_FINE = 2
+
+
+@dataclass
+class SessionRecord:
+    """A session read from a session file; `scores` is a view on the file when memory-mapped"""
+
+    settings: UserSettings
+    width: int
+    height: int
+    started: datetime.datetime
+    ended: datetime.datetime
+    scores: memoryview | array
+    # the memory map of a mapped session file, see close
+    mapping: mmap.mmap | None = field(default=None, repr=False)
+
+    def row(self, y: int):
+        """Scores of a grid row, 1 is the top row"""
+        return self.scores[(y - 1) * self.width : y * self.width]
+
+    def close(self) -> None:
+        """Unmap a mapped session file; its scores can no longer be used"""
+        if self.mapping is not None:
+            if isinstance(self.scores, memoryview):
+                self.scores.release()
+            self.mapping.close()
+            self.mapping = None
+
+
+def _timestamp(moment: datetime.datetime) -> int:
+    return round(moment.timestamp() * 1000)
+
+
+def _moment(timestamp: int) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(timestamp / 1000)
+
+
+def write_session(
+    path: str,
+    settings: UserSettings,
+    scores: list,
+    started: datetime.datetime,
+    ended: datetime.datetime,
+) -> None:
+    """Write a session file; scores is a list of rows with None where not scored"""
+    height = len(scores)
+    width = len(scores[0]) if scores else 0
+    values = array("H", (score or 0 for row in scores for score in row))
+    if sys.byteorder != "little":
+        values.byteswap()
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        settings.thickness,
+        settings.speed,
+        settings.size_horizontal,
+        settings.size_vertical,
+        width,
+        height,
+        _timestamp(started),
+        _timestamp(ended),
+        settings.automatic * _AUTOMATIC | settings.coarse_to_fine * _COARSE_TO_FINE,
+        settings.stimuli,
+    )
+    with open(path, "wb") as f:
+        f.write(header)
+        f.write(values.tobytes())
+
+
+def _record(buffer) -> SessionRecord:
+    if len(buffer) < _HEADER_V1.size:
+        raise ValueError("Not a session file, too short")
+    magic, version = struct.unpack_from("<4sH", buffer)
+    if magic != MAGIC:
+        raise ValueError("Not a session file")
+    if version == 1:
+        # written before the test mode was kept: a manual test with one blinker
+        header = _HEADER_V1
+        flags, stimuli = 0, 1
+    elif version == VERSION:
+        header = _HEADER
+        if len(buffer) < header.size:
+            raise ValueError("Not a session file, too short")
+        *_, flags, stimuli = header.unpack_from(buffer)
+    else:
+        raise ValueError(f"Unsupported session file version {version}")
+    (
+        _,
+        _,
+        thickness,
+        speed,
+        horizontal,
+        vertical,
+        width,
+        height,
+        started,
+        ended,
+    ) = header.unpack_from(buffer)[:10]
+    end = header.size + 2 * width * height
+    if len(buffer) < end:
+        raise ValueError("Session file is truncated")
+    scores = memoryview(buffer)[header.size : end].cast("H")
+    if sys.byteorder != "little":
+        scores = array("H", scores)
+        scores.byteswap()
+    settings = UserSettings(
+        thickness,
+        speed,
+        horizontal,
+        vertical,
+        automatic=bool(flags & _AUTOMATIC),
+        coarse_to_fine=bool(flags & _COARSE_TO_FINE),
+        stimuli=stimuli,
+    )
+    return SessionRecord(
+        settings,
+        width,
+        height,
+        _moment(started),
+        _moment(ended),
+        scores,
+    )
+
+
+def read_session(path: str) -> SessionRecord:
+    """Read a session file into memory"""
+    with open(path, "rb") as f:
+        record = _record(f.read())
+    record.scores = array("H", record.scores)
+    return record
+
+
+def map_session(path: str) -> SessionRecord:
+    """Memory-map a session file; the scores stay on disk until used or closed
+
+    The mapping holds a file descriptor until the record is closed.
+    """
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        record = _record(mapping)
+    except ValueError:
+        mapping.close()
+        raise
+    record.mapping = mapping
+    return record
+
+
+def map_sessions(directory: str) -> Iterator[SessionRecord]:
+    """Memory-map the session files in a directory and its subdirectories, one at a time
+
+    Each record is closed when the next one is asked for, so any number of
+    files can be scanned. Damaged files are skipped.
+    """
+    paths = glob.glob(os.path.join(directory, "**", "session_*.bin"), recursive=True)
+    for path in sorted(paths):
+        try:
+            record = map_session(path)
+        except (OSError, ValueError) as e:
+            _LOGGER.warning("Skipping %s: %s", path, e)
+            continue
+        try:
+            yield record
+        finally:
+            record.close()
+
+
+def score_totals(
+    records: Iterable[SessionRecord],
+) -> dict[tuple[int, int], tuple[array, array]]:
+    """Per grid size, the sum of the scores and the number of scores of each grid point"""
+    totals: dict[tuple[int, int], tuple[array, array]] = {}
+    for record in records:
+        geometry = record.width, record.height
+        if geometry not in totals:
+            cells = record.width * record.height
+            totals[geometry] = array("Q", [0]) * cells, array("L", [0]) * cells
+        sums, counts = totals[geometry]
+        for cell, score in enumerate(record.scores):
+            if score:
+                sums[cell] += score
+                counts[cell] += 1
+    return totals
@@ -1,6 +1,20 @@
 """Class for storing user settings"""
+import dataclasses
 from dataclasses import dataclass
 
+# Most stimuli at once, one number key each
+MAX_STIMULI = 9
+
+# Smallest and largest value of the numeric settings: what the test can show
+# and what a session file can hold
+LIMITS = {
+    "thickness": (1, 100),
+    "speed": (1, 60_000),
+    "size_horizontal": (1, 1000),
+    "size_vertical": (1, 1000),
+    "stimuli": (1, MAX_STIMULI),
+}
+
 
 @dataclass
 class UserSettings:
@@ -8,3 +22,16 @@ class UserSettings:
     speed: int = 500
     size_horizontal: int = 5
     size_vertical: int = 3
+    automatic: bool = False
+    coarse_to_fine: bool = False
+    stimuli: int = 1
+
+    def limited(self) -> "UserSettings":
+        """These settings with each numeric value brought within its LIMITS"""
+        return dataclasses.replace(
+            self,
+            **{
+                name: min(max(getattr(self, name), low), high)
+                for name, (low, high) in LIMITS.items()
+            },
+        )
@@ -0,0 +1,55 @@
+"""Staircase for finding the smallest blinker size that is still seen at a grid position."""
+from blinker import MAX_SIZE, MIN_SIZE
+
+
+class Staircase:
+    """Adaptive staircase: smaller after `seen`, bigger after `not seen`, halving the step at each reversal.
+
+    The staircase is done at a reversal with step 1, when the size can not change
+    anymore, or after `max_presentations`. The threshold is the last size seen, or
+    the maximum size if nothing was seen.
+    """
+
+    def __init__(
+        self,
+        start: int = 10,
+        step: int = 8,
+        min_size: int = MIN_SIZE,
+        max_size: int = MAX_SIZE,
+        max_presentations: int = 20,
+    ):
+        self._min_size = min_size
+        self._max_size = max_size
+        self._max_presentations = max_presentations
+        self._step = step
+        self._last_response: bool | None = None
+        self._last_seen: int | None = None
+        self.size = min(max(start, min_size), max_size)
+        self.presentations = 0
+        self.done = False
+
+    @property
+    def threshold(self) -> int:
+        return self._last_seen if self._last_seen is not None else self._max_size
+
+    def respond(self, seen: bool) -> None:
+        """Process the response to the current size and choose the next size"""
+        if self.done:
+            return
+        self.presentations += 1
+        if seen:
+            self._last_seen = self.size
+
+        if self._last_response is not None and seen != self._last_response:
+            if self._step == 1:
+                self.done = True
+            self._step = max(1, self._step // 2)
+        self._last_response = seen
+
+        if seen:
+            next_size = max(self.size - self._step, self._min_size)
+        else:
+            next_size = min(self.size + self._step, self._max_size)
+        if next_size == self.size or self.presentations >= self._max_presentations:
+            self.done = True
+        self.size = next_size
@@ -0,0 +1,82 @@
+"""Timing of the application start, from process start to the first frame on screen."""
+import csv
+import logging
+import os
+import sys
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def process_age() -> float | None:
+    """Seconds since this process was started, if the platform tells"""
+    try:
+        if sys.platform.startswith("linux"):
+            with open("/proc/self/stat", encoding="ascii") as f:
+                # the fields after the process name, which is between brackets
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open("/proc/uptime", encoding="ascii") as f:
+                uptime = float(f.read().split()[0])
+            return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        if sys.platform == "win32":
+            import ctypes
+            from ctypes import wintypes
+
+            kernel32 = ctypes.windll.kernel32
+            created, exited, kernel, user, now = (wintypes.FILETIME() for _ in range(5))
+            kernel32.GetProcessTimes(
+                kernel32.GetCurrentProcess(),
+                ctypes.byref(created),
+                ctypes.byref(exited),
+                ctypes.byref(kernel),
+                ctypes.byref(user),
+            )
+            kernel32.GetSystemTimeAsFileTime(ctypes.byref(now))
+            ticks = lambda t: (t.dwHighDateTime << 32) | t.dwLowDateTime
+            return (ticks(now) - ticks(created)) / 10_000_000  # 100 ns ticks
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    return None
+
+
+class StartupTimer:
+    """Keeps the moments the start of the application reaches each step"""
+
+    def __init__(self, started: float | None = None):
+        """`started` is the time.perf_counter() at the very start of main, if taken earlier"""
+        now = time.perf_counter()
+        age = process_age()
+        self.process_start_known = age is not None
+        # Without the process start time, the times count from the start of main
+        self._origin = now - age if age is not None else started or now
+        self.marks: list[tuple[str, float]] = []
+        if age is not None:
+            self.marks.append(("process started", self._origin))
+        self.marks.append(("main started", started or now))
+
+    def mark(self, step: str) -> None:
+        self.marks.append((step, time.perf_counter()))
+
+    def rows(self) -> list[list]:
+        """For each step the ms since the start and since the previous step, with a header row"""
+        rows = [["step", "since_start_ms", "step_ms"]]
+        previous = self._origin
+        for step, moment in self.marks:
+            rows.append(
+                [
+                    step,
+                    round((moment - self._origin) * 1000, 1),
+                    round((moment - previous) * 1000, 1),
+                ]
+            )
+            previous = moment
+        return rows
+
+    def report(self, path: str | None = None) -> None:
+        """Log the startup times, and write them to a csv file if a path is given"""
+        for step, since_start, step_ms in self.rows()[1:]:
+            _LOGGER.info("Startup: %s after %s ms (+%s ms)", step, since_start, step_ms)
+        if path:
+            with open(path, "w", encoding="UTF8", newline="") as f:
+                writer = csv.writer(f, delimiter=";")
+                writer.writerows(self.rows())
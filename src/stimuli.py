@@ -0,0 +1,154 @@
+"""Several blinkers at once, each finding the threshold at its own grid position."""
+import logging
+from typing import Callable
+
+from blinker import Blinker
+from canvas import EyeTestCanvas
+from grid import EyeTestGrid, coordinates
+from settings import MAX_STIMULI
+from staircase import Staircase
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Stimulus:
+    """One blinker with its number, grid position and staircase"""
+
+    def __init__(
+        self, canvas: EyeTestCanvas, number: int, thickness: int, position: coordinates
+    ):
+        self.number = number
+        self.position = position
+        self.staircase = Staircase()
+        self.switches_shown = 0
+        self.blinker = Blinker(canvas, thickness, coordinates(0, 0))
+        self.blinker.size = self.staircase.size
+        self.label = canvas.create_text(
+            0, 0, text=str(number), fill="white", font="Arial 10", tags="stimulus"
+        )
+
+
+class StimulusSet:
+    """Stimuli at different grid positions, switched in turn by one shared timer
+
+    With `count` stimuli the flip scheduler calls `flip` every speed / count ms,
+    so each stimulus still switches once per speed, with the phases spread
+    evenly. A stimulus works like the automatic mode: the number key of a
+    stimulus means seen, no response within `switches` of its switches means
+    not seen. When its staircase is done, the threshold is kept and the
+    stimulus moves to the free position furthest from the other stimuli.
+    """
+
+    def __init__(
+        self,
+        canvas: EyeTestCanvas,
+        grid: EyeTestGrid,
+        thickness: int,
+        count: int,
+        switches: int,
+        on_score: Callable[[coordinates], None],
+    ):
+        self._canvas = canvas
+        self._grid = grid
+        self._switches = switches
+        self._on_score = on_score
+        self._turn = 0
+        self.stimuli: list[Stimulus | None] = []
+        for number in range(1, min(count, MAX_STIMULI) + 1):
+            position = self._free_position()
+            self.stimuli.append(
+                Stimulus(canvas, number, thickness, position) if position else None
+            )
+
+    @property
+    def active(self) -> list[Stimulus]:
+        return [stimulus for stimulus in self.stimuli if stimulus]
+
+    def _free_position(self) -> coordinates | None:
+        """The position not scored and not tested, furthest from the other stimuli"""
+        taken = {stimulus.position for stimulus in self.active}
+        best, best_distance = None, -1
+        size = self._grid.size
+        for y in range(1, size.y + 1):
+            for x in range(1, size.x + 1):
+                position = coordinates(x, y)
+                if position in taken or self._grid.score(position):
+                    continue
+                distance = min(
+                    ((x - other.x) ** 2 + (y - other.y) ** 2 for other in taken),
+                    default=0,
+                )
+                if distance > best_distance:
+                    best, best_distance = position, distance
+        return best
+
+    def flip(self) -> bool:
+        """Switch the next stimulus in turn; True if it was not seen in time"""
+        if not self.stimuli:
+            return False
+        stimulus = self.stimuli[self._turn]
+        self._turn = (self._turn + 1) % len(self.stimuli)
+        if not stimulus:
+            return False
+        stimulus.blinker.switch()
+        stimulus.switches_shown += 1
+        if stimulus.switches_shown >= self._switches:
+            return self.respond(stimulus.number, seen=False)
+        return False
+
+    def respond(self, number: int, seen: bool = True) -> bool:
+        """The response to a stimulus; False if there is no such stimulus"""
+        if not 1 <= number <= len(self.stimuli) or not self.stimuli[number - 1]:
+            return False
+        stimulus = self.stimuli[number - 1]
+        stimulus.switches_shown = 0
+        stimulus.staircase.respond(seen)
+        if not stimulus.staircase.done:
+            stimulus.blinker.size = stimulus.staircase.size
+            return True
+
+        threshold = stimulus.staircase.threshold
+        _LOGGER.info(
+            "Threshold %s for %s by stimulus %s", threshold, stimulus.position, number
+        )
+        self._grid.position = stimulus.position
+        self._grid.keep_score(threshold, self._grid.score_lbl_id())
+        self._on_score(stimulus.position)
+
+        position = self._free_position()
+        if position is None:
+            self._remove(stimulus)
+        else:
+            stimulus.position = position
+            stimulus.staircase = Staircase()
+            stimulus.blinker.size = stimulus.staircase.size
+        return True
+
+    def _remove(self, stimulus: Stimulus) -> None:
+        stimulus.blinker.clear()
+        self._canvas.delete(stimulus.label)
+        self.stimuli[stimulus.number - 1] = None
+
+    @property
+    def finished(self) -> bool:
+        return not self.active
+
+    def update(self) -> None:
+        """Move the blinkers and numbers to their positions, with their sizes"""
+        for stimulus in self.active:
+            screen = self._grid.screen_position(stimulus.position)
+            stimulus.blinker.move(screen)
+            offset = stimulus.blinker.size + 8
+            self._canvas.coords(stimulus.label, screen.x + offset, screen.y - offset)
+
+    def clear(self) -> None:
+        """Hide all stimuli, e.g. while paused"""
+        for stimulus in self.active:
+            stimulus.blinker.clear()
+
+    def remove_all(self) -> None:
+        for stimulus in self.active:
+            self._remove(stimulus)
+
+    def sizes(self) -> str:
+        return " / ".join(str(stimulus.blinker.size) for stimulus in self.active)
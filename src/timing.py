@@ -0,0 +1,96 @@
+"""Drift-free timer for switching the blinker, keeping track of the actual switch intervals."""
+import statistics
+import time
+from array import array
+from typing import Callable
+
+from canvas import EyeTestCanvas
+
+
+class FlipTimings:
+    """The measured intervals between switches in ms"""
+
+    def __init__(self, period_ms: int):
+        self.period_ms = period_ms
+        self.intervals = array("d")
+
+    def add(self, interval_ms: float) -> None:
+        self.intervals.append(interval_ms)
+
+    def summary(self) -> dict[str, float]:
+        """Interval and jitter (deviation from the period) statistics in ms"""
+        summary: dict[str, float] = {
+            "period_ms": self.period_ms,
+            "flips": len(self.intervals),
+        }
+        if not self.intervals:
+            return summary
+        jitter = [abs(interval - self.period_ms) for interval in self.intervals]
+        summary.update(
+            interval_min_ms=min(self.intervals),
+            interval_mean_ms=statistics.fmean(self.intervals),
+            interval_p95_ms=_p95(self.intervals),
+            interval_max_ms=max(self.intervals),
+            jitter_mean_ms=statistics.fmean(jitter),
+            jitter_p95_ms=_p95(jitter),
+            jitter_max_ms=max(jitter),
+        )
+        return summary
+
+
+def _p95(values) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=20, method="inclusive")[18]
+
+
+class FlipScheduler:
+    """Calls `func` every `period_ms`, aiming at absolute deadlines so delays do not add up"""
+
+    def __init__(
+        self,
+        canvas: EyeTestCanvas,
+        period_ms: int,
+        func: Callable[[], None],
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._canvas = canvas
+        self._period = period_ms / 1000
+        self._func = func
+        self._clock = clock
+        self._after_id = None
+        self._deadline = 0.0
+        self._last_flip: float | None = None
+        self.timings = FlipTimings(period_ms)
+
+    @property
+    def running(self) -> bool:
+        return self._after_id is not None
+
+    def start(self) -> None:
+        """Start switching, the first switch is one period from now"""
+        self.stop()
+        self._last_flip = self._clock()
+        self._deadline = self._last_flip + self._period
+        self._arm()
+
+    def stop(self) -> None:
+        if self._after_id:
+            self._canvas.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _arm(self) -> None:
+        delay = max(0, round((self._deadline - self._clock()) * 1000))
+        self._after_id = self._canvas.after(delay, self._flip)
+
+    def _flip(self) -> None:
+        now = self._clock()
+        self.timings.add((now - self._last_flip) * 1000)
+        self._last_flip = now
+        self._func()
+
+        # Aim at the next deadline; when a whole period was missed, skip it instead of catching up
+        self._deadline += self._period
+        while self._deadline <= now:
+            self._deadline += self._period
+        self._arm()
@@ -0,0 +1,215 @@
+"""Trend of one patient's visual field over the sessions in their export directory.
+
+Usage: python trend.py PATIENT_DIR [--output OUTPUT_DIR]
+"""
+import argparse
+import csv
+import datetime
+import functools
+import logging
+import os
+from array import array
+
+from archive import NOT_SCORED, find_score_files, read_scores
+
+_LOGGER = logging.getLogger(__name__)
+
+# Parsed score files kept in memory, for comparing sessions
+CACHE_SIZE = 32
+
+_DAYS_PER_YEAR = 365.25
+
+# No slope for a grid point whose scores are closer together in time: tests
+# repeated on one visit would give a huge change per year
+MIN_SPAN_DAYS = 1
+
+
+def session_time(path: str) -> datetime.datetime:
+    """The moment of a session, from its export name like 'score_2024-05-01 101500.csv'
+
+    Service exports have a session number after the time: 'score_2024-05-01 101500_3.csv'.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    try:
+        return datetime.datetime.strptime(
+            "_".join(name.split("_")[:2]), "score_%Y-%m-%d %H%M%S"
+        )
+    except ValueError:
+        # renamed exports: the time the file was written
+        return datetime.datetime.fromtimestamp(os.path.getmtime(path))
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _cached_scores(path: str, modified_ns: int) -> tuple[int, int, array]:
+    return read_scores(path)
+
+
+def load_scores(path: str) -> tuple[int, int, array]:
+    """Width, height and scores of a score file, parsed again only if it changed"""
+    return _cached_scores(path, os.stat(path).st_mtime_ns)
+
+
+class CellTrend:
+    """Per grid point, the running sums of a least squares line through the scores over time
+
+    Adding a session only updates the sums, so the slopes never need the earlier
+    sessions again. Time is in years since the first session added.
+    """
+
+    def __init__(self, width: int, height: int, origin: datetime.datetime):
+        self.width = width
+        self.height = height
+        self.origin = origin
+        self.sessions = 0
+        cells = width * height
+        self.n = array("L", [0]) * cells
+        self.sum_t = array("d", [0.0]) * cells
+        self.sum_tt = array("d", [0.0]) * cells
+        self.sum_s = array("d", [0.0]) * cells
+        self.sum_ts = array("d", [0.0]) * cells
+        # the time of the earliest score, for the span of the slope
+        self.first_t = array("d", [float("inf")]) * cells
+        # the latest and the one but latest score with their times, for the change
+        self.last_t = array("d", [float("-inf")]) * cells
+        self.last = array("H", [NOT_SCORED]) * cells
+        self.previous_t = array("d", [float("-inf")]) * cells
+        self.previous = array("H", [NOT_SCORED]) * cells
+
+    def add(self, moment: datetime.datetime, scores: array) -> None:
+        t = (moment - self.origin).total_seconds() / 86400 / _DAYS_PER_YEAR
+        for cell, score in enumerate(scores):
+            if score == NOT_SCORED:
+                continue
+            self.n[cell] += 1
+            self.sum_t[cell] += t
+            self.sum_tt[cell] += t * t
+            self.sum_s[cell] += score
+            self.sum_ts[cell] += t * score
+            self.first_t[cell] = min(self.first_t[cell], t)
+            # sessions may be added out of order
+            if t >= self.last_t[cell]:
+                self.previous_t[cell], self.previous[cell] = (
+                    self.last_t[cell],
+                    self.last[cell],
+                )
+                self.last_t[cell], self.last[cell] = t, score
+            elif t > self.previous_t[cell]:
+                self.previous_t[cell], self.previous[cell] = t, score
+        self.sessions += 1
+
+    def slope(self, cell: int) -> float | None:
+        """Change of the score per year, None unless the scores span MIN_SPAN_DAYS"""
+        n = self.n[cell]
+        span = (self.last_t[cell] - self.first_t[cell]) * _DAYS_PER_YEAR
+        denominator = n * self.sum_tt[cell] - self.sum_t[cell] ** 2
+        if n < 2 or span < MIN_SPAN_DAYS or denominator <= 0:
+            return None
+        return (n * self.sum_ts[cell] - self.sum_t[cell] * self.sum_s[cell]) / (
+            denominator
+        )
+
+    def change(self, cell: int) -> int | None:
+        """The latest score minus the one before"""
+        if self.previous[cell] == NOT_SCORED:
+            return None
+        return self.last[cell] - self.previous[cell]
+
+    def rows(self) -> list[list]:
+        """Trend of all grid points, with a header row"""
+        rows = [["x", "y", "sessions", "last", "change", "slope_per_year"]]
+        for cell in range(self.width * self.height):
+            y, x = divmod(cell, self.width)
+            slope = self.slope(cell)
+            rows.append(
+                [
+                    x + 1,
+                    y + 1,
+                    self.n[cell],
+                    self.last[cell] or None,
+                    self.change(cell),
+                    None if slope is None else round(slope, 3),
+                ]
+            )
+        return rows
+
+
+class PatientTrend:
+    """Index of the sessions in a patient's directory, with a trend per grid size"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.sessions: dict[str, datetime.datetime] = {}
+        self.trends: dict[tuple[int, int], CellTrend] = {}
+
+    def refresh(self) -> list[str]:
+        """Add the sessions exported since the last refresh, returning their paths"""
+        added = []
+        for path in find_score_files(self.directory):
+            if path not in self.sessions and self.add(path):
+                added.append(path)
+        return added
+
+    def add(self, path: str) -> bool:
+        """Add one session to the trend of its grid size"""
+        try:
+            width, height, scores = load_scores(path)
+        except (OSError, ValueError) as e:
+            _LOGGER.warning("Skipping %s: %s", path, e)
+            return False
+        if not scores:
+            return False
+        moment = session_time(path)
+        self.sessions[path] = moment
+        if (width, height) not in self.trends:
+            self.trends[width, height] = CellTrend(width, height, moment)
+        self.trends[width, height].add(moment, scores)
+        return True
+
+    def compare(self, earlier: str, later: str) -> list[list[int | None]]:
+        """The score change per grid point between two sessions with the same grid"""
+        width, height, before = load_scores(earlier)
+        later_width, later_height, after = load_scores(later)
+        if (width, height) != (later_width, later_height):
+            raise ValueError(
+                f"Grid {later_width}x{later_height} differs from {width}x{height}"
+            )
+        return [
+            [
+                after[cell] - before[cell]
+                if after[cell] != NOT_SCORED and before[cell] != NOT_SCORED
+                else None
+                for cell in range(y * width, (y + 1) * width)
+            ]
+            for y in range(height)
+        ]
+
+
+def write_trends(trend: PatientTrend, output_dir: str) -> list[str]:
+    """Write a csv with the trend per grid point for each grid size"""
+    paths = []
+    for (width, height), cells in sorted(trend.trends.items()):
+        path = os.path.join(output_dir, f"trend_{width}x{height}.csv")
+        with open(path, "w", encoding="UTF8", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerows(cells.rows())
+        paths.append(path)
+    return paths
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "patient", help="directory with the patient's score_*.csv files"
+    )
+    parser.add_argument("--output", default=".", help="directory for the trends")
+    args = parser.parse_args(argv)
+
+    trend = PatientTrend(args.patient)
+    _LOGGER.info("Added %s sessions", len(trend.refresh()))
+    for path in write_trends(trend, args.output):
+        _LOGGER.info("Written %s", path)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
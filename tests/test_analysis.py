@@ -0,0 +1,38 @@
+import os
+import tempfile
+import unittest
+
+from src.analysis import analyse, write_stats
+
+
+class TestAnalysis(unittest.TestCase):
+    def test_analyse(self):
+        with tempfile.TemporaryDirectory() as archive:
+            paths = []
+            for i, content in enumerate(
+                ["10;20\r\n", "30;\r\n", "20;40\r\n", "1\r\n2\r\n"]
+            ):
+                paths.append(os.path.join(archive, f"score_{i}.csv"))
+                with open(paths[-1], "w") as f:
+                    f.write(content)
+
+            histograms = analyse(paths, jobs=2, chunk_size=2)
+            self.assertEqual(sorted(histograms), [(1, 2), (2, 1)])
+
+            stats = histograms[2, 1].cell_stats(0)
+            self.assertEqual(stats["sessions"], 3)
+            self.assertEqual(stats["mean"], 20)
+            self.assertEqual(stats["p50"], 20)
+            self.assertEqual(stats["p95"], 30)
+            self.assertEqual(stats["unscored_fraction"], 0)
+            stats = histograms[2, 1].cell_stats(1)
+            self.assertAlmostEqual(stats["unscored_fraction"], 1 / 3)
+            self.assertEqual(stats["mean"], 30)
+
+            (path, _) = write_stats(histograms, archive)
+            with open(path) as f:
+                self.assertEqual(len(f.readlines()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import tempfile
+import unittest
+
+from src.archive import find_score_files, parse_scores
+
+
+class TestArchive(unittest.TestCase):
+    def test_parse_scores(self):
+        width, height, scores = parse_scores(b"10;;12\r\n4;5;\r\n")
+        self.assertEqual((width, height), (3, 2))
+        self.assertEqual(list(scores), [10, 0, 12, 4, 5, 0])
+
+    def test_parse_ragged(self):
+        with self.assertRaises(ValueError):
+            parse_scores(b"10;11\r\n4\r\n")
+
+    def test_parse_out_of_range(self):
+        for data in (b"10;-3\r\n", b"10;70000\r\n", b"101\r\n"):
+            with self.assertRaises(ValueError):
+                parse_scores(data)
+
+    def test_find_score_files(self):
+        with tempfile.TemporaryDirectory() as archive:
+            os.mkdir(os.path.join(archive, "clinic"))
+            for name in ("score_1.csv", "timing_1.csv", "clinic/score_2.csv"):
+                open(os.path.join(archive, name), "w").close()
+            found = [os.path.relpath(p, archive) for p in find_score_files(archive)]
+            self.assertEqual(
+                found, [os.path.join("clinic", "score_2.csv"), "score_1.csv"]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+
+from src.benchmark import BENCHMARKS, compare
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_benchmarks_run(self):
+        for name, benchmark in BENCHMARKS.items():
+            run, operations = benchmark()
+            run()
+            self.assertGreater(operations, 0)
+
+    def test_compare(self):
+        comparison = compare({"a": 2.0, "b": 1.6, "new": 1}, {"a": 1.0, "b": 1.5}, 0.5)
+        self.assertEqual(
+            comparison,
+            {
+                "a": {"baseline_us": 1.0, "ratio": 2.0, "regression": True},
+                "b": {"baseline_us": 1.5, "ratio": 1.067, "regression": False},
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,19 +1,35 @@
 import unittest
 from src.blinker import Blinker
-import tkinter as tk
 
+from src.canvas import HeadlessCanvas
 from src.grid import coordinates
 
 
 class TestBlinker(unittest.TestCase):
     def test_blinker_move(self):
-        canvas = tk.Canvas()
+        canvas = HeadlessCanvas()
         blinker = Blinker(canvas=canvas, thickness=3, position=coordinates(1, 1))
         blinker.move(position=coordinates(2, 1))
         blinker.switch()
+        visible = [i for i in canvas.items.values() if i.options["state"] == "normal"]
+        self.assertEqual(len(visible), 1)
+        self.assertEqual(visible[0].coords, [2, -9, 2, 11])
+
+    def test_blinker_keeps_items(self):
+        canvas = HeadlessCanvas()
+        blinker = Blinker(canvas=canvas, thickness=3, position=coordinates(1, 1))
+        items = dict(canvas.items)
+        for step in range(5):
+            blinker.switch()
+            blinker.increase_size()
+            blinker.update()
+        self.assertEqual(canvas.items, items)
+        self.assertEqual(canvas.items[max(items)].options["width"], 5)
+        blinker.clear()
+        self.assertTrue(all(i.options["state"] == "hidden" for i in items.values()))
 
     def test_blinker_size(self):
-        canvas = tk.Canvas()
+        canvas = HeadlessCanvas()
         blinker = Blinker(canvas=canvas, thickness=3, position=coordinates(1, 1))
         blinker.increase_size()
         self.assertEqual(blinker.size, 11)
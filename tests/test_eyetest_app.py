@@ -1,3 +1,5 @@
+import os
+import tempfile
 import tkinter as tk
 import unittest
 
@@ -21,12 +23,22 @@ class TestEyeTestApp(unittest.TestCase):
         self.assertEqual(settings, expected_settings)
 
     def test_run(self):
-        eye_test_app = EyeTestApp()
-        eye_test_app.user_input.ent_speed.delete(0, tk.END)
-        eye_test_app.user_input.ent_speed.insert(0, "100")
-        eye_test_app.start_eye_test("")
-        eye_test_app.press_space("")
-        self.assertEqual(eye_test_app.grid.to_go(), 14)
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as export_dir:
+            os.chdir(export_dir)  # the journal is written next to the exports
+            try:
+                eye_test_app = EyeTestApp()
+                eye_test_app.user_input.ent_speed.delete(0, tk.END)
+                eye_test_app.user_input.ent_speed.insert(0, "100")
+                eye_test_app.start_eye_test("")
+                eye_test_app.press_space("")
+                self.assertEqual(eye_test_app.grid.to_go(), 14)
+                journal = eye_test_app.session.journal
+                eye_test_app.destroy()
+                self.assertIsNone(eye_test_app.session.journal)
+                self.assertFalse(journal._thread.is_alive())
+            finally:
+                os.chdir(cwd)
 
         # eye_test_app.end_eye_test("")
         # # with patch("builtins.open") as mock_file:
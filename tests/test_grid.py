@@ -1,14 +1,14 @@
 import unittest
 
 from src.grid import EyeTestGrid, coordinates
-import tkinter as tk
+from src.canvas import HeadlessCanvas
 
 from unittest.mock import MagicMock
 
 
 class TestGrid(unittest.TestCase):
     def test_move_grid(self):
-        canvas = tk.Canvas()
+        canvas = HeadlessCanvas()
         size_x = 3
         size_y = 2
         grid = EyeTestGrid(canvas, size_x, size_y)
@@ -31,14 +31,14 @@ class TestGrid(unittest.TestCase):
         assert not grid.move("E")
 
     def test_keep_score(self):
-        canvas = tk.Canvas()
+        canvas = HeadlessCanvas()
         grid = EyeTestGrid(canvas, 3, 2)
         grid.keep_score(5, 10)
         self.assertEqual(grid.score(), 5)
         self.assertEqual(grid.score_lbl_id(), 10)
 
     def test_to_go(self):
-        canvas = tk.Canvas()
+        canvas = HeadlessCanvas()
         grid = EyeTestGrid(canvas, 3, 2)
         self.assertEqual(grid.to_go(), 6)
         grid.keep_score(5, 10)
@@ -46,6 +46,25 @@ class TestGrid(unittest.TestCase):
         grid.keep_score(10, 20)
         self.assertEqual(grid.to_go(), 4)
 
+    def test_rescore_and_all_scores(self):
+        grid = EyeTestGrid(MagicMock(), 3, 2)
+        grid.keep_score(5, 10)
+        grid.keep_score(7, 11)
+        self.assertEqual(grid.to_go(), 5)
+        self.assertEqual(grid.score(), 7)
+        grid.move("D")
+        grid.keep_score(2, 12)
+        self.assertEqual(grid.score(coordinates(1, 2)), 2)
+        self.assertIsNone(grid.score_lbl_id(coordinates(2, 2)))
+        self.assertEqual(grid.all_scores(), [[7, None, None], [2, None, None]])
+
+    def test_large_grid(self):
+        grid = EyeTestGrid(MagicMock(), 100, 100)
+        while grid.move("F"):
+            grid.keep_score(1, None)
+        self.assertEqual(grid.position, coordinates(100, 100))
+        self.assertEqual(grid.to_go(), 1)
+
     def test_screen_position(self):
         canvas = MagicMock()
         canvas.winfo_width.return_value = 1000
@@ -58,6 +77,11 @@ class TestGrid(unittest.TestCase):
         grid.move("D")
         self.assertEqual(grid.screen_position(), coordinates(373, 666))
 
+        grid.resize(600, 300)
+        self.assertEqual(grid.screen_position(), coordinates(240, 200))
+        self.assertEqual(grid.screen_position(coordinates(1, 1)), coordinates(40, 100))
+        self.assertEqual(canvas.winfo_width.call_count, 1)
+
 
 if __name__ == "__main__":
     unittest.main()
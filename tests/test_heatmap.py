@@ -0,0 +1,88 @@
+import unittest
+
+from src.canvas import HeadlessCanvas
+from src.heatmap import NOT_SCORED_COLOUR, ResultsView, render_ppm
+from src.session import EyeTestSession
+from src.settings import UserSettings
+
+
+def pixel(ppm: bytes, width: int, x: int, y: int) -> tuple:
+    data = ppm[ppm.index(b"\n") + 1 :]
+    offset = (y * width + x) * 3
+    return tuple(data[offset : offset + 3])
+
+
+class TestRenderPpm(unittest.TestCase):
+    def test_blocks(self):
+        ppm = render_ppm([[1, None, 100], [50, 50, 50]], 30, 20)
+        self.assertTrue(ppm.startswith(b"P6 30 20 255\n"))
+        self.assertEqual(len(ppm), len(b"P6 30 20 255\n") + 30 * 20 * 3)
+        self.assertEqual(pixel(ppm, 30, 0, 0), (0, 200, 0))
+        self.assertEqual(pixel(ppm, 30, 15, 9), NOT_SCORED_COLOUR)
+        self.assertEqual(pixel(ppm, 30, 29, 0), (255, 0, 0))
+        self.assertEqual(pixel(ppm, 30, 0, 10), pixel(ppm, 30, 29, 19))
+
+    def test_uneven_size(self):
+        ppm = render_ppm([[1] * 7] * 3, 100, 50)
+        self.assertEqual(len(ppm), len(b"P6 100 50 255\n") + 100 * 50 * 3)
+
+
+class TestResultsView(unittest.TestCase):
+    def setUp(self):
+        self.rendered = []
+        self.canvas = HeadlessCanvas(300, 200)
+
+        def image(ppm):
+            self.rendered.append(ppm)
+            return f"image{len(self.rendered)}"
+
+        self.view = ResultsView(self.canvas, image_factory=image, cache_size=2)
+
+    def test_cached(self):
+        scores = [[10, 100], [None, 5]]
+        self.view.show("a", scores)
+        self.view.hide()
+        self.view.show("a", scores)
+        self.assertEqual(len(self.rendered), 1)
+        self.canvas.width = 400
+        self.view.show("a", scores)
+        self.canvas.width = 300
+        self.view.show("a", scores)
+        self.assertEqual(len(self.rendered), 2)
+
+        self.view.show("b", scores)
+        self.view.show("c", scores)
+        self.view.show("a", scores)
+        self.assertEqual(len(self.rendered), 5)
+
+    def test_items(self):
+        self.view.show("a", [[10, 100], [None, 5]])
+        items = {i.kind: i for i in self.canvas.items.values() if "results" in i.tags}
+        self.assertEqual(items["image"].options["image"], "image1")
+        self.assertEqual(items["oval"].coords, [200, 25, 250, 75])
+        self.view.hide()
+        self.assertEqual(self.canvas.find_withtag("results"), ())
+
+
+class TestSessionResults(unittest.TestCase):
+    def test_end_shows_results(self):
+        canvas = HeadlessCanvas()
+        session = EyeTestSession(canvas)
+        session.start(UserSettings(size_horizontal=3, size_vertical=2))
+        session.press_space()
+        session.toggle_results()
+        first = session.results.image(
+            (session.started, 1), session.grid.all_scores(), 1000, 800
+        )
+        session.toggle_results()
+        self.assertFalse(session.results.visible)
+        session.press_space()
+        session.toggle_results()
+        second = session.results.image(
+            (session.started, 2), session.grid.all_scores(), 1000, 800
+        )
+        self.assertNotEqual(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()
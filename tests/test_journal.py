@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+from src.canvas import HeadlessCanvas
+from src.journal import ScoreJournal, read_journal, resume_grid
+from src.grid import coordinates
+from src.session import EyeTestSession
+from src.settings import UserSettings
+
+
+class TestScoreJournal(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "journal.csv")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_write_and_read(self):
+        journal = ScoreJournal(self.path, UserSettings(3, 500, 3, 2))
+        journal.record(coordinates(1, 1), 12)
+        journal.record(coordinates(2, 1), 8)
+        journal.close()
+
+        settings, scores = read_journal(self.path)
+        self.assertEqual(vars(settings), vars(UserSettings(3, 500, 3, 2)))
+        self.assertEqual(
+            [(p.x, p.y, size) for p, size in scores], [(1, 1, 12), (2, 1, 8)]
+        )
+
+    def test_incomplete_last_line(self):
+        with open(self.path, "w", encoding="UTF8", newline="") as f:
+            f.write("settings;3;500;3;2\r\nscore;1;1;12\r\nscore;2;1;1")
+        settings, grid = resume_grid(self.path, HeadlessCanvas())
+        self.assertEqual(grid.all_scores(), [[12, None, None], [None, None, None]])
+        self.assertEqual((grid.position.x, grid.position.y), (2, 1))
+
+    def test_resume_session(self):
+        session = EyeTestSession(
+            HeadlessCanvas(), export_dir=self.dir.name, journal=True
+        )
+        session.start(UserSettings(size_horizontal=3, size_vertical=2))
+        session.press_space()
+        session.press_bigger()
+        session.press_space()
+        path = session.journal.path
+        session.journal.close()  # the test is interrupted here
+
+        canvas = HeadlessCanvas()
+        resumed = EyeTestSession(canvas, export_dir=self.dir.name, journal=True)
+        settings = resumed.resume(path)
+        self.assertEqual(settings.size_horizontal, 3)
+        self.assertEqual(resumed.grid.to_go(), 4)
+        self.assertEqual((resumed.grid.position.x, resumed.grid.position.y), (3, 1))
+        labels = [i.options["text"] for i in canvas.items.values() if i.kind == "text"]
+        self.assertEqual(labels, ["10", "11"])
+
+        resumed.press_space()
+        resumed.journal.close()
+        _, scores = read_journal(path)
+        self.assertEqual([size for _, size in scores], [10, 11, 10])
+
+    def test_journal_per_test(self):
+        session = EyeTestSession(
+            HeadlessCanvas(), export_dir=self.dir.name, journal=True
+        )
+        session.start(UserSettings(size_horizontal=3, size_vertical=2))
+        first = session.journal.path
+        session.start(UserSettings(size_horizontal=3, size_vertical=2))
+        self.assertNotEqual(session.close_journal(), first)
+
+    def test_journal_removed_after_export(self):
+        session = EyeTestSession(
+            HeadlessCanvas(), export_dir=self.dir.name, journal=True
+        )
+        session.start(UserSettings(size_horizontal=3, size_vertical=2))
+        session.press_space()
+        session.end()
+        names = sorted(name.split("_")[0] for name in os.listdir(self.dir.name))
+        self.assertEqual(names, ["score", "session", "timing"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from src.canvas import HeadlessCanvas
+from src.grid import EyeTestGrid
+from src.labels import ScoreLabels
+
+
+class TestScoreLabels(unittest.TestCase):
+    def visible(self, canvas):
+        return {
+            item.options["text"]
+            for item in canvas.items.values()
+            if item.options.get("state", "normal") == "normal"
+        }
+
+    def test_show_and_hide(self):
+        canvas = HeadlessCanvas()
+        grid = EyeTestGrid(canvas, 3, 2)
+        labels = ScoreLabels(canvas, grid)
+        labels.show()
+        self.assertEqual(canvas.items, {})
+
+        grid.keep_score(5, None)
+        labels.show()
+        labels.hide()
+        grid.keep_score(6, grid.score_lbl_id())
+        labels.show()
+        self.assertEqual(len(canvas.items), 1)
+        self.assertEqual(self.visible(canvas), {"6"})
+
+    def test_large_grid_shows_nearby_labels(self):
+        canvas = HeadlessCanvas()
+        grid = EyeTestGrid(canvas, 100, 100)
+        labels = ScoreLabels(canvas, grid)
+        for step in range(99):
+            grid.keep_score(step + 1, None)
+            grid.move("F")
+        labels.show_all()
+        self.assertEqual(self.visible(canvas), {str(x) for x in range(90, 100)})
+
+        for step in range(50):
+            grid.move("F")
+            labels.follow()
+        self.assertEqual(self.visible(canvas), {str(x) for x in range(40, 61)})
+        self.assertEqual(len(canvas.items), 70)
+
+
+if __name__ == "__main__":
+    unittest.main()
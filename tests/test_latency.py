@@ -0,0 +1,33 @@
+import unittest
+
+from src.canvas import HeadlessCanvas
+from src.latency import LatencyRecorder
+
+
+class TestLatencyRecorder(unittest.TestCase):
+    def test_histogram(self):
+        canvas = HeadlessCanvas()
+        recorder = LatencyRecorder(canvas, clock=canvas.monotonic)
+
+        def slow_handler(event):
+            canvas.time += event
+
+        handler = recorder.wrap("press_space", slow_handler)
+        for latency in (0, 1, 3, 3, 700):
+            handler(latency)
+
+        histogram = recorder.histograms["press_space"]
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.max_ms, 700)
+        self.assertEqual(list(histogram.counts), [1, 1, 2, 0, 0, 0, 0, 0, 0, 1])
+
+        header, row = recorder.rows()
+        self.assertEqual(header[:4], ["handler", "count", "mean_ms", "max_ms"])
+        self.assertEqual(row[:4], ["press_space", 5, 141.4, 700])
+
+        recorder.reset()
+        self.assertEqual(recorder.rows(), [header])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import random
+import unittest
+
+from src.canvas import HeadlessCanvas
+from src.grid import coordinates
+from src.livestats import LiveStatistics
+from src.session import EyeTestSession
+from src.settings import UserSettings
+
+
+class TestLiveStatistics(unittest.TestCase):
+    def test_rescore(self):
+        stats = LiveStatistics(3, 2, threshold=20)
+        self.assertEqual(stats.summary(), "Nog geen scores")
+        stats.add(coordinates(1, 1), 10)
+        stats.add(coordinates(2, 1), 30)
+        stats.add(coordinates(1, 2), 5)
+        self.assertEqual((stats.minimum, stats.maximum, stats.above), (5, 30, 1))
+        self.assertEqual(stats.mean, 15)
+        stats.add(coordinates(1, 2), 5)  # the same score again changes nothing
+        self.assertEqual((stats.count, stats.minimum, stats.total), (3, 5, 45))
+
+        stats.add(coordinates(1, 2), 40)
+        stats.add(coordinates(2, 1), 12)
+        self.assertEqual((stats.minimum, stats.maximum, stats.above), (10, 40, 1))
+        self.assertEqual(stats.count, 3)
+        self.assertEqual(stats.row_mean(1), 11)
+        self.assertEqual(stats.column_mean(1), 25)
+        self.assertIsNone(stats.column_mean(3))
+        self.assertEqual(stats.summary(), "Gemiddeld 20.7 (min 10, max 40), 1 boven 20")
+
+    def test_matches_full_scan(self):
+        rng = random.Random(3)
+        stats = LiveStatistics(5, 4)
+        scores = {}
+        for _ in range(200):
+            position = coordinates(rng.randint(1, 5), rng.randint(1, 4))
+            scores[position] = rng.randint(1, 100)
+            stats.add(position, scores[position])
+            values = list(scores.values())
+            self.assertEqual(stats.minimum, min(values))
+            self.assertEqual(stats.maximum, max(values))
+            self.assertAlmostEqual(stats.mean, sum(values) / len(values))
+            self.assertEqual(stats.above, sum(v > 50 for v in values))
+
+
+class TestSessionStatistics(unittest.TestCase):
+    def test_shown_live(self):
+        canvas = HeadlessCanvas()
+        shown = []
+        session = EyeTestSession(canvas, show_statistics=shown.append)
+        session.start(UserSettings(size_horizontal=3, size_vertical=2))
+        session.press_bigger()
+        session.press_space()
+        canvas.advance(0)
+        self.assertEqual(
+            shown, ["Nog geen scores", "Gemiddeld 11.0 (min 11, max 11), 0 boven 50"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
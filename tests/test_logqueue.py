@@ -0,0 +1,106 @@
+import io
+import json
+import logging
+import unittest
+
+from src.canvas import HeadlessCanvas
+from src.logqueue import (
+    ContextFilter,
+    JsonFormatter,
+    LogContext,
+    RateLimitFilter,
+    setup_logging,
+)
+from src.session import EyeTestSession
+from src.settings import UserSettings
+
+
+def make_record(msg="Move to %s", level=logging.INFO):
+    return logging.LogRecord("grid", level, __file__, 1, msg, ("(1, 2)",), None)
+
+
+class TestRateLimitFilter(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.limit = RateLimitFilter(limit=3, interval=1.0, clock=lambda: self.now)
+
+    def test_limit(self):
+        passed = [self.limit.filter(make_record()) for _ in range(10)]
+        self.assertEqual(passed.count(True), 3)
+        self.assertTrue(self.limit.filter(make_record("Other")))
+
+    def test_suppressed_reported(self):
+        for _ in range(10):
+            self.limit.filter(make_record())
+        self.now = 1.5
+        record = make_record()
+        self.assertTrue(self.limit.filter(record))
+        self.assertEqual(record.suppressed, 7)
+
+    def test_warnings_pass(self):
+        passed = [
+            self.limit.filter(make_record(level=logging.WARNING)) for _ in range(10)
+        ]
+        self.assertTrue(all(passed))
+
+
+class TestContext(unittest.TestCase):
+    def test_session_context(self):
+        context = LogContext()
+        session = EyeTestSession(HeadlessCanvas(), log_context=context)
+        session.start(UserSettings(size_horizontal=3, size_vertical=2))
+        session.press_move("F")
+
+        record = make_record()
+        ContextFilter(context).filter(record)
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry["session"], context.session)
+        self.assertEqual(entry["position"], "2,1")
+        self.assertEqual(entry["message"], "Move to (1, 2)")
+
+        session.flips.stop()
+        context.clear()
+        record = make_record()
+        ContextFilter(context).filter(record)
+        self.assertNotIn("session", json.loads(JsonFormatter().format(record)))
+
+
+class TestSetupLogging(unittest.TestCase):
+    def setUp(self):
+        root = logging.getLogger()
+        self.saved = root.handlers[:], root.level
+
+    def tearDown(self):
+        root = logging.getLogger()
+        root.handlers[:], level = self.saved
+        root.setLevel(level)
+
+    def test_json_lines(self):
+        stream = io.StringIO()
+        listener = setup_logging(stream=stream, limit=2)
+        logger = logging.getLogger("grid")
+        for i in range(5):
+            logger.info("Move to %s", i)
+        logger.warning("Not moving")
+        listener.stop()
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(
+            [line["message"] for line in lines],
+            ["Move to 0", "Move to 1", "Not moving"],
+        )
+
+    def test_exception(self):
+        stream = io.StringIO()
+        listener = setup_logging(stream=stream)
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logging.getLogger("session").exception("Export failed for %s", "test")
+        listener.stop()
+        (line,) = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertEqual(line["message"], "Export failed for test")
+        self.assertIn("ZeroDivisionError", line["exception"])
+
+
+if __name__ == "__main__":
+    unittest.main()
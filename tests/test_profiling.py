@@ -0,0 +1,83 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from src.canvas import HeadlessCanvas
+from src.profiling import HandlerProfiler
+from src.session import EyeTestSession
+from src.settings import UserSettings
+
+
+class TestHandlerProfiler(unittest.TestCase):
+    def tearDown(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def test_disabled(self):
+        profiler = HandlerProfiler()
+        handler = profiler.wrap("handler", lambda x: x + 1)
+        self.assertEqual(handler(1), 2)
+        self.assertEqual(profiler.handlers, {})
+        self.assertIn("(no calls profiled)", profiler.report())
+
+    def test_nested(self):
+        profiler = HandlerProfiler(enabled=True, sample_every=2)
+        inner = profiler.wrap("inner", lambda: [0] * 10000)
+        # a temporary list, freed before the inner handler runs
+        outer = profiler.wrap("outer", lambda: (len([0] * 20000), inner()))
+        inner()
+        for _ in range(3):
+            outer()
+        self.assertEqual(profiler.handlers["outer"].calls, 3)
+        self.assertEqual(profiler.handlers["inner"].calls, 4)
+        # the inner calls sampled while the outer one is traced count for the outer one
+        self.assertEqual(profiler.handlers["outer"].samples, 2)
+        self.assertEqual(profiler.handlers["inner"].samples, 2)
+        self.assertGreater(profiler.handlers["inner"].peak_bytes, 80000)
+        self.assertGreater(profiler.handlers["outer"].peak_bytes, 160000)
+        self.assertFalse(tracemalloc.is_tracing())
+        hot_spots = profiler.report().split("Allocation hot spots")[1]
+        self.assertIn("size=", hot_spots)
+        self.assertNotIn("src/profiling.py", hot_spots)
+        self.assertNotIn("tracemalloc.py", hot_spots)
+
+    def test_tracing_of_others(self):
+        tracemalloc.start()
+        profiler = HandlerProfiler(enabled=True)
+        profiler.wrap("handler", lambda: [0] * 10000)()
+        profiler.disable()
+        self.assertTrue(tracemalloc.is_tracing())
+
+    def test_session_dump(self):
+        with tempfile.TemporaryDirectory() as export_dir:
+            canvas = HeadlessCanvas()
+            session = EyeTestSession(
+                canvas,
+                export_dir=export_dir,
+                clock=canvas.monotonic,
+                profiler=HandlerProfiler(enabled=True),
+            )
+            session.start(UserSettings(size_horizontal=2, size_vertical=1))
+            session.press_bigger()
+            canvas.advance(1000)
+            session.press_space()
+            session.end()
+            (path,) = [f for f in os.listdir(export_dir) if f.startswith("profile_")]
+            with open(os.path.join(export_dir, path), encoding="UTF8") as f:
+                report = f.read()
+            for name in ("switch_blinker", "press_space", "new_score", "export_score"):
+                self.assertIn(name, report)
+            self.assertIn("Allocation hot spots", report)
+
+    def test_stimuli_profiled(self):
+        canvas = HeadlessCanvas()
+        profiler = HandlerProfiler(enabled=True)
+        session = EyeTestSession(canvas, clock=canvas.monotonic, profiler=profiler)
+        session.start(UserSettings(size_horizontal=3, size_vertical=2, stimuli=2))
+        canvas.advance(1000)
+        self.assertGreater(profiler.handlers["switch_stimuli"].calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
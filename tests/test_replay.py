@@ -0,0 +1,99 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from src.canvas import HeadlessCanvas
+from src.grid import coordinates
+from src.journal import ScoreJournal
+from src.recording import SessionRecorder, load_recording
+from src.replay import main, replay
+from src.session import EyeTestSession
+from src.settings import UserSettings
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "events.csv")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def record(self):
+        canvas = HeadlessCanvas()
+        recorder = SessionRecorder()
+        session = EyeTestSession(
+            canvas, export_dir=self.dir.name, clock=canvas.monotonic, recorder=recorder
+        )
+        session.start(UserSettings(size_horizontal=3, size_vertical=2, automatic=True))
+        thresholds = [23, 5, 40, 1, 100, 12]
+        while session.staircase:
+            position = session.grid.position
+            if (
+                session.blinker.size
+                >= thresholds[(position.y - 1) * 3 + position.x - 1]
+            ):
+                canvas.advance(300)
+                session.press_space()
+            else:
+                canvas.advance(100)
+        session.press_move("B")
+        scores = session.grid.all_scores()
+        session.end()
+        recorder.save(self.path)
+        return scores
+
+    def test_replay(self):
+        scores = self.record()
+        events = load_recording(self.path)
+        self.assertEqual(events[0][1:], ("start", (3, 500, 3, 2, 1, 0, 1)))
+        self.assertEqual(events[-2][1:], ("press_move", ("B",)))
+
+        canvas = HeadlessCanvas()
+        session = EyeTestSession(
+            canvas, export_dir=self.dir.name, clock=canvas.monotonic
+        )
+        replay(events, session)
+        self.assertEqual(session.grid.all_scores(), scores)
+        self.assertIsNone(session.blinker)
+        self.assertEqual(canvas.time, events[-1][0])
+
+    def test_replay_resumed(self):
+        journal = os.path.join(self.dir.name, "journal.csv")
+        writer = ScoreJournal(journal, UserSettings(size_horizontal=3, size_vertical=2))
+        writer.record(coordinates(1, 1), 17)
+        writer.close()
+
+        canvas = HeadlessCanvas()
+        recorder = SessionRecorder()
+        session = EyeTestSession(
+            canvas, export_dir=self.dir.name, clock=canvas.monotonic, recorder=recorder
+        )
+        session.resume(journal)
+        session.press_bigger()
+        session.press_space()
+        scores = session.grid.all_scores()
+        session.end()
+        events = recorder.events
+        self.assertEqual(events[0][1:], ("resume", (3, 500, 3, 2, 0, 0, 1, 1, 1, 17)))
+
+        canvas = HeadlessCanvas()
+        session = EyeTestSession(
+            canvas, export_dir=self.dir.name, clock=canvas.monotonic
+        )
+        replay(events, session)
+        self.assertEqual(session.grid.all_scores(), scores)
+        self.assertEqual(scores[0][:2], [17, 11])
+
+    def test_main(self):
+        self.record()
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main([self.path, "--sessions", "3"])
+        self.assertIn("Replayed 3 sessions", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
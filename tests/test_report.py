@@ -0,0 +1,111 @@
+import datetime
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+
+from src.report import make_reports, plan_reports, png_bytes, render_report
+from src.sessionfile import write_session
+from src.settings import UserSettings
+
+
+class TestReport(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def export(self, day: int, scores: list, patient: str = "") -> str:
+        started = datetime.datetime(2024, 1, day, 10)
+        directory = os.path.join(self.dir.name, patient)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"session_2024-01-{day:02} 1010.bin")
+        write_session(
+            path,
+            UserSettings(),
+            scores,
+            started,
+            started + datetime.timedelta(seconds=600),
+        )
+        return path
+
+    def test_png(self):
+        png = png_bytes(b"P6 2 1 255\n" + bytes([1, 2, 3, 4, 5, 6]))
+        self.assertTrue(png.startswith(b"\x89PNG\r\n\x1a\n"))
+        self.assertEqual(struct.unpack(">II", png[16:24]), (2, 1))
+        (length,) = struct.unpack(">I", png[33:37])
+        self.assertEqual(
+            zlib.decompress(png[41 : 41 + length]), b"\0" + bytes([1, 2, 3, 4, 5, 6])
+        )
+
+    def test_pdf(self):
+        first = self.export(1, [[10, None], [20, 100]])
+        second = self.export(2, [[12, 5], [20, 90]])
+        (pdf,) = render_report(second, first, self.dir.name, ("pdf",))
+        with open(pdf, "rb") as f:
+            data = f.read()
+        self.assertTrue(data.startswith(b"%PDF-1.4"))
+        self.assertTrue(data.endswith(b"%%EOF\n"))
+        self.assertIn(b"/Count 2", data)
+        self.assertIn(b"  +2   -", data)
+        self.assertIn(b"(Methode: handmatig)", data)
+
+    def test_previous_of_same_patient(self):
+        first_a = self.export(1, [[10, 20]], "patA")
+        first_b = self.export(2, [[10, 20]], "patB")
+        second_a = self.export(3, [[10, 20]], "patA")
+        self.assertEqual(
+            plan_reports(self.dir.name),
+            [(first_a, None), (first_b, None), (second_a, first_a)],
+        )
+
+    def test_skip_unchanged(self):
+        output = os.path.join(self.dir.name, "reports")
+        os.mkdir(output)
+        first = self.export(1, [[10, None], [20, 100]])
+        self.export(2, [[12, 5], [20, 90]])
+        self.export(3, [[1, 2, 3]])
+        self.assertEqual(len(make_reports(self.dir.name, output, jobs=2)), 6)
+        self.assertEqual(make_reports(self.dir.name, output, jobs=2), [])
+
+        # the first session and the next one, comparing with it, are made again
+        os.utime(first, ns=(0, 0))
+        written = make_reports(self.dir.name, output, formats=("png",), jobs=2)
+        self.assertEqual(len(written), 3)
+        written = make_reports(self.dir.name, output, formats=("png",), jobs=2)
+        self.assertEqual(written, [])
+        os.utime(first, ns=(1, 1))
+        written = make_reports(self.dir.name, output, formats=("png",), jobs=2)
+        self.assertEqual(
+            sorted(os.path.basename(path) for path in written),
+            ["report_2024-01-01 1010.png", "report_2024-01-02 1010.png"],
+        )
+
+    def test_missing_report_made_again(self):
+        output = os.path.join(self.dir.name, "reports")
+        self.export(1, [[10, 20]])
+        (png,) = make_reports(self.dir.name, output, formats=("png",), jobs=1)
+        os.remove(png)
+        written = make_reports(self.dir.name, output, formats=("png",), jobs=1)
+        self.assertEqual(written, [png])
+        self.assertTrue(os.path.exists(png))
+
+    def test_report_per_patient(self):
+        output = os.path.join(self.dir.name, "reports")
+        # sessions of two patients, exported at the same minute
+        self.export(1, [[10, 20]], "patA")
+        self.export(1, [[30, 40]], "patB")
+        written = make_reports(self.dir.name, output, formats=("png",), jobs=1)
+        self.assertEqual(
+            sorted(os.path.relpath(path, output) for path in written),
+            [
+                os.path.join("patA", "report_2024-01-01 1010.png"),
+                os.path.join("patB", "report_2024-01-01 1010.png"),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from unittest.mock import MagicMock
+
+from src.grid import EyeTestGrid
+from src.sampling import CoarseToFine, interpolate
+
+
+def measure(width, height, field):
+    grid = EyeTestGrid(MagicMock(), width, height)
+    sampler = CoarseToFine(width, height)
+    measured = 0
+    while (position := sampler.next_position(grid)) is not None:
+        grid.position = position
+        grid.keep_score(field(position.x, position.y), None)
+        measured += 1
+    return grid, measured
+
+
+class TestCoarseToFine(unittest.TestCase):
+    def test_coarse_positions(self):
+        sampler = CoarseToFine(6, 3)
+        self.assertEqual(
+            [(p.x, p.y) for p in sampler.coarse],
+            [(1, 1), (3, 1), (5, 1), (6, 1), (1, 3), (3, 3), (5, 3), (6, 3)],
+        )
+
+    def test_flat_field_needs_only_coarse_positions(self):
+        grid, measured = measure(9, 9, lambda x, y: 20)
+        self.assertEqual(measured, 25)
+        self.assertEqual(grid.to_go(), 81 - 25)
+
+    def test_refines_at_edges(self):
+        # a blind area on the right side of the field
+        grid, measured = measure(9, 9, lambda x, y: 90 if x > 6 else 20)
+        self.assertLess(measured, 81)
+        scores = grid.all_scores()
+        self.assertEqual(scores[1][5:8], [20, 90, None])
+        filled, interpolated = interpolate(scores)
+        self.assertEqual(filled[4], [20] * 6 + [90] * 3)
+
+
+class TestInterpolate(unittest.TestCase):
+    def test_interpolate(self):
+        filled, interpolated = interpolate([[10, None, 30], [None, None, None]])
+        self.assertEqual(filled, [[10, 20, 30], [10, 20, 30]])
+        self.assertEqual(interpolated, [[False, True, False], [True, True, True]])
+
+    def test_nothing_measured(self):
+        self.assertEqual(interpolate([[None]]), ([[None]], [[True]]))
+
+
+if __name__ == "__main__":
+    unittest.main()
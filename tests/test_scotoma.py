@@ -0,0 +1,94 @@
+import csv
+import os
+import tempfile
+import unittest
+from array import array
+
+from src.scotoma import find_regions, grid_scores, label_regions, main
+
+
+def grid(text: str) -> tuple[int, int, array]:
+    """A grid of scores from rows of characters: '#' is 90, '.' is 10, ' ' not scored"""
+    rows = text.strip("\n").split("\n")
+    values = {"#": 90, ".": 10, " ": 0}
+    return (
+        len(rows[0]),
+        len(rows),
+        array("H", (values[c] for row in rows for c in row)),
+    )
+
+
+class TestScotoma(unittest.TestCase):
+    def test_labels(self):
+        width, height, scores = grid(
+            """
+#..#.
+.#.#.
+...##
+##...
+"""
+        )
+        abnormal = array("B", (s > 50 for s in scores))
+        labels, count = label_regions(width, height, abnormal)
+        self.assertEqual(count, 3)
+        self.assertEqual(labels[0], labels[6])  # diagonal
+        self.assertEqual(labels[3], labels[14])
+        self.assertEqual(labels[15], labels[16])
+        self.assertNotEqual(labels[0], labels[3])
+
+    def test_u_shape_merges(self):
+        width, height, scores = grid(
+            """
+#.#.#
+#.#.#
+#####
+"""
+        )
+        regions = find_regions(width, height, scores, blind_spot=(0, 0, 0, 0))
+        self.assertEqual(len(regions), 1)
+        self.assertEqual(regions[0].cells, 11)
+        self.assertEqual((regions[0].left, regions[0].bottom), (1, 3))
+
+    def test_blind_spot_and_norms(self):
+        width, height, scores = grid(
+            """
+..........
+..........
+....#.....
+....#.....
+..........
+#.........
+"""
+        )
+        regions = find_regions(width, height, scores)
+        self.assertEqual([r.blind_spot for r in regions], [True, False])
+        self.assertEqual(regions[0].mean_score, 90)
+
+        norms = array("H", [50] * 50 + [95] * 10)
+        regions = find_regions(width, height, scores, norms)
+        self.assertEqual(len(regions), 1)
+
+    def test_unscored_is_normal(self):
+        width, height, scores = grid_scores([[90, None, 90], [None, None, None]])
+        self.assertEqual((width, height), (3, 2))
+        self.assertEqual(
+            len(find_regions(width, height, scores, blind_spot=(0, 0, 0, 0))), 2
+        )
+
+    def test_main(self):
+        with tempfile.TemporaryDirectory() as archive:
+            for i, content in enumerate(["90;90;10\r\n10;10;10\r\n", "10;10\r\n"]):
+                with open(os.path.join(archive, f"score_{i}.csv"), "w") as f:
+                    f.write(content)
+            output = os.path.join(archive, "scotoma.csv")
+            main([archive, "--output", output, "--jobs", "1"])
+            with open(output) as f:
+                rows = list(csv.reader(f, delimiter=";"))
+            self.assertEqual(
+                [row[1:] for row in rows[1:]],
+                [["1", "2", "2", "0"], ["0", "0", "0", "0"]],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
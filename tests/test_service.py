@@ -0,0 +1,75 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from src.service import MAX_LINE, EyeTestService, load_test
+
+
+class TestEyeTestService(unittest.IsolatedAsyncioTestCase):
+    async def test_session(self):
+        with tempfile.TemporaryDirectory() as export_dir:
+            service = EyeTestService(export_dir)
+            server = await service.start(0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection(
+                "127.0.0.1", port, limit=MAX_LINE
+            )
+            for event, args in [
+                ("resize", [600, 400]),
+                ("start", [3, 50, 3, 2, 0, 0]),
+                ("press_space", []),
+            ]:
+                message = {"event": event, "args": args}
+                writer.write(json.dumps(message).encode() + b"\n")
+            await asyncio.sleep(0.2)
+            self.assertEqual(len(service.sessions), 1)
+
+            writer.write(b'{"event": "end"}\n')
+            messages = []
+            while (message := json.loads(await reader.readline()))["op"] != "timing":
+                messages.append(message)
+            self.assertGreaterEqual(message["summary"]["flips"], 2)
+
+            created = [m["kind"] for m in messages if m["op"] == "create"]
+            self.assertEqual(created, ["oval", "line", "line", "text", "image"])
+            self.assertIn({"op": "status", "text": "Deze moet nog"}, messages)
+
+            writer.close()
+            await asyncio.sleep(0.05)
+            self.assertEqual(service.sessions, set())
+            server.close()
+            await server.wait_closed()
+
+    async def test_exports_per_session(self):
+        with tempfile.TemporaryDirectory() as export_dir:
+            server = await EyeTestService(export_dir).start(0)
+            port = server.sockets[0].getsockname()[1]
+            connections = [
+                await asyncio.open_connection("127.0.0.1", port, limit=MAX_LINE)
+                for _ in range(2)
+            ]
+            for _, writer in connections:
+                writer.write(b'{"event": "start", "args": [3, 50, 3, 2, 0, 0]}\n')
+                writer.write(b'{"event": "press_space"}\n{"event": "end"}\n')
+            for reader, writer in connections:
+                while json.loads(await reader.readline())["op"] != "timing":
+                    pass
+                writer.close()
+
+            exports = sorted(name.split("_")[0] for name in os.listdir(export_dir))
+            self.assertEqual(exports, ["score"] * 2 + ["session"] * 2 + ["timing"] * 2)
+            server.close()
+            await server.wait_closed()
+
+    async def test_load(self):
+        result = await load_test(sessions=5, seconds=1, speed=100)
+        self.assertEqual(result["sessions"], 5)
+        self.assertGreaterEqual(result["min_switches"], 8)
+        # the service alone, the clients run in another process
+        self.assertLess(result["cpu_fraction"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
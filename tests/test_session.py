@@ -0,0 +1,224 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from src.canvas import HeadlessCanvas
+from src.latency import LatencyRecorder
+from src.session import EyeTestSession
+from src.sessionfile import read_session
+from src.settings import UserSettings
+
+
+class TestEyeTestSession(unittest.TestCase):
+    def test_run(self):
+        canvas = HeadlessCanvas()
+        status = []
+        session = EyeTestSession(canvas, show_status=status.append)
+        session.start(UserSettings(speed=100))
+        session.press_space()
+        canvas.advance(0)
+        self.assertEqual(session.grid.to_go(), 14)
+        self.assertEqual(status[-1], "Deze moet nog")
+
+        session.press_move("B")
+        canvas.advance(0)
+        self.assertEqual(status[-1], "Deze is al gedaan")
+
+    def test_blinker_switches_on_timer(self):
+        canvas = HeadlessCanvas()
+        session = EyeTestSession(canvas, clock=canvas.monotonic)
+        session.start(UserSettings(speed=100))
+        lines = lambda: [
+            i.coords
+            for i in canvas.items.values()
+            if i.kind == "line" and i.options["state"] == "normal"
+        ]
+        horizontal = lines()
+        canvas.advance(100)
+        self.assertNotEqual(lines(), horizontal)
+        canvas.advance(100)
+        self.assertEqual(lines(), horizontal)
+
+        session.pause()
+        self.assertTrue(session.paused)
+        self.assertEqual(lines(), [])
+        canvas.advance(1000)
+        self.assertEqual(lines(), [])
+
+    def test_labels_are_reused(self):
+        canvas = HeadlessCanvas()
+        session = EyeTestSession(canvas)
+        session.start(UserSettings(size_horizontal=3, size_vertical=2))
+        session.press_space()
+        session.press_move("B")
+        session.press_bigger()
+        session.press_space()  # score the first position again
+        for step in range(10):
+            session.press_move("B")
+            session.press_move("F")
+        canvas.advance(0)
+
+        (label,) = [i for i in canvas.items.values() if i.kind == "text"]
+        self.assertEqual(label.options["text"], "11")
+        self.assertEqual(label.options.get("state", "normal"), "normal")
+        session.press_move("B")
+        canvas.advance(0)
+        self.assertEqual(label.options["state"], "hidden")
+
+    def test_render_once_per_burst(self):
+        canvas = HeadlessCanvas()
+        sizes = []
+        session = EyeTestSession(canvas, show_size=sizes.append)
+        session.start(UserSettings(size_horizontal=3, size_vertical=2))
+        moved = []
+        session.blinker.move = moved.append
+        for _ in range(20):
+            session.press_bigger()
+        session.press_move("F")
+        self.assertEqual((moved, sizes), ([], ["Grootte = 10"]))
+
+        canvas.advance(0)
+        self.assertEqual(len(moved), 1)
+        self.assertEqual(sizes[1:], ["Grootte = 30"])
+
+    def test_labels_after_burst(self):
+        canvas = HeadlessCanvas()
+        session = EyeTestSession(canvas)
+        session.start(UserSettings(size_horizontal=3, size_vertical=2))
+        for _ in range(4):
+            session.press_space()
+        canvas.advance(0)
+
+        self.assertEqual(session.grid.all_scores(), [[10, 10, 10], [10, None, None]])
+        shown = [
+            i.coords
+            for i in canvas.items.values()
+            if i.kind == "text" and i.options.get("state", "normal") == "normal"
+        ]
+        self.assertEqual(len(shown), 4)
+
+    def test_latency_until_rendered(self):
+        canvas = HeadlessCanvas()
+        latency = LatencyRecorder(canvas, clock=canvas.monotonic)
+        session = EyeTestSession(canvas, latency=latency)
+        session.start(UserSettings(size_horizontal=3, size_vertical=2))
+        press_space = latency.wrap("press_space", session.press_space)
+        press_space()
+        press_space()
+        self.assertEqual(latency.histograms, {})
+
+        canvas.advance(5)
+        histogram = latency.histograms["press_space"]
+        self.assertEqual(histogram.count, 2)
+        self.assertNotIn("render", latency.histograms)
+
+    def test_automatic(self):
+        canvas = HeadlessCanvas()
+        session = EyeTestSession(canvas, clock=canvas.monotonic)
+        session.start(UserSettings(size_horizontal=3, size_vertical=2, automatic=True))
+        thresholds = [23, 5, 40, 1, 100, 12]
+        while session.staircase:
+            position = session.grid.position
+            threshold = thresholds[(position.y - 1) * 3 + position.x - 1]
+            if session.blinker.size >= threshold:
+                session.press_space()
+            else:
+                canvas.advance(500 * 4)  # no response, counts as not seen
+        self.assertEqual(session.grid.to_go(), 0)
+        self.assertEqual(session.grid.all_scores(), [[23, 5, 40], [1, 100, 12]])
+
+        # finished: the manual keys do not score
+        session.press_bigger()
+        session.press_space()
+        self.assertEqual(session.grid.all_scores(), [[23, 5, 40], [1, 100, 12]])
+
+    def test_settings_limited(self):
+        with tempfile.TemporaryDirectory() as export_dir:
+            session = EyeTestSession(HeadlessCanvas(), export_dir=export_dir)
+            session.start(UserSettings(thickness=5000, stimuli=300, speed=0))
+            self.assertEqual(
+                (session.settings.thickness, session.settings.stimuli), (100, 9)
+            )
+            session.end()
+            (export,) = [f for f in os.listdir(export_dir) if f.startswith("session_")]
+            settings = read_session(os.path.join(export_dir, export)).settings
+            self.assertEqual((settings.stimuli, settings.speed), (9, 1))
+
+    def test_coarse_to_fine_export(self):
+        with tempfile.TemporaryDirectory() as export_dir:
+            status = []
+            session = EyeTestSession(
+                HeadlessCanvas(), show_status=status.append, export_dir=export_dir
+            )
+            session.start(
+                UserSettings(size_horizontal=3, size_vertical=3, coarse_to_fine=True)
+            )
+            measured = 0
+            while not session.sampler.finished:
+                session.press_space()
+                measured += 1
+            session.render()
+            self.assertEqual(measured, 4)
+            self.assertEqual(status[-1], "Allemaal gedaan!")
+            session.end()
+
+            (export,) = [f for f in os.listdir(export_dir) if f.startswith("field_")]
+            with open(os.path.join(export_dir, export), encoding="UTF8") as f:
+                rows = list(csv.reader(f, delimiter=";"))
+            self.assertEqual(rows[1], ["~10", "~10", "~10"])
+            self.assertEqual(rows[2], ["10", "~10", "10"])
+
+    def test_resize(self):
+        canvas = HeadlessCanvas(1000, 800)
+        session = EyeTestSession(canvas)
+        session.start(UserSettings(size_horizontal=3, size_vertical=2))
+        session.press_space()
+        session.press_space()
+        session.press_move("B")
+        canvas.advance(0)
+        session.resize(1300, 400)
+
+        labels = [
+            i.coords
+            for i in canvas.items.values()
+            if i.kind == "text" and i.options.get("state", "normal") == "normal"
+        ]
+        self.assertEqual(labels, [[40, 133]])
+        (fixation,) = [i.coords for i in canvas.items.values() if i.kind == "oval"]
+        self.assertEqual(fixation[1::2], [190, 210])
+        (blinker,) = [
+            i.coords
+            for i in canvas.items.values()
+            if i.kind == "line" and i.options["state"] == "normal"
+        ]
+        self.assertEqual(blinker, [463, 133, 483, 133])
+
+    def test_full_session_export(self):
+        with tempfile.TemporaryDirectory() as export_dir:
+            session = EyeTestSession(HeadlessCanvas(), export_dir=export_dir)
+            session.start(UserSettings(size_horizontal=3, size_vertical=2))
+            session.press_bigger()
+            for step in range(6):
+                session.press_space()
+            self.assertEqual(session.grid.to_go(), 0)
+            session.end()
+            self.assertIsNone(session.blinker)
+
+            (export,) = [f for f in os.listdir(export_dir) if f.startswith("score_")]
+            with open(os.path.join(export_dir, export), encoding="UTF8") as f:
+                rows = list(csv.reader(f, delimiter=";"))
+            self.assertEqual(rows, [["11", "11", "11"], ["11", "11", "11"]])
+
+            timing = export.replace("score_", "timing_")
+            with open(os.path.join(export_dir, timing), encoding="UTF8") as f:
+                summary = dict(csv.reader(f, delimiter=";"))
+            self.assertEqual(summary["period_ms"], "500")
+
+            session_file = export.replace("score_", "session_").replace(".csv", ".bin")
+            record = read_session(os.path.join(export_dir, session_file))
+            self.assertEqual(list(record.scores), [11] * 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import datetime
+import os
+import resource
+import struct
+import tempfile
+import unittest
+
+from src.sessionfile import (
+    map_session,
+    map_sessions,
+    read_session,
+    score_totals,
+    write_session,
+)
+from src.settings import UserSettings
+
+
+class TestSessionFile(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.started = datetime.datetime(2023, 3, 31, 10, 0, 0)
+        self.ended = datetime.datetime(2023, 3, 31, 10, 20, 0)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, name, scores):
+        path = os.path.join(self.dir.name, name)
+        write_session(
+            path, UserSettings(3, 500, 3, 2), scores, self.started, self.ended
+        )
+        return path
+
+    def test_round_trip(self):
+        path = self.write("session_1.bin", [[10, None, 12], [4, 5, None]])
+        for record in (read_session(path), map_session(path)):
+            self.assertEqual((record.width, record.height), (3, 2))
+            self.assertEqual(vars(record.settings), vars(UserSettings(3, 500, 3, 2)))
+            self.assertEqual(record.started, self.started)
+            self.assertEqual(record.ended, self.ended)
+            self.assertEqual(list(record.scores), [10, 0, 12, 4, 5, 0])
+            self.assertEqual(list(record.row(2)), [4, 5, 0])
+
+    def test_test_mode(self):
+        path = os.path.join(self.dir.name, "session_1.bin")
+        settings = UserSettings(3, 500, 3, 2, automatic=True, stimuli=3)
+        write_session(path, settings, [[10, None, 12]], self.started, self.ended)
+        self.assertEqual(vars(read_session(path).settings), vars(settings))
+        settings = UserSettings(3, 500, 3, 2, coarse_to_fine=True)
+        write_session(path, settings, [[10, None, 12]], self.started, self.ended)
+        self.assertEqual(vars(map_session(path).settings), vars(settings))
+
+    def test_version_1(self):
+        path = os.path.join(self.dir.name, "session_1.bin")
+        with open(path, "wb") as f:
+            f.write(struct.pack("<4sHHIHHHHqq", b"KOOT", 1, 3, 500, 3, 2, 2, 1, 0, 0))
+            f.write(struct.pack("<HH", 10, 0))
+        record = read_session(path)
+        self.assertEqual(vars(record.settings), vars(UserSettings(3, 500, 3, 2)))
+        self.assertEqual(list(record.scores), [10, 0])
+
+    def test_not_a_session(self):
+        path = os.path.join(self.dir.name, "session_x.bin")
+        with open(path, "wb") as f:
+            f.write(b"10;11\r\n" * 10)
+        with self.assertRaises(ValueError):
+            read_session(path)
+
+    def test_many_files(self):
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        limit = 64
+        for number in range(limit * 2):
+            self.write(f"session_{number}.bin", [[10, None, 12], [4, 5, None]])
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+        try:
+            ((sums, counts),) = score_totals(map_sessions(self.dir.name)).values()
+        finally:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+        n = limit * 2
+        self.assertEqual(list(counts), [n, 0, n, n, n, 0])
+
+    def test_damaged_file_skipped(self):
+        self.write("session_1.bin", [[10, None, 12], [4, 5, None]])
+        for name, content in (("session_2.bin", b""), ("session_3.bin", b"KOOT\2\0")):
+            with open(os.path.join(self.dir.name, name), "wb") as f:
+                f.write(content)
+        with self.assertLogs(level="WARNING") as logs:
+            records = [record.width for record in map_sessions(self.dir.name)]
+        self.assertEqual(records, [3])
+        self.assertEqual(len(logs.records), 2)
+
+    def test_score_totals(self):
+        self.write("session_1.bin", [[10, None, 12], [4, 5, None]])
+        self.write("session_2.bin", [[20, 1, None], [4, 5, None]])
+        ((geometry, (sums, counts)),) = score_totals(
+            map_sessions(self.dir.name)
+        ).items()
+        self.assertEqual(geometry, (3, 2))
+        self.assertEqual(list(sums), [30, 1, 12, 8, 10, 0])
+        self.assertEqual(list(counts), [2, 1, 1, 2, 2, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from src.staircase import Staircase
+
+
+def run(staircase, threshold):
+    while not staircase.done:
+        staircase.respond(staircase.size >= threshold)
+    return staircase.threshold
+
+
+class TestStaircase(unittest.TestCase):
+    def test_finds_threshold(self):
+        for threshold in (1, 2, 9, 10, 23, 57, 99, 100):
+            staircase = Staircase()
+            self.assertEqual(run(staircase, threshold), threshold)
+            self.assertLessEqual(staircase.presentations, 20)
+
+    def test_presentations(self):
+        staircase = Staircase()
+        run(staircase, 23)
+        self.assertEqual(staircase.presentations, 7)
+
+    def test_never_seen(self):
+        self.assertEqual(run(Staircase(), 1000), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
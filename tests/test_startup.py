@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from src.startup import StartupTimer
+
+
+class TestStartupTimer(unittest.TestCase):
+    def test_rows(self):
+        startup = StartupTimer()
+        startup.mark("window built")
+        startup.mark("first frame")
+        header, *rows = startup.rows()
+        self.assertEqual(header, ["step", "since_start_ms", "step_ms"])
+        self.assertEqual([row[0] for row in rows][-2:], ["window built", "first frame"])
+        since_start = [row[1] for row in rows]
+        self.assertEqual(since_start, sorted(since_start))
+        self.assertAlmostEqual(rows[-1][1], sum(row[2] for row in rows), delta=0.5)
+
+    def test_core_without_tkinter(self):
+        src = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+        code = (
+            "import sys, session, analysis, sessionfile, journal, sampling;"
+            "sys.exit('tkinter' in sys.modules)"
+        )
+        subprocess.run([sys.executable, "-c", code], cwd=src, check=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+
+from src.canvas import HeadlessCanvas
+from src.grid import EyeTestGrid
+from src.journal import ScoreJournal, read_journal
+from src.session import PRESENTATION_SWITCHES, EyeTestSession
+from src.settings import UserSettings
+from src.stimuli import StimulusSet
+
+
+class TestStimulusSet(unittest.TestCase):
+    def setUp(self):
+        self.canvas = HeadlessCanvas()
+        self.grid = EyeTestGrid(self.canvas, 5, 3)
+        self.scored = []
+        self.stimuli = StimulusSet(
+            self.canvas, self.grid, 3, 3, 4, on_score=self.scored.append
+        )
+
+    def test_spread(self):
+        positions = [(s.position.x, s.position.y) for s in self.stimuli.active]
+        self.assertEqual(len(set(positions)), 3)
+        self.assertIn((1, 1), positions)
+        self.assertIn((5, 3), positions)
+
+    def test_staggered_flips(self):
+        lines = lambda stimulus: [
+            self.canvas.items[line].options["state"]
+            for line in (
+                stimulus.blinker._horizontal_line,
+                stimulus.blinker._vertical_line,
+            )
+        ]
+        first, second, third = self.stimuli.active
+        before = [lines(s) for s in (first, second, third)]
+        self.stimuli.flip()
+        self.assertNotEqual(lines(first), before[0])
+        self.assertEqual(lines(second), before[1])
+        self.stimuli.flip()
+        self.stimuli.flip()
+        self.assertNotEqual(lines(third), before[2])
+
+    def test_respond(self):
+        first, second, _ = self.stimuli.active
+        position = first.position
+        while first.position == position:
+            self.assertTrue(self.stimuli.respond(1))
+        self.assertEqual(self.scored, [position])
+        self.assertEqual(self.grid.score(position), 1)
+        self.assertNotIn(
+            first.position, [s.position for s in self.stimuli.active if s is not first]
+        )
+        self.assertEqual(second.staircase.presentations, 0)
+        self.assertFalse(self.stimuli.respond(7))
+
+
+class TestSessionStimuli(unittest.TestCase):
+    def test_parallel_session(self):
+        canvas = HeadlessCanvas()
+        sizes = []
+        session = EyeTestSession(canvas, clock=canvas.monotonic, show_size=sizes.append)
+        session.start(
+            UserSettings(speed=300, size_horizontal=4, size_vertical=3, stimuli=3)
+        )
+        self.assertIsNone(session.blinker)
+        self.assertEqual(len(session.stimuli.active), 3)
+        canvas.advance(0)
+        self.assertEqual(sizes[-1], "Grootte = 10 / 10 / 10")
+
+        session.press_stimulus(2)
+        canvas.advance(0)
+        self.assertEqual(sizes[-1], "Grootte = 10 / 2 / 10")
+
+        # nobody responds: all stimuli climb to the largest size in parallel
+        while not session.stimuli.finished:
+            canvas.advance(300)
+        self.assertEqual(session.grid.to_go(), 0)
+        self.assertTrue(session.testing)
+
+        with tempfile.TemporaryDirectory() as export_dir:
+            session._export_dir = export_dir
+            session.end()
+            self.assertFalse(session.testing)
+            self.assertEqual(canvas.find_withtag("stimulus"), ())
+
+    def test_start_after_single_blinker(self):
+        canvas = HeadlessCanvas()
+        session = EyeTestSession(canvas, clock=canvas.monotonic)
+        session.start(UserSettings(size_horizontal=4, size_vertical=3))
+        session.start(UserSettings(size_horizontal=4, size_vertical=3, stimuli=3))
+        self.assertIsNone(session.blinker)
+
+        session.press_space()
+        session.press_bigger()
+        session.press_move("F")
+        canvas.advance(0)
+        self.assertEqual(session.grid.to_go(), 12)
+        self.assertEqual(session.stimuli.sizes(), "10 / 10 / 10")
+
+    def test_throughput(self):
+        def duration(stimuli: int) -> int:
+            canvas = HeadlessCanvas()
+            session = EyeTestSession(canvas, clock=canvas.monotonic)
+            session.start(
+                UserSettings(size_horizontal=4, size_vertical=3, stimuli=stimuli)
+            )
+            while session.grid.to_go():
+                canvas.advance(100)
+            return canvas.time
+
+        self.assertLess(duration(4) * 3, duration(2) * 2)
+
+    def test_journal_setting(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "journal.csv")
+            ScoreJournal(path, UserSettings(stimuli=4)).close()
+            settings, _ = read_journal(path)
+            self.assertEqual(settings.stimuli, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
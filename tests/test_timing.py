@@ -0,0 +1,56 @@
+import unittest
+
+from src.canvas import HeadlessCanvas
+from src.timing import FlipScheduler, FlipTimings
+
+
+class TestFlipScheduler(unittest.TestCase):
+    def test_slow_handler_does_not_drift(self):
+        canvas = HeadlessCanvas()
+        flips = []
+
+        def slow_flip():
+            flips.append(canvas.time)
+            canvas.time += 30  # the handler itself takes 30 ms
+
+        scheduler = FlipScheduler(canvas, 100, slow_flip, canvas.monotonic)
+        scheduler.start()
+        canvas.advance(1000)
+        self.assertEqual(flips, list(range(100, 1001, 100)))
+        self.assertAlmostEqual(scheduler.timings.summary()["interval_max_ms"], 100)
+
+    def test_stop_and_restart(self):
+        canvas = HeadlessCanvas()
+        flips = []
+        scheduler = FlipScheduler(
+            canvas, 100, lambda: flips.append(1), canvas.monotonic
+        )
+        scheduler.start()
+        canvas.advance(250)
+        scheduler.stop()
+        self.assertFalse(scheduler.running)
+        canvas.advance(1000)
+        scheduler.start()
+        canvas.advance(100)
+        self.assertEqual(len(flips), 3)
+        # the paused time is not counted as an interval
+        for interval in scheduler.timings.intervals:
+            self.assertAlmostEqual(interval, 100)
+
+
+class TestFlipTimings(unittest.TestCase):
+    def test_summary(self):
+        timings = FlipTimings(100)
+        self.assertEqual(timings.summary(), {"period_ms": 100, "flips": 0})
+        for interval in (95, 100, 105, 120):
+            timings.add(interval)
+        summary = timings.summary()
+        self.assertEqual(summary["interval_min_ms"], 95)
+        self.assertEqual(summary["interval_mean_ms"], 105)
+        self.assertEqual(summary["interval_max_ms"], 120)
+        self.assertEqual(summary["jitter_max_ms"], 20)
+        self.assertEqual(summary["jitter_mean_ms"], 7.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
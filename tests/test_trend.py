@@ -0,0 +1,83 @@
+import csv
+import os
+import tempfile
+import unittest
+
+from src.trend import PatientTrend, load_scores, main
+
+
+class TestPatientTrend(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def export(self, moment: str, content: str) -> str:
+        path = os.path.join(self.dir.name, f"score_{moment}.csv")
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_incremental(self):
+        self.export("2023-01-01 100000", "10;20\r\n30;\r\n")
+        trend = PatientTrend(self.dir.name)
+        self.assertEqual(len(trend.refresh()), 1)
+        cells = trend.trends[2, 2]
+        self.assertIsNone(cells.slope(0))
+        self.assertIsNone(cells.change(0))
+
+        later = self.export("2024-01-01 100000", "20;20\r\n30;5\r\n")
+        self.assertEqual(trend.refresh(), [later])
+        self.assertEqual(trend.refresh(), [])
+        self.assertAlmostEqual(cells.slope(0), 10 * 365.25 / 365, places=6)
+        self.assertAlmostEqual(cells.slope(1), 0)
+        self.assertEqual(cells.change(0), 10)
+        self.assertIsNone(cells.change(3))
+        self.assertEqual(cells.sessions, 2)
+
+    def test_out_of_order(self):
+        trend = PatientTrend(self.dir.name)
+        trend.add(self.export("2024-01-01 100000", "30\r\n"))
+        trend.add(self.export("2022-01-01 100000", "10\r\n"))
+        trend.add(self.export("2023-01-01 100000_7", "20\r\n"))  # service export
+        cells = trend.trends[1, 1]
+        self.assertEqual((cells.last[0], cells.previous[0]), (30, 20))
+        self.assertAlmostEqual(cells.slope(0), 10, delta=0.05)
+
+    def test_same_visit(self):
+        trend = PatientTrend(self.dir.name)
+        trend.add(self.export("2023-01-01 100000", "10\r\n"))
+        trend.add(self.export("2023-01-01 100500", "20\r\n"))
+        cells = trend.trends[1, 1]
+        self.assertIsNone(cells.slope(0))
+        self.assertEqual(cells.change(0), 10)
+        trend.add(self.export("2023-01-02 100000", "15\r\n"))
+        self.assertIsNotNone(cells.slope(0))
+
+    def test_grid_sizes_and_compare(self):
+        first = self.export("2023-01-01 100000", "10;20\r\n")
+        second = self.export("2023-06-01 100000", "15;\r\n")
+        self.export("2023-07-01 100000", "1\r\n")
+        trend = PatientTrend(self.dir.name)
+        trend.refresh()
+        self.assertEqual(sorted(trend.trends), [(1, 1), (2, 1)])
+        self.assertEqual(trend.compare(first, second), [[5, None]])
+
+    def test_cache(self):
+        path = self.export("2023-01-01 100000", "10\r\n")
+        self.assertIs(load_scores(path), load_scores(path))
+        os.utime(path, ns=(0, 0))
+        self.assertEqual(load_scores(path)[2][0], 10)
+
+    def test_main(self):
+        self.export("2023-01-01 100000", "10;20\r\n")
+        self.export("2024-01-01 100000", "20;20\r\n")
+        main([self.dir.name, "--output", self.dir.name])
+        with open(os.path.join(self.dir.name, "trend_2x1.csv")) as f:
+            rows = list(csv.reader(f, delimiter=";"))
+        self.assertEqual(rows[1][:5], ["1", "1", "2", "20", "10"])
+
+
+if __name__ == "__main__":
+    unittest.main()